@@ -8,6 +8,14 @@ class Settings(BaseSettings):
     SUPABASE_KEY: str
     SUPABASE_SERVICE_KEY: str
     
+    # Connection pool (per process)
+    DB_POOL_MIN_SIZE: int = 1
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_MAX_IDLE: int = 300  # seconds before an idle connection is closed
+    DB_POOL_MAX_LIFETIME: int = 3600  # seconds before any connection is recycled
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_PING_AFTER: int = 10  # ping connections idle longer than this before reuse
+    
     # API Keys
     GROQ_API_KEY: str
     OPENAI_API_KEY: Optional[str] = None  # biar gak error
@@ -25,6 +33,18 @@ class Settings(BaseSettings):
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
     TOP_K_CHUNKS: int = 5
+    EMBEDDING_BATCH_SIZE: int = 32
+    EMBEDDING_BACKEND: str = "sentence-transformers"  # or 'onnx' (ONNX Runtime, no torch)
+    EMBEDDING_ONNX_DIR: str = "./models/all-MiniLM-L6-v2-onnx"  # written by scripts/export_onnx_embedding_model.py
+    EMBEDDING_ONNX_QUANTIZED: bool = False  # use the dynamic int8 model
+    EMBEDDING_ONNX_THREADS: int = 0  # intra-op threads per process; 0 = ONNX Runtime default
+    EMBEDDING_ONNX_MIN_COSINE: float = 0.99  # required agreement with sentence-transformers
+    RAG_CONTEXT_CACHE_SIZE: int = 256
+    RAG_CONTEXT_CACHE_TTL: int = 3600  # seconds
+    RAG_VERSION_CHECK_INTERVAL: float = 5.0  # seconds between pgvector version queries; other nodes' writes show up this late
+    EMBEDDING_CACHE_ENABLED: bool = True  # persistent cache of chunk/query embeddings
+    EMBEDDING_CACHE_PATH: str = "./embedding_cache/embeddings.sqlite3"
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 100000  # ~1.5 KB each for 384-d vectors; LRU beyond this
 
     # App
     APP_ENV: str = "development"
@@ -36,19 +56,69 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = "./uploads"
     MAX_FILE_SIZE: int = 10485760
     
+    # Cleanup (periodic tasks)
+    CLEANUP_RETENTION_DAYS: int = 30  # jobs and uploads older than this are removed
+    CLEANUP_BATCH_SIZE: int = 1000  # rows deleted per transaction
+    CLEANUP_UNLINK_WORKERS: int = 8  # threads removing uploaded files
+    
+    # PDF extraction
+    PDF_MAX_PAGES: int = 200  # pages beyond this are ignored
+    PDF_MAX_CHARS: int = 500000  # extraction stops once this much text is collected
+    PDF_EXTRACT_WORKERS: int = 4  # processes for page-parallel extraction; 1 disables it
+    PDF_PARALLEL_MIN_PAGES: int = 24  # smaller documents are extracted serially
+    
     # LLM
     LLM_MODEL: str = "llama-3.1-70b-versatile"
     EMBEDDING_MODEL: str = "text-embedding-ada-002"
     LLM_TEMPERATURE: float = 0.3
     MAX_TOKENS: int = 4000
+    LLM_MAX_PROMPT_TOKENS: int = 6000  # system + user prompt; sections are trimmed to fit
     MAX_RETRIES: int = 3
     RETRY_DELAY: int = 2
+    LLM_MAX_CONCURRENCY: int = 16  # in-flight requests per process (async client)
+    
+    # Groq rate limits, shared by all workers through Redis
+    LLM_RATE_LIMIT_ENABLED: bool = True
+    LLM_RATE_LIMIT_RPM: int = 30  # requests per minute
+    LLM_RATE_LIMIT_TPM: int = 6000  # tokens per minute; replaced by x-ratelimit-limit-tokens once seen
+    LLM_RATE_LIMIT_MAX_WAIT: int = 120  # seconds to wait for budget before failing the step
+    LLM_RATE_LIMIT_COMPLETION_ESTIMATE: int = 1000  # completion tokens reserved per call until recent completions are known (then their p95)
+    
+    # LLM response cache
+    LLM_CACHE_BACKEND: str = "sqlite"  # 'sqlite', 'redis' or 'none'
+    LLM_CACHE_PATH: str = "./llm_cache/llm_cache.sqlite3"
+    LLM_CACHE_TTL: int = 604800  # 7 days
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+    LLM_CACHE_STEPS: str = "cv_parsing,project_parsing"  # steps allowed to use the cache
     
     GROQ_API_BASE: str = "https://api.groq.com/openai/v1"
     
-    # ChromaDB
-    CHROMA_PERSIST_DIR: str = "./chroma_db"
+    # Job progress events (Redis pub/sub -> SSE)
+    JOB_EVENTS_ENABLED: bool = True
+    JOB_EVENTS_SNAPSHOT_TTL: int = 86400  # seconds the latest state of a job is kept in Redis
+    JOB_EVENTS_HEARTBEAT: int = 15  # seconds between SSE keep-alive comments
+    JOB_EVENTS_QUEUE_SIZE: int = 100  # buffered events per connected client
+    
+    # Evaluation step logs (buffered, written in batches)
+    EVALUATION_LOG_FLUSH_INTERVAL: float = 5.0  # seconds between background flushes
+    EVALUATION_LOG_BATCH_SIZE: int = 200  # pending rows that trigger an early flush
+    EVALUATION_LOG_MAX_PENDING: int = 10000  # oldest rows are dropped beyond this if the DB is down
     
+    # Batch evaluation
+    EVALUATION_BATCH_MAX_SIZE: int = 500  # candidate pairs per POST /evaluate/batch
+    
+    # Vector store
+    VECTOR_STORE_BACKEND: str = "chroma"  # 'chroma', 'numpy' (in-process matrix) or 'pgvector' (shared Postgres)
+    CHROMA_PERSIST_DIR: str = "./chroma_db"
+    VECTOR_INDEX_DIR: str = "./vector_index"  # numpy backend files
+    VECTOR_INDEX_DTYPE: str = "float32"  # 'float16' halves memory; queries are slower (upcast per query)
+    VECTOR_INDEX_MMAP: bool = True  # memory-map the matrix so worker processes share it
+    PGVECTOR_EF_SEARCH: int = 100  # HNSW candidates per query (pgvector backend)
+
+    # Prometheus metrics (set PROMETHEUS_MULTIPROC_DIR for forking servers/workers)
+    METRICS_ENABLED: bool = True  # expose GET /metrics and the worker exporter
+    METRICS_WORKER_PORT: int = 9808  # Celery worker exporter; 0 disables it
+
     # API
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
@@ -63,6 +133,10 @@ class Settings(BaseSettings):
     def cors_origins_list(self) -> List[str]:
         return [o.strip() for o in self.CORS_ORIGINS.split(",")]
 
+    @property
+    def llm_cache_steps(self) -> List[str]:
+        return [s.strip() for s in self.LLM_CACHE_STEPS.split(",") if s.strip()]
+
     @property
     def redis_url(self) -> str:
         return f"redis://default:{self.REDIS_PASSWORD}@{self.REDIS_HOST}:{self.REDIS_PORT}/0"
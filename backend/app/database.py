@@ -1,34 +1,451 @@
-from supabase import create_client, Client
 from app.config import settings
+from app.services.metrics import DB_POOL_WAIT, observe_db_query
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
 from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import deque
+from typing import Dict, Optional
+from uuid import uuid4
+import logging
+import os
+import threading
+import time
 
+logger = logging.getLogger(__name__)
 
-# Supabase client for storage and auth
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
 
-# Service role client for admin operations
-supabase_admin: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+_supabase_clients: Dict[bool, object] = {}
+_supabase_lock = threading.Lock()
+
+
+def get_supabase_client(admin: bool = False):
+    """
+    Supabase client for storage and auth, or the service role client for
+    admin operations. Created on first use: the SDK (httpx, postgrest,
+    realtime, ...) is a large import that most processes never need.
+    """
+    client = _supabase_clients.get(admin)
+    if client is None:
+        with _supabase_lock:
+            client = _supabase_clients.get(admin)
+            if client is None:
+                from supabase import create_client
+                key = settings.SUPABASE_SERVICE_KEY if admin else settings.SUPABASE_KEY
+                client = _supabase_clients[admin] = create_client(settings.SUPABASE_URL, key)
+    return client
+
+
+def __getattr__(name: str):
+    # `from app.database import supabase` keeps working, lazily
+    if name == "supabase":
+        return get_supabase_client()
+    if name == "supabase_admin":
+        return get_supabase_client(admin=True)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within DB_POOL_TIMEOUT"""
+    pass
+
+
+class TransactionAborted(Exception):
+    """Raised when a unit of work ends after one of its statements failed"""
+    pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe psycopg2 connection pool.
+
+    - keeps between min_size and max_size connections
+    - closes connections idle longer than max_idle or older than max_lifetime
+    - pings connections that sat idle before handing them out (pre-ping)
+    - blocks up to `timeout` seconds when exhausted instead of failing
+    """
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int,
+        max_size: int,
+        max_idle: float,
+        max_lifetime: float,
+        timeout: float,
+        ping_after: float
+    ):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self.pid = os.getpid()
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (conn, created_at, last_used)
+        self._created_at: Dict[int, float] = {}
+        self._size = 0
+
+        # Metrics
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+        self.connections_created = 0
+        self.connections_recycled = 0
+        self.ping_failures = 0
+
+    def _connect(self):
+        conn = psycopg2.connect(self.dsn, cursor_factory=RealDictCursor)
+        self._created_at[id(conn)] = time.monotonic()
+        self.connections_created += 1
+        return conn
+
+    def _discard(self, conn):
+        self._created_at.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_expired(self, created_at: float, last_used: float, now: float) -> bool:
+        if now - created_at > self.max_lifetime:
+            return True
+        return now - last_used > self.max_idle and self._size > self.min_size
+
+    def _sweep(self, now: float):
+        # Idle connections are reused LIFO, so the stalest sit at the left end
+        while self._idle:
+            conn, created_at, last_used = self._idle[0]
+            if not (conn.closed or self._is_expired(created_at, last_used, now)):
+                break
+            self._idle.popleft()
+            self._size -= 1
+            self.connections_recycled += 1
+            self._discard(conn)
+
+    def _ping(self, conn) -> bool:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            self.ping_failures += 1
+            return False
+
+    def fill(self):
+        """Open connections until min_size are available."""
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                raise
+            with self._cond:
+                self._idle.append((conn, self._created_at[id(conn)], time.monotonic()))
+                self._cond.notify()
+
+    def getconn(self):
+        """Check out a healthy connection, waiting if the pool is exhausted."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+
+        while True:
+            conn = None
+            needs_ping = False
+            create = False
+
+            with self._cond:
+                while conn is None and not create:
+                    now = time.monotonic()
+                    self._sweep(now)
+                    while self._idle:
+                        candidate, created_at, last_used = self._idle.pop()
+                        if candidate.closed or self._is_expired(created_at, last_used, now):
+                            self._size -= 1
+                            self.connections_recycled += 1
+                            self._discard(candidate)
+                            continue
+                        conn = candidate
+                        needs_ping = now - last_used > self.ping_after
+                        break
+
+                    if conn is None:
+                        if self._size < self.max_size:
+                            self._size += 1
+                            create = True
+                        else:
+                            remaining = deadline - now
+                            if remaining <= 0:
+                                raise PoolTimeout(
+                                    f"No database connection available after {self.timeout}s "
+                                    f"({self._size}/{self.max_size} checked out)"
+                                )
+                            waited = True
+                            self._cond.wait(remaining)
+
+            if create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif needs_ping and not self._ping(conn):
+                # Stale connection (server restart, idle timeout); replace it
+                with self._cond:
+                    self._size -= 1
+                    self.connections_recycled += 1
+                self._discard(conn)
+                continue
+
+            wait_time = time.monotonic() - start
+            DB_POOL_WAIT.observe(wait_time)
+            with self._cond:
+                self.checkouts += 1
+                if waited:
+                    self.waits += 1
+                self.wait_time_total += wait_time
+                self.wait_time_max = max(self.wait_time_max, wait_time)
+            return conn
+
+    def putconn(self, conn, discard: bool = False):
+        """Return a connection to the pool (or close it if broken)."""
+        if not conn.closed and not discard:
+            try:
+                if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            if conn.closed or discard:
+                self._size -= 1
+                self._discard(conn)
+            else:
+                created_at = self._created_at.get(id(conn), time.monotonic())
+                self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "checked_out": self._size - len(self._idle),
+                "max_size": self.max_size,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_time_total_s": round(self.wait_time_total, 4),
+                "wait_time_max_s": round(self.wait_time_max, 4),
+                "connections_created": self.connections_created,
+                "connections_recycled": self.connections_recycled,
+                "ping_failures": self.ping_failures
+            }
+
+    def close_all(self):
+        with self._cond:
+            while self._idle:
+                conn, _, _ = self._idle.pop()
+                self._size -= 1
+                self._discard(conn)
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+# Pools inherited across a fork. Their sockets belong to the parent, so the
+# child must neither use nor close them (closing sends a Terminate message
+# on the shared socket); keeping a reference stops the GC from doing so.
+_inherited_pools = []
+
+# Active unit of work in this thread/task, if any
+_current_unit: ContextVar = ContextVar("current_unit_of_work", default=None)
+
+
+class _UnitOfWork:
+    """Connection holder for unit_of_work(); checked out on first query."""
+    def __init__(self):
+        self.pool: Optional[ConnectionPool] = None
+        self.conn = None
+        # First statement error; Postgres rejects everything after it
+        self.error: Optional[BaseException] = None
+        self.savepoints = 0
+
+    def connection(self):
+        if self.conn is None:
+            self.pool = get_pool()
+            self.conn = self.pool.getconn()
+        return self.conn
+
+
+def get_pool() -> ConnectionPool:
+    """Return this process's pool, creating a fresh one after fork."""
+    global _pool
+
+    pool = _pool
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            if _pool is not None:
+                _inherited_pools.append(_pool)
+            _pool = ConnectionPool(
+                settings.DATABASE_URL,
+                min_size=settings.DB_POOL_MIN_SIZE,
+                max_size=settings.DB_POOL_MAX_SIZE,
+                max_idle=settings.DB_POOL_MAX_IDLE,
+                max_lifetime=settings.DB_POOL_MAX_LIFETIME,
+                timeout=settings.DB_POOL_TIMEOUT,
+                ping_after=settings.DB_POOL_PING_AFTER
+            )
+            try:
+                _pool.fill()
+            except Exception as e:
+                # Connections are opened on demand; getconn() will surface real errors
+                logger.warning(f"Failed to pre-open database connections: {str(e)}")
+        return _pool
+
+
+def _reset_pool_after_fork():
+    global _pool, _pool_lock
+    if _pool is not None:
+        _inherited_pools.append(_pool)
+    _pool = None
+    _pool_lock = threading.Lock()
+    _current_unit.set(None)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
+
+def get_pool_stats() -> Dict:
+    """Pool metrics for monitoring (checked-out connections, wait time, ...)"""
+    return get_pool().stats()
 
 
 @contextmanager
 def get_db_connection():
     """Context manager for database connections"""
-    conn = psycopg2.connect(settings.DATABASE_URL, cursor_factory=RealDictCursor)
+    unit = _current_unit.get()
+    if unit is not None:
+        # Inside unit_of_work(): share its connection; it commits at the end
+        conn = unit.connection()
+        try:
+            yield conn
+        except Exception as e:
+            # The transaction is aborted even if the caller swallows this
+            if unit.error is None:
+                unit.error = e
+            raise
+        return
+
+    pool = get_pool()
+    conn = pool.getconn()
+    broken = False
     try:
         yield conn
         conn.commit()
     except Exception as e:
-        conn.rollback()
+        try:
+            conn.rollback()
+        except Exception:
+            broken = True
+        if isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+            broken = True
         raise e
     finally:
-        conn.close()
+        pool.putconn(conn, discard=broken)
+
+
+@contextmanager
+def unit_of_work():
+    """
+    Run several execute_query/execute_query_one calls on one pooled
+    connection inside a single transaction. Commits on success, rolls back
+    on error. Nested units of work join the outer one. The connection is
+    only checked out when the first query runs.
+    
+    A failed statement aborts the whole transaction, so if its error was
+    caught inside the unit, the unit rolls back and raises
+    TransactionAborted instead of committing. Statements allowed to fail
+    belong in savepoint().
+    """
+    if _current_unit.get() is not None:
+        yield
+        return
+
+    unit = _UnitOfWork()
+    token = _current_unit.set(unit)
+    broken = False
+    try:
+        yield
+        if unit.error is not None:
+            raise TransactionAborted(
+                f"Unit of work rolled back after a failed statement: {str(unit.error)}"
+            ) from unit.error
+        if unit.conn is not None:
+            unit.conn.commit()
+    except Exception as e:
+        if unit.conn is not None:
+            try:
+                unit.conn.rollback()
+            except Exception:
+                broken = True
+        if isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+            broken = True
+        raise e
+    finally:
+        _current_unit.reset(token)
+        if unit.conn is not None:
+            unit.pool.putconn(unit.conn, discard=broken)
+
+
+@contextmanager
+def savepoint():
+    """
+    Run best-effort statements so that, inside unit_of_work(), their
+    failure only rolls back to a SAVEPOINT and the rest of the unit still
+    commits. Outside a unit every statement has its own transaction, so
+    this does nothing.
+    """
+    unit = _current_unit.get()
+    if unit is None or unit.error is not None:
+        yield
+        return
+
+    conn = unit.connection()
+    name = f"best_effort_{unit.savepoints}"
+    unit.savepoints += 1
+    with conn.cursor() as cursor:
+        cursor.execute(f"SAVEPOINT {name}")
+    try:
+        yield
+    except Exception:
+        with conn.cursor() as cursor:
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+        unit.error = None
+        raise
+    with conn.cursor() as cursor:
+        cursor.execute(f"RELEASE SAVEPOINT {name}")
 
 
 def execute_query(query: str, params: tuple = None, fetch: bool = True):
     """Execute a database query with parameters"""
-    with get_db_connection() as conn:
+    with observe_db_query(query), get_db_connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute(query, params)
             if fetch:
@@ -38,7 +455,52 @@ def execute_query(query: str, params: tuple = None, fetch: bool = True):
 
 def execute_query_one(query: str, params: tuple = None):
     """Execute a query and return one result"""
-    with get_db_connection() as conn:
+    with observe_db_query(query), get_db_connection() as conn:
         with conn.cursor() as cursor:
             cursor.execute(query, params)
             return cursor.fetchone()
+
+
+def iter_query_batches(query: str, params: tuple = None, batch_size: int = 1000):
+    """
+    Yield the rows of a large SELECT in lists of up to batch_size, read
+    through a server-side (named) cursor so the full result set is never
+    held in memory. The cursor has its own connection; writes made while
+    iterating (e.g. deleting each batch) commit independently of it.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    broken = False
+    try:
+        with conn.cursor(name=f"batch_{uuid4().hex}") as cursor:
+            cursor.itersize = batch_size
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        conn.commit()
+    except Exception as e:
+        try:
+            conn.rollback()
+        except Exception:
+            broken = True
+        if isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+            broken = True
+        raise e
+    finally:
+        pool.putconn(conn, discard=broken)
+
+
+def execute_values_query(query: str, argslist, template: str = None, fetch: bool = False, page_size: int = 500):
+    """
+    Execute a multi-row statement (``VALUES %s``) for many parameter tuples,
+    expanding them into as few round-trips as page_size allows.
+    """
+    with observe_db_query(query), get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            result = execute_values(cursor, query, argslist, template=template, page_size=page_size, fetch=fetch)
+            if fetch:
+                return result
+            return cursor.rowcount
@@ -1,9 +1,11 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.routers import upload, evaluate, result
 from app.middleware.error_middleware import setup_exception_handlers
-from app.middleware.logging_middleware import log_requests_middleware
+from app.middleware.metrics_middleware import request_metrics_middleware
+from app.services.metrics import render_metrics
+from app.services.job_events import shutdown_job_event_broker
 import os
 import logging
 
@@ -64,8 +66,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add logging middleware
-app.middleware("http")(log_requests_middleware)
+# Add request metrics middleware
+app.middleware("http")(request_metrics_middleware)
 
 # Setup exception handlers
 setup_exception_handlers(app)
@@ -91,6 +93,18 @@ async def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint (every API process in multiprocess mode)"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.on_event("shutdown")
+async def close_job_event_broker():
+    await shutdown_job_event_broker()
+
 # Include routers
 app.include_router(upload.router, prefix="/api", tags=["Upload"])
 app.include_router(evaluate.router, prefix="/api", tags=["Evaluation"])
@@ -0,0 +1,34 @@
+from fastapi import Request
+from app.services.metrics import HTTP_REQUEST_DURATION
+import time
+from typing import Callable
+
+
+async def request_metrics_middleware(request: Request, call_next: Callable):
+    """
+    Middleware to record every request's processing time in the
+    http_request_duration_seconds histogram.
+    
+    Requests are labelled by route template (/api/result/{job_id}), not
+    by raw path, so job IDs don't create a series each.
+    """
+    start_time = time.perf_counter()
+    status = 500
+    
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        process_time = time.perf_counter() - start_time
+        # The router stores the matched route in the scope
+        route = request.scope.get("route")
+        HTTP_REQUEST_DURATION.labels(
+            request.method,
+            getattr(route, "path", "unmatched"),
+            str(status)
+        ).observe(process_time)
+    
+    # Add processing time header
+    response.headers["X-Process-Time"] = str(process_time)
+    
+    return response
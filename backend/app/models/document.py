@@ -18,6 +18,7 @@ class DocumentResponse(BaseModel):
     file_path: str
     file_size: int
     mime_type: str
+    file_hash: Optional[str] = None  # SHA-256 of the file contents
     uploaded_at: datetime
     
     class Config:
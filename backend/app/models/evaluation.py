@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from uuid import UUID
 
@@ -18,6 +18,53 @@ class EvaluationJobResponse(BaseModel):
         from_attributes = True
 
 
+class EvaluationPair(BaseModel):
+    cv_document_id: UUID
+    project_document_id: UUID
+
+
+class BatchEvaluationRequest(BaseModel):
+    job_title: str = Field(..., min_length=1, max_length=255)
+    candidates: List[EvaluationPair] = Field(..., min_length=1)
+
+
+class BatchProgress(BaseModel):
+    total: int
+    queued: int = 0
+    processing: int = 0
+    completed: int = 0
+    failed: int = 0  # failed for good (no retry left)
+    retrying: int = 0  # failed, waiting for a retry
+    
+    @classmethod
+    def from_batch(cls, batch: dict) -> "BatchProgress":
+        return cls(
+            total=batch['total_jobs'],
+            queued=batch['queued'],
+            processing=batch['processing'],
+            completed=batch['completed'],
+            failed=batch['failed'],
+            retrying=batch['retrying']
+        )
+    
+    @property
+    def status(self) -> str:
+        if self.completed + self.failed >= self.total:
+            return 'completed'
+        if self.queued >= self.total:
+            return 'queued'
+        return 'processing'
+
+
+class BatchEvaluationResponse(BaseModel):
+    id: UUID
+    job_title: str
+    status: str  # 'queued', 'processing', 'completed' (every job finished, some may have failed)
+    progress: BatchProgress
+    job_ids: Optional[List[UUID]] = None
+    created_at: datetime
+
+
 class EvaluationResult(BaseModel):
     cv_match_rate: Optional[float] = None
     cv_feedback: Optional[str] = None
@@ -36,3 +83,15 @@ class EvaluationResultResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class BatchResultItem(EvaluationResultResponse):
+    cv_document_id: UUID
+    project_document_id: UUID
+
+
+class BatchResultsResponse(BaseModel):
+    id: UUID
+    status: str
+    progress: BatchProgress
+    results: List[BatchResultItem]
@@ -1,7 +1,16 @@
-from fastapi import APIRouter, HTTPException
-from app.models.evaluation import EvaluationRequest, EvaluationJobResponse
+from fastapi import APIRouter, HTTPException, Path
+from app.models.evaluation import (
+    EvaluationRequest,
+    EvaluationJobResponse,
+    BatchEvaluationRequest,
+    BatchEvaluationResponse,
+    BatchProgress
+)
 from app.services.evaluation_service import EvaluationService
-from app.tasks.evaluation_tasks import run_evaluation_pipeline
+from app.services.job_events import get_job_event_publisher
+from app.tasks.dispatch import enqueue_evaluation_pipeline, enqueue_evaluation_pipelines
+from app.config import settings
+from uuid import UUID
 
 router = APIRouter()
 evaluation_service = EvaluationService()
@@ -50,7 +59,8 @@ async def create_evaluation(request: EvaluationRequest):
         )
 
         # Kick off async pipeline
-        run_evaluation_pipeline.delay(str(job["id"]))
+        get_job_event_publisher().publish(job["id"], job["status"])
+        enqueue_evaluation_pipeline(job["id"])
 
         return EvaluationJobResponse(
             id=job["id"],
@@ -64,3 +74,107 @@ async def create_evaluation(request: EvaluationRequest):
             status_code=500,
             detail=f"Failed to create evaluation job: {str(e)}"
         )
+
+
+@router.post(
+    "/evaluate/batch",
+    response_model=BatchEvaluationResponse,
+    summary="Start AI Evaluation for Many Candidates",
+    description="""
+Trigger the **AI evaluation pipeline** for many candidates of the same role at once.
+
+You need to provide:
+- `job_title`: The role being evaluated.
+- `candidates`: List of `{cv_document_id, project_document_id}` pairs.
+
+All documents are validated up front; if any is missing nothing is queued.
+Returns a **batch ID** to track aggregate progress via `GET /api/evaluate/batch/{batch_id}`
+and fetch every result via `GET /api/result/batch/{batch_id}`.
+    """
+)
+async def create_evaluation_batch(request: BatchEvaluationRequest):
+    """
+    Create one evaluation job per candidate and queue them together.
+    """
+
+    try:
+        if len(request.candidates) > settings.EVALUATION_BATCH_MAX_SIZE:
+            raise HTTPException(
+                status_code=413,
+                detail=f"A batch can contain at most {settings.EVALUATION_BATCH_MAX_SIZE} candidates"
+            )
+
+        # Verify every document exists with a single query
+        document_ids = [
+            document_id
+            for pair in request.candidates
+            for document_id in (pair.cv_document_id, pair.project_document_id)
+        ]
+        missing = evaluation_service.find_missing_documents(document_ids)
+        if missing:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Documents not found: {', '.join(str(document_id) for document_id in missing)}"
+            )
+
+        # Create the batch and all of its jobs in one transaction
+        batch = evaluation_service.create_evaluation_batch(
+            job_title=request.job_title,
+            document_pairs=[(pair.cv_document_id, pair.project_document_id) for pair in request.candidates]
+        )
+        job_ids = [job["id"] for job in batch["jobs"]]
+
+        # Kick off all pipelines as one group
+        get_job_event_publisher().publish_many(job_ids, "queued")
+        enqueue_evaluation_pipelines(job_ids)
+
+        return BatchEvaluationResponse(
+            id=batch["id"],
+            job_title=batch["job_title"],
+            status="queued",
+            progress=BatchProgress(total=len(job_ids), queued=len(job_ids)),
+            job_ids=job_ids,
+            created_at=batch["created_at"]
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to create evaluation batch: {str(e)}"
+        )
+
+
+@router.get("/evaluate/batch/{batch_id}", response_model=BatchEvaluationResponse)
+async def get_evaluation_batch(
+    batch_id: UUID = Path(..., description="Evaluation batch ID")
+):
+    """
+    Retrieve aggregate progress of an evaluation batch.
+    """
+    try:
+        batch = evaluation_service.get_evaluation_batch(batch_id)
+
+        if not batch:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Evaluation batch with ID {batch_id} not found"
+            )
+
+        progress = BatchProgress.from_batch(batch)
+        return BatchEvaluationResponse(
+            id=batch["id"],
+            job_title=batch["job_title"],
+            status=progress.status,
+            progress=progress,
+            created_at=batch["created_at"]
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to retrieve evaluation batch: {str(e)}"
+        )
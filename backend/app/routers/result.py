@@ -1,13 +1,52 @@
-from fastapi import APIRouter, HTTPException, Path
-from app.models.evaluation import EvaluationResultResponse, EvaluationResult
+from fastapi import APIRouter, HTTPException, Path, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from app.models.evaluation import (
+    EvaluationResultResponse,
+    EvaluationResult,
+    BatchProgress,
+    BatchResultItem,
+    BatchResultsResponse
+)
 from app.services.evaluation_service import EvaluationService
+from app.services.job_events import get_job_event_broker, is_terminal, make_event
+from app.config import settings
 from uuid import UUID
+import asyncio
+import json
 
 
 router = APIRouter()
 evaluation_service = EvaluationService()
 
 
+def build_result_response(job: dict, response_model=EvaluationResultResponse, **extra):
+    """Shape an evaluation_jobs row into its API response"""
+    response = response_model(
+        id=job['id'],
+        status=job['status'],
+        created_at=job['created_at'],
+        completed_at=job.get('completed_at'),
+        **extra
+    )
+    
+    # Add results if completed
+    if job['status'] == 'completed':
+        response.result = EvaluationResult(
+            cv_match_rate=float(job['cv_match_rate']) if job.get('cv_match_rate') else None,
+            cv_feedback=job.get('cv_feedback'),
+            project_score=float(job['project_score']) if job.get('project_score') else None,
+            project_feedback=job.get('project_feedback'),
+            overall_summary=job.get('overall_summary')
+        )
+    
+    # Add error message if failed
+    if job['status'] == 'failed':
+        response.error_message = job.get('error_message')
+    
+    return response
+
+
 @router.get("/result/{job_id}", response_model=EvaluationResultResponse)
 async def get_evaluation_result(
     job_id: UUID = Path(..., description="Evaluation job ID")
@@ -30,33 +69,154 @@ async def get_evaluation_result(
             )
         
         # Build response based on status
-        response = EvaluationResultResponse(
-            id=job['id'],
-            status=job['status'],
-            created_at=job['created_at'],
-            completed_at=job.get('completed_at')
+        return build_result_response(job)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to retrieve evaluation result: {str(e)}"
         )
+
+
+def format_sse(event: dict) -> str:
+    return f"data: {json.dumps(event, default=str)}\n\n"
+
+
+def job_snapshot(job: dict) -> dict:
+    """Event-shaped state of a job read from Postgres (snapshot fallback)"""
+    response = build_result_response(job)
+    return make_event(
+        job['id'],
+        job['status'],
+        result=response.result.model_dump() if response.result else None,
+        error_message=response.error_message
+    ) | {"seq": 0}
+
+
+@router.get(
+    "/result/{job_id}/events",
+    summary="Stream Evaluation Progress",
+    description="""
+**Server-Sent Events** stream of an evaluation job's progress, as an
+alternative to polling `GET /api/result/{job_id}`.
+
+Each event is a JSON object with `job_id`, `status` and, depending on the
+event, `step` (a pipeline step that just finished), `result` (once
+completed) or `error_message` and `will_retry` (on failure). The first
+event is the job's current state; the stream ends after the final result.
+Returns 503 when progress events are disabled (`JOB_EVENTS_ENABLED=false`).
+    """
+)
+async def stream_evaluation_events(
+    request: Request,
+    job_id: UUID = Path(..., description="Evaluation job ID")
+):
+    """
+    Stream status transitions and the final result of an evaluation job.
+    """
+    if not settings.JOB_EVENTS_ENABLED:
+        # Nothing publishes progress events, so a stream would never advance
+        raise HTTPException(
+            status_code=503,
+            detail="Progress events are disabled; poll GET /api/result/{job_id} instead"
+        )
+    
+    broker = get_job_event_broker()
+    try:
+        await broker.start()
+        snapshot = await broker.get_snapshot(job_id)
+        if snapshot is None:
+            # Jobs older than the snapshot TTL: one DB read for this client
+            job = await run_in_threadpool(evaluation_service.get_evaluation_job, job_id)
+            if not job:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Evaluation job with ID {job_id} not found"
+                )
+            snapshot = job_snapshot(job)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Progress events are unavailable: {str(e)}"
+        )
+    
+    async def event_stream():
+        async with broker.subscribe(job_id) as queue:
+            # Re-read now that we're subscribed, so nothing published in
+            # between is lost; older queued events are skipped by sequence
+            latest = await broker.get_snapshot(job_id) or snapshot
+            if latest['seq'] < snapshot['seq']:
+                latest = snapshot
+            yield format_sse(latest)
+            if is_terminal(latest):
+                return
+            
+            last_seq = latest['seq']
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.JOB_EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                if event['seq'] <= last_seq:
+                    continue
+                last_seq = event['seq']
+                yield format_sse(event)
+                if is_terminal(event):
+                    return
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/result/batch/{batch_id}", response_model=BatchResultsResponse)
+async def get_batch_results(
+    batch_id: UUID = Path(..., description="Evaluation batch ID")
+):
+    """
+    Retrieve the status and result of every job in an evaluation batch.
+    """
+    try:
+        batch = evaluation_service.get_evaluation_batch(batch_id)
         
-        # Add results if completed
-        if job['status'] == 'completed':
-            response.result = EvaluationResult(
-                cv_match_rate=float(job['cv_match_rate']) if job.get('cv_match_rate') else None,
-                cv_feedback=job.get('cv_feedback'),
-                project_score=float(job['project_score']) if job.get('project_score') else None,
-                project_feedback=job.get('project_feedback'),
-                overall_summary=job.get('overall_summary')
+        if not batch:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Evaluation batch with ID {batch_id} not found"
             )
         
-        # Add error message if failed
-        if job['status'] == 'failed':
-            response.error_message = job.get('error_message')
+        progress = BatchProgress.from_batch(batch)
+        results = [
+            build_result_response(
+                job,
+                BatchResultItem,
+                cv_document_id=job['cv_document_id'],
+                project_document_id=job['project_document_id']
+            )
+            for job in evaluation_service.get_batch_jobs(batch_id)
+        ]
         
-        return response
+        return BatchResultsResponse(
+            id=batch['id'],
+            status=progress.status,
+            progress=progress,
+            results=results
+        )
     
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to retrieve evaluation result: {str(e)}"
+            detail=f"Failed to retrieve batch results: {str(e)}"
         )
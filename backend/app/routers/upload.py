@@ -1,10 +1,13 @@
 import os
 import base64
+import hashlib
 from uuid import uuid4
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from app.models.document import UploadResponse
 from app.services.document_service import DocumentService
+from app.services.upload_stream import MultipartPDFReceiver, UploadRejected
 from app.config import settings
 
 router = APIRouter()
@@ -69,7 +72,8 @@ async def upload_documents(request: UploadRequest):
                 file_type="cv",
                 file_path=file_path,
                 file_size=len(content),
-                mime_type="application/pdf"
+                mime_type="application/pdf",
+                file_hash=hashlib.sha256(content).hexdigest()
             )
 
         # Handle Project Report
@@ -93,7 +97,8 @@ async def upload_documents(request: UploadRequest):
                 file_type="project_report",
                 file_path=file_path,
                 file_size=len(content),
-                mime_type="application/pdf"
+                mime_type="application/pdf",
+                file_hash=hashlib.sha256(content).hexdigest()
             )
 
         return UploadResponse(
@@ -106,3 +111,83 @@ async def upload_documents(request: UploadRequest):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload documents: {str(e)}")
+
+
+# Multipart form fields -> (file_type, label used in error messages)
+MULTIPART_FIELDS = {
+    "cv": ("cv", "CV"),
+    "project": ("project_report", "Project Report"),
+}
+
+
+@router.post(
+    "/upload/multipart",
+    response_model=UploadResponse,
+    summary="Upload CV & Project Report (multipart/form-data, streamed)",
+    description="""
+Upload CV dan Project Report sebagai file PDF lewat **multipart/form-data**
+(field `cv` dan/atau `project`).  
+File di-stream langsung ke disk per chunk: ukuran dicek selama upload
+(ditolak begitu melewati `MAX_FILE_SIZE`), magic bytes PDF dicek di awal,
+dan SHA-256 dihitung sambil menulis.
+"""
+)
+async def upload_documents_multipart(request: Request):
+    # Reject obviously oversized bodies before reading anything
+    content_length = request.headers.get("content-length")
+    max_body = settings.MAX_FILE_SIZE * len(MULTIPART_FIELDS) + 65536
+    if content_length and content_length.isdigit() and int(content_length) > max_body:
+        raise HTTPException(status_code=413, detail=f"Request body exceeds {max_body} bytes")
+
+    try:
+        receiver = MultipartPDFReceiver(
+            request.headers.get("content-type", ""),
+            settings.UPLOAD_DIR,
+            settings.MAX_FILE_SIZE,
+            MULTIPART_FIELDS
+        )
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    try:
+        async for chunk in request.stream():
+            # Disk writes and hashing happen off the event loop
+            await run_in_threadpool(receiver.feed, chunk)
+        receiver.close()
+    except UploadRejected as e:
+        receiver.abort()
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    except Exception as e:
+        receiver.abort()
+        raise HTTPException(status_code=400, detail=f"Malformed multipart body: {str(e)}")
+
+    if not receiver.writers:
+        raise HTTPException(
+            status_code=400,
+            detail="At least one file (CV or Project Report) must be provided"
+        )
+
+    documents = {}
+    try:
+        for name, writer in receiver.writers.items():
+            file_type, _ = MULTIPART_FIELDS[name]
+            documents[name] = document_service.create_document(
+                filename=os.path.basename(writer.file_path),
+                file_type=file_type,
+                file_path=writer.file_path,
+                file_size=writer.size,
+                mime_type="application/pdf",
+                file_hash=writer.hexdigest
+            )
+    except Exception as e:
+        # Keep files that already have a document row; drop the rest
+        for name, writer in receiver.writers.items():
+            if name not in documents:
+                writer.abort()
+        raise HTTPException(status_code=500, detail=f"Failed to upload documents: {str(e)}")
+
+    return UploadResponse(
+        cv_document=documents.get("cv"),
+        project_document=documents.get("project"),
+        message="Documents uploaded successfully"
+    )
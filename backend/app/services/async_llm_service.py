@@ -0,0 +1,153 @@
+import groq
+from typing import Dict, Optional
+import asyncio
+import os
+import time
+import weakref
+from app.config import settings
+from app.services.llm_service import LLMService, LLM_PROVIDER
+from app.services.metrics import record_llm_call
+from app.utils.retry_logic import retry_llm_call
+
+
+# One semaphore per event loop, shared by every AsyncLLMService in the process.
+# asyncio primitives are bound to the loop they are first used on, so a
+# process that runs several loops (e.g. asyncio.run per task) needs one each.
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+_semaphores_pid = os.getpid()
+
+
+def get_llm_semaphore(max_concurrency: Optional[int] = None) -> asyncio.Semaphore:
+    """
+    Return the per-process semaphore that caps in-flight Groq requests
+    on the running event loop.
+    """
+    global _semaphores, _semaphores_pid
+
+    if _semaphores_pid != os.getpid():
+        _semaphores = weakref.WeakKeyDictionary()
+        _semaphores_pid = os.getpid()
+
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max_concurrency or settings.LLM_MAX_CONCURRENCY)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+class AsyncLLMService(LLMService):
+    """
+    Async variant of LLMService built on groq.AsyncGroq.
+
+    Prompts and response parsing are shared with LLMService; only the
+    transport differs. All instances in a process share one semaphore per
+    event loop, so a single worker can drive many evaluations concurrently
+    without exceeding LLM_MAX_CONCURRENCY requests in flight.
+    """
+    def __init__(self, client=None, max_concurrency: Optional[int] = None):
+        super().__init__(client=client)
+        self.max_concurrency = max_concurrency or settings.LLM_MAX_CONCURRENCY
+
+    def _create_client(self):
+        return groq.AsyncGroq(api_key=settings.GROQ_API_KEY, max_retries=0)
+
+    async def call_llm(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: Optional[float] = None,
+        response_format: Optional[Dict] = None,
+        step: Optional[str] = None,
+        prompt_tokens: Optional[int] = None
+    ) -> Dict:
+        """
+        Call Groq LLM asynchronously with the same caching, retry and error
+        handling as LLMService.call_llm.
+        """
+        start_time = time.time()
+        kwargs = self._build_request(system_prompt, user_prompt, temperature, response_format)
+        self._log_prompt_size(step, prompt_tokens)
+
+        cache_key = self._cache_key(kwargs, step)
+        cached = self._cache_get(cache_key, start_time)
+        if cached is not None:
+            record_llm_call(LLM_PROVIDER, step, cached)
+            return cached
+
+        response = await self._call_api(kwargs, self._reserved_tokens(kwargs, prompt_tokens))
+        response["prompt_tokens_estimate"] = prompt_tokens
+        record_llm_call(LLM_PROVIDER, step, response)
+        self._cache_set(cache_key, response)
+        return response
+
+    async def _call_api(self, kwargs: Dict, reserved_tokens: int) -> Dict:
+        try:
+            return await self._request(kwargs, reserved_tokens)
+        except Exception as e:
+            raise self._wrap_error(e)
+
+    @retry_llm_call
+    async def _request(self, kwargs: Dict, reserved_tokens: int) -> Dict:
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(reserved_tokens)
+
+        try:
+            # Response time excludes the wait for a concurrency slot
+            async with get_llm_semaphore(self.max_concurrency):
+                start_time = time.time()
+                raw = await self.client.chat.completions.with_raw_response.create(**kwargs)
+                response = await raw.parse()
+                formatted = self._format_response(response, start_time)
+        except BaseException as e:
+            if isinstance(e, groq.RateLimitError):
+                await asyncio.to_thread(self._on_rate_limited, e)
+            # Each retry reserves again, so a failed attempt must not keep its budget
+            await asyncio.to_thread(self._release_reservation, e, reserved_tokens)
+            raise
+
+        await asyncio.to_thread(self._sync_rate_limit, raw.headers, reserved_tokens, response)
+        return formatted
+
+    async def parse_cv_to_structured_data(self, cv_text: str) -> Dict:
+        """Step 1: Parse CV into structured data using LLM."""
+        response = await self.call_llm(**self._cv_parsing_prompts(cv_text))
+        return self._cv_parsing_result(response)
+
+    async def evaluate_cv(
+        self,
+        cv_structured_data: Dict,
+        job_title: str,
+        rag_context: str
+    ) -> Dict:
+        """Step 2: Evaluate CV against job requirements using RAG context."""
+        response = await self.call_llm(**self._cv_evaluation_prompts(cv_structured_data, job_title, rag_context))
+        return self._cv_evaluation_result(response)
+
+    async def parse_project_report(self, project_text: str) -> Dict:
+        """Step 3: Parse project report into structured data."""
+        response = await self.call_llm(**self._project_parsing_prompts(project_text))
+        return self._project_parsing_result(response)
+
+    async def evaluate_project_report(
+        self,
+        project_structured_data: Dict,
+        rag_context: str
+    ) -> Dict:
+        """Step 4: Evaluate project report against case study requirements."""
+        response = await self.call_llm(**self._project_evaluation_prompts(project_structured_data, rag_context))
+        return self._project_evaluation_result(response)
+
+    async def generate_overall_summary(
+        self,
+        cv_evaluation: Dict,
+        project_evaluation: Dict,
+        job_title: str
+    ) -> Dict:
+        """Step 5: Synthesize all evaluations into final summary."""
+        response = await self.call_llm(**self._final_analysis_prompts(cv_evaluation, project_evaluation, job_title))
+        return self._final_analysis_result(response)
+
+    async def aclose(self):
+        """Close the underlying HTTP connection pool."""
+        await self.client.close()
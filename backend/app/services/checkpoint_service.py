@@ -0,0 +1,63 @@
+from app.database import execute_query, savepoint
+from psycopg2.extras import Json
+from uuid import UUID
+from typing import Any, Dict
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointService:
+    """
+    Per-job step outputs of the evaluation pipeline, so a retried or
+    redelivered task resumes at the first step that has not completed.
+
+    Failures are logged and never fail the pipeline: without checkpoints
+    the steps simply run again.
+    """
+    def load_checkpoints(self, job_id: UUID) -> Dict[str, Dict[str, Any]]:
+        """Return {step_name: {"input_hash": ..., "output": ...}} for a job"""
+        query = """
+            SELECT step_name, input_hash, output
+            FROM evaluation_checkpoints
+            WHERE evaluation_job_id = %s
+        """
+        try:
+            with savepoint():
+                rows = execute_query(query, (str(job_id),))
+        except Exception as e:
+            logger.warning(f"Failed to load checkpoints for job {job_id}: {str(e)}")
+            return {}
+
+        return {
+            row['step_name']: {"input_hash": row['input_hash'], "output": row['output']}
+            for row in rows
+        }
+
+    def save_checkpoint(self, job_id: UUID, step_name: str, input_hash: str, output: Any):
+        """Store (or replace) the output of one completed step"""
+        query = """
+            INSERT INTO evaluation_checkpoints (evaluation_job_id, step_name, input_hash, output)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (evaluation_job_id, step_name)
+            DO UPDATE SET input_hash = EXCLUDED.input_hash, output = EXCLUDED.output, created_at = NOW()
+        """
+        try:
+            with savepoint():
+                execute_query(
+                    query,
+                    (str(job_id), step_name, input_hash, Json(output, dumps=lambda o: json.dumps(o, default=str))),
+                    fetch=False
+                )
+        except Exception as e:
+            logger.warning(f"Failed to save checkpoint '{step_name}' for job {job_id}: {str(e)}")
+
+    def clear_checkpoints(self, job_id: UUID):
+        """Drop a job's checkpoints once its results are stored"""
+        query = "DELETE FROM evaluation_checkpoints WHERE evaluation_job_id = %s"
+        try:
+            with savepoint():
+                execute_query(query, (str(job_id),), fetch=False)
+        except Exception as e:
+            logger.warning(f"Failed to clear checkpoints for job {job_id}: {str(e)}")
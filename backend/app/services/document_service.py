@@ -10,24 +10,25 @@ class DocumentService:
         file_type: str,
         file_path: str,
         file_size: int,
-        mime_type: str
+        mime_type: str,
+        file_hash: Optional[str] = None
     ) -> Dict:
         """Create a new document record in the database"""
         query = """
-            INSERT INTO documents (filename, file_type, file_path, file_size, mime_type)
-            VALUES (%s, %s, %s, %s, %s)
-            RETURNING id, filename, file_type, file_path, file_size, mime_type, uploaded_at
+            INSERT INTO documents (filename, file_type, file_path, file_size, mime_type, file_hash)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            RETURNING id, filename, file_type, file_path, file_size, mime_type, file_hash, uploaded_at
         """
         result = execute_query_one(
             query,
-            (filename, file_type, file_path, file_size, mime_type)
+            (filename, file_type, file_path, file_size, mime_type, file_hash)
         )
         return dict(result)
     
     def get_document(self, document_id: UUID) -> Optional[Dict]:
         """Get a document by ID"""
         query = """
-            SELECT id, filename, file_type, file_path, file_size, mime_type, uploaded_at
+            SELECT id, filename, file_type, file_path, file_size, mime_type, file_hash, uploaded_at
             FROM documents
             WHERE id = %s
         """
@@ -0,0 +1,180 @@
+from app.config import settings
+from typing import List, Optional
+import numpy as np
+import json
+import os
+import threading
+
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+MANIFEST_FILE = "embedder.json"
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def cosine_agreement(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity between two embedding matrices"""
+    return np.sum(_normalize_rows(reference) * _normalize_rows(candidate), axis=1)
+
+
+class Embedder:
+    """
+    Text -> float32 vectors for RAGService. The model is loaded on first
+    use, so building an embedder costs nothing until something is encoded.
+
+    model_id names the model and backend variant; it keys the embedding
+    cache and goes into reference document hashes, so switching backends
+    never mixes vectors from different models.
+    """
+    model_id: str
+
+    def encode(self, texts: List[str], batch_size: int, normalize: bool) -> np.ndarray:
+        raise NotImplementedError
+
+    @property
+    def dimension(self) -> int:
+        raise NotImplementedError
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """The PyTorch sentence-transformers model (reference implementation)"""
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME):
+        self.model_name = model_name
+        self.model_id = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    # Imports torch; deferred so processes that never embed skip it
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def encode(self, texts, batch_size, normalize):
+        embeddings = self.model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=normalize,
+            show_progress_bar=False
+        )
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+
+class OnnxEmbedder(Embedder):
+    """
+    The same model exported to ONNX (scripts/export_onnx_embedding_model.py)
+    and run with ONNX Runtime on CPU, without importing torch.
+
+    `model_dir` holds model.onnx, optionally model.int8.onnx (dynamic int8
+    quantization), tokenizer.json and an embedder.json manifest with the
+    pooling settings and the cosine agreement measured against
+    sentence-transformers at export time. A variant whose recorded
+    agreement is below min_cosine (or was never verified) is refused;
+    min_cosine=None skips the check (used by the export script itself).
+    """
+    def __init__(
+        self,
+        model_dir: str,
+        quantized: bool = False,
+        threads: int = 0,
+        min_cosine: Optional[float] = 0.99
+    ):
+        self.model_dir = model_dir
+        self.variant = "int8" if quantized else "fp32"
+        self.threads = threads
+        with open(os.path.join(model_dir, MANIFEST_FILE), "r") as f:
+            self.manifest = json.load(f)
+
+        if self.variant not in self.manifest["files"]:
+            raise ValueError(f"No {self.variant} ONNX model in {model_dir}; re-run the export script")
+        agreement = self.manifest.get("min_cosine", {}).get(self.variant)
+        if min_cosine is not None and (agreement is None or agreement < min_cosine):
+            raise ValueError(
+                f"ONNX {self.variant} embeddings in {model_dir} agree with "
+                f"{self.manifest['model_name']} to cosine {agreement}, below {min_cosine}"
+            )
+
+        self.model_id = f"{self.manifest['model_name']}:onnx-{self.variant}"
+        self._session = None
+        self._tokenizer = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._session is not None:
+            return
+        with self._lock:
+            if self._session is not None:
+                return
+            import onnxruntime
+            from tokenizers import Tokenizer
+
+            tokenizer = Tokenizer.from_file(os.path.join(self.model_dir, "tokenizer.json"))
+            tokenizer.enable_truncation(max_length=self.manifest["max_seq_length"])
+            tokenizer.enable_padding(pad_id=self.manifest["pad_token_id"], pad_token=self.manifest["pad_token"])
+
+            options = onnxruntime.SessionOptions()
+            options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if self.threads:
+                options.intra_op_num_threads = self.threads
+            session = onnxruntime.InferenceSession(
+                os.path.join(self.model_dir, self.manifest["files"][self.variant]),
+                options,
+                providers=["CPUExecutionProvider"]
+            )
+            self._input_names = {model_input.name for model_input in session.get_inputs()}
+            self._tokenizer = tokenizer
+            self._session = session
+
+    def encode(self, texts, batch_size, normalize):
+        self._load()
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+
+        # Length-sorted batches keep padding (and wasted compute) small
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            encodings = self._tokenizer.encode_batch([texts[i] for i in rows])
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self._input_names:
+                feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+            hidden = self._session.run(None, feeds)[0]
+            # Mean pooling over real tokens, as the sentence-transformers Pooling layer does
+            mask = attention_mask[:, :, None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            embeddings[rows] = pooled
+
+        if self.manifest.get("normalize") or normalize:
+            embeddings = _normalize_rows(embeddings)
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+    @property
+    def dimension(self) -> int:
+        return self.manifest["dimension"]
+
+
+def create_embedder(backend: Optional[str] = None) -> Embedder:
+    """Build the backend selected by EMBEDDING_BACKEND ('sentence-transformers' or 'onnx')"""
+    backend = (backend or settings.EMBEDDING_BACKEND).lower()
+    if backend == "sentence-transformers":
+        return SentenceTransformerEmbedder(EMBEDDING_MODEL_NAME)
+    if backend == "onnx":
+        return OnnxEmbedder(
+            settings.EMBEDDING_ONNX_DIR,
+            quantized=settings.EMBEDDING_ONNX_QUANTIZED,
+            threads=settings.EMBEDDING_ONNX_THREADS,
+            min_cosine=settings.EMBEDDING_ONNX_MIN_COSINE
+        )
+    raise ValueError(f"Unknown embedding backend '{backend}'")
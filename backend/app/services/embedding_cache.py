@@ -0,0 +1,177 @@
+from app.config import settings
+from typing import List, Optional, Sequence
+import numpy as np
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+# SQLite's default limit on host parameters per statement is 999
+_LOOKUP_CHUNK = 500
+
+
+def text_hash(text: str) -> str:
+    """Hash of the text after NFC and whitespace normalization"""
+    normalized = " ".join(unicodedata.normalize("NFC", text).split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache keyed by (model name, normalized text hash),
+    shared by the worker processes of a node.
+
+    Vectors are stored as raw float32 blobs (1.5 KB for a 384-d MiniLM
+    vector) in SQLite with a last-access column; rows beyond max_entries
+    are evicted least recently used first. Lookups are batched so callers
+    can encode all misses in one forward pass.
+    """
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+        # Metrics (this process)
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite handles must not cross a fork
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embedding_cache (
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embedding_cache_last_access ON embedding_cache(last_access)")
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Cached vector per text, None for misses. Errors count as misses."""
+        hashes = [text_hash(text) for text in texts]
+        found = {}
+        try:
+            with self._lock:
+                conn = self._connection()
+                unique = list(dict.fromkeys(hashes))
+                for start in range(0, len(unique), _LOOKUP_CHUNK):
+                    chunk = unique[start:start + _LOOKUP_CHUNK]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = conn.execute(
+                        f"SELECT text_hash, dim, vector FROM embedding_cache "
+                        f"WHERE model = ? AND text_hash IN ({placeholders})",
+                        [model, *chunk]
+                    ).fetchall()
+                    for key, dim, blob in rows:
+                        found[key] = np.frombuffer(blob, dtype=np.float32, count=dim)
+                if found:
+                    now = time.time()
+                    conn.executemany(
+                        "UPDATE embedding_cache SET last_access = ? WHERE model = ? AND text_hash = ?",
+                        [(now, model, key) for key in found]
+                    )
+                    conn.commit()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Embedding cache lookup failed: {str(e)}")
+            found = {}
+
+        vectors = [found.get(key) for key in hashes]
+        hits = sum(vector is not None for vector in vectors)
+        self.hits += hits
+        self.misses += len(vectors) - hits
+        return vectors
+
+    def set_many(self, model: str, texts: Sequence[str], vectors: np.ndarray):
+        """Store vectors, then evict least recently used rows beyond max_entries"""
+        now = time.time()
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        rows = [
+            (model, text_hash(text), int(vector.shape[0]), vector.tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        if not rows:
+            return
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache (model, text_hash, dim, vector, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                conn.execute("""
+                    DELETE FROM embedding_cache WHERE rowid IN (
+                        SELECT rowid FROM embedding_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_entries,))
+                conn.commit()
+        except sqlite3.Error as e:
+            self.errors += 1
+            logger.warning(f"Failed to store {len(rows)} embeddings in cache: {str(e)}")
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM embedding_cache")
+            conn.commit()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        try:
+            entries = self.count()
+        except sqlite3.Error:
+            entries = None
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "errors": self.errors
+        }
+
+
+_cache = None
+_cache_pid = None
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Process-wide embedding cache, or None if EMBEDDING_CACHE_ENABLED is off"""
+    global _cache, _cache_pid
+
+    if _cache_pid == os.getpid():
+        return _cache
+
+    if settings.EMBEDDING_CACHE_ENABLED:
+        _cache = EmbeddingCache(settings.EMBEDDING_CACHE_PATH, settings.EMBEDDING_CACHE_MAX_ENTRIES)
+    else:
+        _cache = None
+
+    _cache_pid = os.getpid()
+    return _cache
@@ -0,0 +1,173 @@
+from app.database import execute_values_query
+from app.config import settings
+from collections import deque
+from typing import Optional, Tuple
+import atexit
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Rows for jobs deleted before the flush (cleanup, cascade) are skipped by
+# the join instead of failing the whole batch on the foreign key.
+INSERT_LOGS_QUERY = """
+    INSERT INTO evaluation_logs
+    (evaluation_job_id, step_name, llm_provider, llm_model,
+     prompt_tokens, completion_tokens, total_tokens, response_time_ms,
+     status, error_message, cached)
+    SELECT v.*
+    FROM (VALUES %s) AS v(evaluation_job_id, step_name, llm_provider, llm_model,
+                          prompt_tokens, completion_tokens, total_tokens, response_time_ms,
+                          status, error_message, cached)
+    JOIN evaluation_jobs j ON j.id = v.evaluation_job_id
+"""
+INSERT_LOGS_TEMPLATE = "(%s::uuid, %s, %s, %s, %s::int, %s::int, %s::int, %s::int, %s, %s, %s::boolean)"
+
+
+class EvaluationLogBuffer:
+    """
+    In-memory buffer for evaluation_logs rows, written with one multi-row
+    INSERT per flush instead of one connection and INSERT per step.
+
+    The pipeline flushes when a job finishes or fails; a background thread
+    also flushes every flush_interval seconds (or once batch_size rows are
+    pending), batching rows across jobs run by the same worker process.
+    Rows from a failed flush are put back and retried; only if more than
+    max_pending rows pile up are the oldest dropped.
+    """
+    def __init__(
+        self,
+        flush_interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        max_pending: Optional[int] = None
+    ):
+        self.flush_interval = flush_interval or settings.EVALUATION_LOG_FLUSH_INTERVAL
+        self.batch_size = batch_size or settings.EVALUATION_LOG_BATCH_SIZE
+        self.max_pending = max_pending or settings.EVALUATION_LOG_MAX_PENDING
+        self._pending = deque()
+        self._lock = threading.Lock()
+        # Serializes flushes so rows are written once and in order
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.pid = os.getpid()
+
+        # Metrics
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.flushes = 0
+        self.flush_failures = 0
+
+    def add(self, row: Tuple):
+        pending = self._enqueue([row])
+        self._ensure_flusher()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """Write all pending rows in one statement; returns rows written"""
+        with self._flush_lock:
+            with self._lock:
+                rows = list(self._pending)
+                self._pending.clear()
+            if not rows:
+                return 0
+
+            try:
+                execute_values_query(INSERT_LOGS_QUERY, rows, template=INSERT_LOGS_TEMPLATE, page_size=len(rows))
+            except Exception as e:
+                self.flush_failures += 1
+                self._enqueue(rows, front=True)
+                logger.warning(f"Failed to write {len(rows)} evaluation log rows, will retry: {str(e)}")
+                return 0
+
+            self.flushes += 1
+            self.rows_written += len(rows)
+            return len(rows)
+
+    def _enqueue(self, rows, front: bool = False) -> int:
+        """Add rows (failed ones go back in front), dropping the oldest beyond max_pending"""
+        with self._lock:
+            if front:
+                self._pending.extendleft(reversed(rows))
+            else:
+                self._pending.extend(rows)
+            overflow = len(self._pending) - self.max_pending
+            for _ in range(max(overflow, 0)):
+                self._pending.popleft()
+            pending = len(self._pending)
+        if overflow > 0:
+            self.rows_dropped += overflow
+            logger.error(f"Evaluation log buffer full, dropped {overflow} oldest rows")
+        return pending
+
+    def _ensure_flusher(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name="evaluation-log-flusher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Evaluation log flusher error: {str(e)}")
+
+    def close(self):
+        """Stop the background flusher and write what is left"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def stats(self):
+        return {
+            "pending": self.pending(),
+            "rows_written": self.rows_written,
+            "rows_dropped": self.rows_dropped,
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures
+        }
+
+
+_buffer: Optional[EvaluationLogBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def get_evaluation_log_buffer() -> EvaluationLogBuffer:
+    """This process's buffer; a forked child starts with an empty one"""
+    global _buffer
+    buffer = _buffer
+    if buffer is not None and buffer.pid == os.getpid():
+        return buffer
+    with _buffer_lock:
+        if _buffer is None or _buffer.pid != os.getpid():
+            _buffer = EvaluationLogBuffer()
+        return _buffer
+
+
+def flush_evaluation_logs():
+    """Write pending rows of this process, if it has a buffer"""
+    if _buffer is not None and _buffer.pid == os.getpid():
+        _buffer.flush()
+
+
+def shutdown_evaluation_log_buffer():
+    if _buffer is not None and _buffer.pid == os.getpid():
+        _buffer.close()
+
+
+atexit.register(shutdown_evaluation_log_buffer)
@@ -1,6 +1,7 @@
-from app.database import execute_query, execute_query_one
+from app.database import execute_query, execute_query_one, execute_values_query, unit_of_work
+from app.services.evaluation_log_buffer import get_evaluation_log_buffer, flush_evaluation_logs
 from uuid import UUID
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Sequence, Tuple
 
 
 class EvaluationService:
@@ -10,6 +11,14 @@ class EvaluationService:
         result = execute_query_one(query, (str(document_id),))
         return result['exists'] if result else False
     
+    def find_missing_documents(self, document_ids: Sequence[UUID]) -> List[UUID]:
+        """Return the IDs from document_ids that don't exist, using one query"""
+        unique_ids = list(dict.fromkeys(str(document_id) for document_id in document_ids))
+        query = "SELECT id FROM documents WHERE id = ANY(%s::uuid[])"
+        rows = execute_query(query, (unique_ids,))
+        found = {str(row['id']) for row in rows}
+        return [UUID(document_id) for document_id in unique_ids if document_id not in found]
+    
     def create_evaluation_job(
         self,
         job_title: str,
@@ -28,6 +37,69 @@ class EvaluationService:
         )
         return dict(result)
     
+    def create_evaluation_batch(
+        self,
+        job_title: str,
+        document_pairs: List[Tuple[UUID, UUID]]
+    ) -> Dict:
+        """
+        Create a batch and one queued evaluation job per (cv, project) pair
+        in a single transaction (one multi-row insert for the jobs).
+        """
+        batch_query = """
+            INSERT INTO evaluation_batches (job_title, total_jobs)
+            VALUES (%s, %s)
+            RETURNING id, job_title, total_jobs, created_at
+        """
+        jobs_query = """
+            INSERT INTO evaluation_jobs (job_title, cv_document_id, project_document_id, status, batch_id)
+            VALUES %s
+            RETURNING id, cv_document_id, project_document_id, status
+        """
+        with unit_of_work():
+            batch = dict(execute_query_one(batch_query, (job_title, len(document_pairs))))
+            jobs = execute_values_query(
+                jobs_query,
+                [
+                    (job_title, str(cv_document_id), str(project_document_id), 'queued', str(batch['id']))
+                    for cv_document_id, project_document_id in document_pairs
+                ],
+                template="(%s, %s, %s, %s, %s)",
+                fetch=True,
+                page_size=len(document_pairs)
+            )
+        batch['jobs'] = [dict(job) for job in jobs]
+        return batch
+    
+    def get_evaluation_batch(self, batch_id: UUID) -> Optional[Dict]:
+        """Get a batch with per-status job counts"""
+        query = """
+            SELECT b.id, b.job_title, b.total_jobs, b.created_at,
+                   COUNT(j.id) FILTER (WHERE j.status = 'queued') AS queued,
+                   COUNT(j.id) FILTER (WHERE j.status = 'processing') AS processing,
+                   COUNT(j.id) FILTER (WHERE j.status = 'completed') AS completed,
+                   COUNT(j.id) FILTER (WHERE j.status = 'failed' AND NOT j.retry_pending) AS failed,
+                   COUNT(j.id) FILTER (WHERE j.status = 'failed' AND j.retry_pending) AS retrying
+            FROM evaluation_batches b
+            LEFT JOIN evaluation_jobs j ON j.batch_id = b.id
+            WHERE b.id = %s
+            GROUP BY b.id
+        """
+        result = execute_query_one(query, (str(batch_id),))
+        return dict(result) if result else None
+    
+    def get_batch_jobs(self, batch_id: UUID) -> List[Dict]:
+        """Get every evaluation job of a batch, in creation order"""
+        query = """
+            SELECT id, job_title, cv_document_id, project_document_id, status,
+                   cv_match_rate, cv_feedback, project_score, project_feedback,
+                   overall_summary, error_message, created_at, completed_at
+            FROM evaluation_jobs
+            WHERE batch_id = %s
+            ORDER BY created_at, id
+        """
+        return [dict(row) for row in execute_query(query, (str(batch_id),))]
+    
     def get_evaluation_job(self, job_id: UUID) -> Optional[Dict]:
         """Get an evaluation job by ID"""
         query = """
@@ -40,22 +112,31 @@ class EvaluationService:
         result = execute_query_one(query, (str(job_id),))
         return dict(result) if result else None
     
-    def update_job_status(self, job_id: UUID, status: str, error_message: Optional[str] = None):
-        """Update evaluation job status"""
+    def update_job_status(
+        self,
+        job_id: UUID,
+        status: str,
+        error_message: Optional[str] = None,
+        retry_pending: bool = False
+    ):
+        """
+        Update evaluation job status. retry_pending marks a failure that
+        Celery will retry; any other update clears it.
+        """
         if error_message:
             query = """
                 UPDATE evaluation_jobs
-                SET status = %s, error_message = %s, updated_at = NOW()
+                SET status = %s, error_message = %s, retry_pending = %s, updated_at = NOW()
                 WHERE id = %s
             """
-            execute_query(query, (status, error_message, str(job_id)), fetch=False)
+            execute_query(query, (status, error_message, retry_pending, str(job_id)), fetch=False)
         else:
             query = """
                 UPDATE evaluation_jobs
-                SET status = %s, updated_at = NOW()
+                SET status = %s, retry_pending = %s, updated_at = NOW()
                 WHERE id = %s
             """
-            execute_query(query, (status, str(job_id)), fetch=False)
+            execute_query(query, (status, retry_pending, str(job_id)), fetch=False)
     
     def update_job_results(
         self,
@@ -75,6 +156,7 @@ class EvaluationService:
                 project_feedback = %s,
                 overall_summary = %s,
                 status = 'completed',
+                retry_pending = FALSE,
                 completed_at = NOW(),
                 updated_at = NOW()
             WHERE id = %s
@@ -95,20 +177,20 @@ class EvaluationService:
         completion_tokens: int,
         response_time_ms: int,
         status: str,
-        error_message: Optional[str] = None
+        error_message: Optional[str] = None,
+        cached: bool = False
     ):
-        """Log an evaluation step for debugging and monitoring"""
-        query = """
-            INSERT INTO evaluation_logs
-            (evaluation_job_id, step_name, llm_provider, llm_model,
-             prompt_tokens, completion_tokens, total_tokens, response_time_ms,
-             status, error_message)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        Log an evaluation step for debugging and monitoring. The row is
+        buffered and written in a batch by flush_evaluation_logs() or the
+        background flusher, off the pipeline's critical path.
         """
         total_tokens = prompt_tokens + completion_tokens
-        execute_query(
-            query,
+        get_evaluation_log_buffer().add(
             (str(job_id), step_name, llm_provider, llm_model, prompt_tokens,
-             completion_tokens, total_tokens, response_time_ms, status, error_message),
-            fetch=False
+             completion_tokens, total_tokens, response_time_ms, status, error_message, cached)
         )
+    
+    def flush_evaluation_logs(self):
+        """Write buffered evaluation log rows now (one multi-row INSERT)"""
+        flush_evaluation_logs()
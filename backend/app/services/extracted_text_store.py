@@ -0,0 +1,55 @@
+from app.database import execute_query, execute_query_one, savepoint
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractedTextStore:
+    """
+    Persists cleaned PDF text per (file hash, extractor version) so
+    retries and re-evaluations of the same file skip pdfplumber.
+
+    Failures are logged and treated as cache misses; parsing never
+    depends on the store being available.
+    """
+    def get(self, file_hash: str, extractor_version: str) -> Optional[Dict]:
+        query = """
+            SELECT cleaned_text, char_count, word_count
+            FROM document_texts
+            WHERE file_hash = %s AND extractor_version = %s
+        """
+        try:
+            with savepoint():
+                result = execute_query_one(query, (file_hash, extractor_version))
+        except Exception as e:
+            logger.warning(f"Extracted text lookup failed for {file_hash}: {str(e)}")
+            return None
+
+        if not result:
+            return None
+
+        return {
+            "raw_text": None,  # only the cleaned text is persisted
+            "cleaned_text": result['cleaned_text'],
+            "char_count": result['char_count'],
+            "word_count": result['word_count'],
+            "cached": True
+        }
+
+    def put(self, file_hash: str, extractor_version: str, parsed: Dict):
+        query = """
+            INSERT INTO document_texts (file_hash, extractor_version, cleaned_text, char_count, word_count)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (file_hash, extractor_version) DO NOTHING
+        """
+        try:
+            with savepoint():
+                execute_query(
+                    query,
+                    (file_hash, extractor_version, parsed['cleaned_text'],
+                     parsed['char_count'], parsed['word_count']),
+                    fetch=False
+                )
+        except Exception as e:
+            logger.warning(f"Failed to store extracted text for {file_hash}: {str(e)}")
@@ -0,0 +1,223 @@
+import redis
+import redis.asyncio as aioredis
+from app.config import settings
+from contextlib import asynccontextmanager
+from uuid import UUID
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# One channel for all jobs: each API process runs a single subscriber and
+# fans events out to its local SSE clients by job_id.
+EVENTS_CHANNEL = "evaluation:events"
+SNAPSHOT_KEY = "evaluation:job:{job_id}:state"
+SEQUENCE_KEY = "evaluation:events:seq:{job_id}"
+
+# Numbers the event with the job's next sequence value, then stores and
+# publishes it. Done server-side so the number assigned and the payload
+# written can't diverge between concurrent publishers.
+# KEYS: sequence, snapshot; ARGV: event JSON (an object), TTL, channel
+PUBLISH_EVENT_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+local payload = '{"seq": ' .. seq .. ', ' .. string.sub(ARGV[1], 2)
+redis.call('SET', KEYS[2], payload, 'EX', ARGV[2])
+redis.call('PUBLISH', ARGV[3], payload)
+return seq
+"""
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+def is_terminal(event: Dict[str, Any]) -> bool:
+    """True once no further events will follow for the job"""
+    return event.get("status") in TERMINAL_STATUSES and not event.get("will_retry")
+
+
+def make_event(job_id, status: str, **fields) -> Dict[str, Any]:
+    """
+    Event payload. `ts` is informational only: events are ordered by the
+    per-job `seq` assigned when publishing, since workers' and the API's
+    clocks may disagree.
+    """
+    event = {"job_id": str(job_id), "status": status, "ts": time.time()}
+    event.update({key: value for key, value in fields.items() if value is not None})
+    return event
+
+
+class JobEventPublisher:
+    """
+    Publishes job progress from workers (and the API on job creation).
+
+    Each event gets the next value of its job's sequence counter, is
+    PUBLISHed and is also stored as the job's latest snapshot, so clients
+    connecting mid-run get the current state from Redis rather than
+    Postgres. Failures are logged; progress events are best-effort.
+    """
+    def __init__(self, url: Optional[str] = None, snapshot_ttl: Optional[int] = None):
+        self.url = url or settings.redis_url
+        self.snapshot_ttl = snapshot_ttl or settings.JOB_EVENTS_SNAPSHOT_TTL
+        self._client = None
+        self._script = None
+        self._pid = None
+
+    def _get_client(self) -> redis.Redis:
+        if self._client is None or self._pid != os.getpid():
+            self._client = redis.Redis.from_url(self.url, socket_timeout=5)
+            self._script = self._client.register_script(PUBLISH_EVENT_SCRIPT)
+            self._pid = os.getpid()
+        return self._client
+
+    def _publish_events(self, events: Iterable[Dict[str, Any]]):
+        if not settings.JOB_EVENTS_ENABLED:
+            return
+        try:
+            pipe = self._get_client().pipeline(transaction=False)
+            for event in events:
+                self._script(
+                    keys=[SEQUENCE_KEY.format(job_id=event["job_id"]), SNAPSHOT_KEY.format(job_id=event["job_id"])],
+                    args=[json.dumps(event, default=str), self.snapshot_ttl, EVENTS_CHANNEL],
+                    client=pipe
+                )
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to publish job events: {str(e)}")
+
+    def publish(self, job_id: UUID, status: str, **fields):
+        """Publish one event, e.g. publish(job_id, 'processing', step='cv_parsing')"""
+        self._publish_events([make_event(job_id, status, **fields)])
+
+    def publish_many(self, job_ids: Iterable[UUID], status: str):
+        """Publish the same status for many jobs in one round-trip"""
+        self._publish_events([make_event(job_id, status) for job_id in job_ids])
+
+
+_publisher: Optional[JobEventPublisher] = None
+
+
+def get_job_event_publisher() -> JobEventPublisher:
+    global _publisher
+    if _publisher is None:
+        _publisher = JobEventPublisher()
+    return _publisher
+
+
+class JobEventBroker:
+    """
+    Per-process fan-out of job events to SSE clients.
+
+    A single Redis subscription is shared by every client in the process;
+    each client gets a bounded asyncio.Queue for its job. Connecting
+    clients read the job's snapshot key, so no Postgres query is made per
+    client while events are flowing.
+    """
+    def __init__(self, url: Optional[str] = None, queue_size: Optional[int] = None):
+        self.url = url or settings.redis_url
+        self.queue_size = queue_size or settings.JOB_EVENTS_QUEUE_SIZE
+        self.client: Optional[aioredis.Redis] = None
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribed = asyncio.Event()
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        async with self._lock:
+            if self._listener is None or self._listener.done():
+                self.client = aioredis.Redis.from_url(self.url)
+                self._subscribed.clear()
+                self._listener = asyncio.create_task(self._listen())
+        # Don't hand out queues before the subscription is live, or events
+        # published in between would be missed
+        await asyncio.wait_for(self._subscribed.wait(), timeout=10)
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def _listen(self):
+        backoff = 1
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(EVENTS_CHANNEL)
+                self._subscribed.set()
+                backoff = 1
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.dispatch(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Job event subscription lost, reconnecting in {backoff}s: {str(e)}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def dispatch(self, event: Dict[str, Any]):
+        """Deliver an event to every local subscriber of its job"""
+        for queue in self._subscribers.get(event.get("job_id"), ()):
+            if queue.full():
+                # Slow client: drop its oldest event, the newest is what matters
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    @asynccontextmanager
+    async def subscribe(self, job_id: UUID) -> AsyncIterator[asyncio.Queue]:
+        await self.start()
+        key = str(job_id)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(key, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(key)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[key]
+
+    async def get_snapshot(self, job_id: UUID) -> Optional[Dict[str, Any]]:
+        """Latest event published for a job, if still retained"""
+        payload = await self.client.get(SNAPSHOT_KEY.format(job_id=job_id))
+        return json.loads(payload) if payload else None
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+
+_broker: Optional[JobEventBroker] = None
+_broker_lock = threading.Lock()
+
+
+def get_job_event_broker() -> JobEventBroker:
+    """The API process's broker; its subscription starts on first use"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = JobEventBroker()
+        return _broker
+
+
+async def shutdown_job_event_broker():
+    global _broker
+    if _broker is not None:
+        await _broker.stop()
+        _broker = None
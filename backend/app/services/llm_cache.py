@@ -0,0 +1,157 @@
+from app.config import settings
+from typing import Dict, Optional
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import redis
+
+
+def make_cache_key(
+    model: str,
+    temperature: float,
+    system_prompt: str,
+    user_prompt: str,
+    prompt_version: str
+) -> str:
+    """Content address of an LLM request: identical inputs give identical keys."""
+    payload = json.dumps(
+        [model, temperature, system_prompt, user_prompt, prompt_version],
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SQLiteLLMCache:
+    """
+    Local SQLite-backed response cache with TTL and LRU size bound.
+    Safe to share between threads and between worker processes on a node.
+    """
+    def __init__(self, path: str, ttl_seconds: int, max_entries: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite handles must not cross a fork
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)")
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value FROM llm_cache WHERE key = ? AND created_at > ?",
+                (key, now - self.ttl_seconds)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            conn.commit()
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict):
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now)
+            )
+            # Drop expired rows, then least recently used rows beyond the bound
+            conn.execute("DELETE FROM llm_cache WHERE created_at <= ?", (now - self.ttl_seconds,))
+            conn.execute("""
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            conn.commit()
+
+
+class RedisLLMCache:
+    """
+    Redis-backed response cache shared by all workers. Entries expire via
+    Redis TTL; a sorted set of last-access times enforces the size bound.
+    """
+    def __init__(self, url: str, ttl_seconds: int, max_entries: int, prefix: str = "llm_cache"):
+        self.client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.prefix = prefix
+        self.index_key = f"{prefix}:index"
+
+    def get(self, key: str) -> Optional[Dict]:
+        value = self.client.get(f"{self.prefix}:{key}")
+        if value is None:
+            return None
+        self.client.zadd(self.index_key, {key: time.time()})
+        return json.loads(value)
+
+    def set(self, key: str, value: Dict):
+        pipe = self.client.pipeline()
+        pipe.set(f"{self.prefix}:{key}", json.dumps(value), ex=self.ttl_seconds)
+        pipe.zadd(self.index_key, {key: time.time()})
+        pipe.zcard(self.index_key)
+        size = pipe.execute()[-1]
+
+        overflow = size - self.max_entries
+        if overflow > 0:
+            evicted = [k.decode() for k, _ in self.client.zpopmin(self.index_key, overflow)]
+            self.client.delete(*[f"{self.prefix}:{k}" for k in evicted])
+
+
+_cache = None
+_cache_pid = None
+
+
+def get_llm_cache():
+    """
+    Return the process-wide LLM response cache configured by
+    LLM_CACHE_BACKEND ('sqlite', 'redis' or 'none'), or None if disabled.
+    """
+    global _cache, _cache_pid
+
+    if _cache_pid == os.getpid():
+        return _cache
+
+    backend = settings.LLM_CACHE_BACKEND.lower()
+    if backend == "sqlite":
+        _cache = SQLiteLLMCache(
+            settings.LLM_CACHE_PATH,
+            settings.LLM_CACHE_TTL,
+            settings.LLM_CACHE_MAX_ENTRIES
+        )
+    elif backend == "redis":
+        _cache = RedisLLMCache(
+            settings.redis_url,
+            settings.LLM_CACHE_TTL,
+            settings.LLM_CACHE_MAX_ENTRIES
+        )
+    else:
+        _cache = None
+
+    _cache_pid = os.getpid()
+    return _cache
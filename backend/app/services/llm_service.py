@@ -2,75 +2,233 @@ import groq
 from typing import Dict, Optional, List
 import json
 import time
+import logging
 from app.config import settings
-from app.utils.retry_logic import retry_llm_call
+from app.services.llm_cache import get_llm_cache, make_cache_key
+from app.services.rate_limiter import get_rate_limiter
+from app.services.metrics import record_llm_call
+from app.utils.retry_logic import retry_llm_call, retry_after_seconds
 from app.utils.error_handler import LLMError
+from app.utils.prompt_builder import PromptSection, build_prompt, count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever prompt templates or response parsing change, so cached
+# responses produced by older prompts are never reused.
+PROMPT_VERSION = "2"
+
+# Reported with the model in evaluation logs and metrics
+LLM_PROVIDER = "groq"
 
 
 class LLMService:
-    def __init__(self):
-        self.client = groq.Groq(api_key=settings.GROQ_API_KEY)
+    def __init__(self, client=None):
+        self.client = client or self._create_client()
         self.model = settings.LLM_MODEL
         self.temperature = settings.LLM_TEMPERATURE
         self.max_tokens = settings.MAX_TOKENS
+        self.max_prompt_tokens = settings.LLM_MAX_PROMPT_TOKENS
+        self.cache = get_llm_cache()
+        self.cache_steps = set(settings.llm_cache_steps)
+        self.rate_limiter = get_rate_limiter(self.model)
     
-    @retry_llm_call
-    def call_llm(
+    def _create_client(self):
+        # Retries are handled by retry_llm_call together with the rate limiter
+        return groq.Groq(api_key=settings.GROQ_API_KEY, max_retries=0)
+    
+    def _build_request(
         self,
         system_prompt: str,
         user_prompt: str,
         temperature: Optional[float] = None,
         response_format: Optional[Dict] = None
+    ) -> Dict:
+        """Build the chat completion kwargs shared by the sync and async paths."""
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        
+        kwargs = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature or self.temperature,
+            "max_tokens": self.max_tokens
+        }
+        
+        if response_format:
+            kwargs["response_format"] = response_format
+        
+        return kwargs
+    
+    @staticmethod
+    def _format_response(response, start_time: float) -> Dict:
+        end_time = time.time()
+        response_time_ms = int((end_time - start_time) * 1000)
+        
+        return {
+            "content": response.choices[0].message.content,
+            "prompt_tokens": response.usage.prompt_tokens,
+            "completion_tokens": response.usage.completion_tokens,
+            "total_tokens": response.usage.total_tokens,
+            "response_time_ms": response_time_ms,
+            "model": response.model,
+            "cached": False
+        }
+    
+    def _wrap_error(self, error: Exception) -> LLMError:
+        return LLMError(
+            message=f"Groq API call failed: {str(error)}",
+            step="llm_call",
+            details={"model": self.model, "error": str(error)}
+        )
+    
+    @staticmethod
+    def _usage(response: Dict) -> Dict:
+        return {
+            "prompt_tokens": response["prompt_tokens"],
+            "completion_tokens": response["completion_tokens"],
+            "response_time_ms": response["response_time_ms"],
+            "model": response["model"],
+            "cached": response["cached"],
+            "prompt_tokens_estimate": response.get("prompt_tokens_estimate")
+        }
+    
+    def _log_prompt_size(self, step: Optional[str], prompt_tokens: Optional[int]):
+        if prompt_tokens is not None:
+            logger.info(f"LLM step {step or 'llm_call'}: sending ~{prompt_tokens} prompt tokens")
+    
+    def _cache_key(self, kwargs: Dict, step: Optional[str]) -> Optional[str]:
+        """Cache key for this request, or None if the step hasn't opted in."""
+        if self.cache is None or step not in self.cache_steps:
+            return None
+        
+        messages = kwargs["messages"]
+        return make_cache_key(
+            kwargs["model"],
+            kwargs["temperature"],
+            messages[0]["content"],
+            messages[1]["content"],
+            f"{PROMPT_VERSION}:{json.dumps(kwargs.get('response_format'), sort_keys=True)}"
+        )
+    
+    def _cache_get(self, key: Optional[str], start_time: float) -> Optional[Dict]:
+        if key is None:
+            return None
+        try:
+            cached = self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {str(e)}")
+            return None
+        if cached is None:
+            return None
+        
+        # A hit costs no tokens; report the lookup time, not the original latency
+        return {
+            "content": cached["content"],
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+            "response_time_ms": int((time.time() - start_time) * 1000),
+            "model": cached["model"],
+            "cached": True
+        }
+    
+    def _cache_set(self, key: Optional[str], response: Dict):
+        if key is None:
+            return
+        try:
+            self.cache.set(key, {"content": response["content"], "model": response["model"]})
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {str(e)}")
+    
+    def call_llm(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: Optional[float] = None,
+        response_format: Optional[Dict] = None,
+        step: Optional[str] = None,
+        prompt_tokens: Optional[int] = None
     ) -> Dict:
         """
         Call Groq LLM with retry logic and error handling.
         
+        If `step` is listed in LLM_CACHE_STEPS, identical requests are
+        answered from the response cache. `prompt_tokens` is the size
+        estimate from build_prompt, reported back as prompt_tokens_estimate.
+        
         Returns:
             Dictionary with response content and usage statistics
         """
         start_time = time.time()
+        kwargs = self._build_request(system_prompt, user_prompt, temperature, response_format)
+        self._log_prompt_size(step, prompt_tokens)
         
-        try:
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
-            
-            kwargs = {
-                "model": self.model,
-                "messages": messages,
-                "temperature": temperature or self.temperature,
-                "max_tokens": self.max_tokens
-            }
-            
-            if response_format:
-                kwargs["response_format"] = response_format
-            
-            response = self.client.chat.completions.create(**kwargs)
-            
-            end_time = time.time()
-            response_time_ms = int((end_time - start_time) * 1000)
-            
-            return {
-                "content": response.choices[0].message.content,
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens,
-                "response_time_ms": response_time_ms,
-                "model": response.model
-            }
+        cache_key = self._cache_key(kwargs, step)
+        cached = self._cache_get(cache_key, start_time)
+        if cached is not None:
+            record_llm_call(LLM_PROVIDER, step, cached)
+            return cached
         
+        response = self._call_api(kwargs, self._reserved_tokens(kwargs, prompt_tokens))
+        response["prompt_tokens_estimate"] = prompt_tokens
+        record_llm_call(LLM_PROVIDER, step, response)
+        self._cache_set(cache_key, response)
+        return response
+    
+    def _call_api(self, kwargs: Dict, reserved_tokens: int) -> Dict:
+        try:
+            return self._request(kwargs, reserved_tokens)
         except Exception as e:
-            raise LLMError(
-                message=f"Groq API call failed: {str(e)}",
-                step="llm_call",
-                details={"model": self.model, "error": str(e)}
-            )
+            raise self._wrap_error(e)
     
-    def parse_cv_to_structured_data(self, cv_text: str) -> Dict:
-        """
-        Step 1: Parse CV into structured data using LLM.
-        """
+    @retry_llm_call
+    def _request(self, kwargs: Dict, reserved_tokens: int) -> Dict:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(reserved_tokens)
+        
+        start_time = time.time()
+        try:
+            raw = self.client.chat.completions.with_raw_response.create(**kwargs)
+            response = raw.parse()
+        except BaseException as e:
+            if isinstance(e, groq.RateLimitError):
+                self._on_rate_limited(e)
+            # Each retry reserves again, so a failed attempt must not keep its budget
+            self._release_reservation(e, reserved_tokens)
+            raise
+        
+        self._sync_rate_limit(raw.headers, reserved_tokens, response)
+        return self._format_response(response, start_time)
+    
+    def _reserved_tokens(self, kwargs: Dict, prompt_tokens: Optional[int]) -> int:
+        """Tokens-per-minute budget to reserve: prompt plus the expected completion"""
+        if prompt_tokens is None:
+            prompt_tokens = sum(count_tokens(message["content"]) for message in kwargs["messages"])
+        if self.rate_limiter is None:
+            return prompt_tokens + kwargs["max_tokens"]
+        return self.rate_limiter.reservation(prompt_tokens, kwargs["max_tokens"])
+    
+    def _on_rate_limited(self, error: Exception):
+        # A 429 pauses every worker, not just this one
+        if self.rate_limiter is not None:
+            self.rate_limiter.block_for(retry_after_seconds(error))
+    
+    def _release_reservation(self, error: BaseException, reserved_tokens: int):
+        """Refund a failed call's reservation, applying any rate-limit headers it carried"""
+        if self.rate_limiter is not None:
+            headers = getattr(getattr(error, "response", None), "headers", None)
+            self.rate_limiter.sync_from_headers(headers or {}, reserved_tokens, 0)
+    
+    def _sync_rate_limit(self, headers, reserved_tokens: int, response):
+        if self.rate_limiter is not None:
+            used_tokens = response.usage.total_tokens if response.usage else reserved_tokens
+            if response.usage:
+                self.rate_limiter.completions.record(response.usage.completion_tokens)
+            self.rate_limiter.sync_from_headers(headers, reserved_tokens, used_tokens)
+    
+    def _cv_parsing_prompts(self, cv_text: str) -> Dict:
         system_prompt = """You are an expert CV parser. Extract structured information from CVs.
 
 Your task is to parse the CV and extract:
@@ -83,7 +241,7 @@ Your task is to parse the CV and extract:
 
 Return the information in a structured JSON format."""
 
-        user_prompt = f"""Parse the following CV and extract structured information:
+        template = """Parse the following CV and extract structured information:
 
 CV Content:
 {cv_text}
@@ -104,13 +262,19 @@ Return a JSON object with the following structure:
   ],
   "achievements": ["achievement1", "achievement2"]
 }}"""
-
-        response = self.call_llm(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            temperature=0.1
-        )
         
+        return {
+            **build_prompt(
+                system_prompt,
+                template,
+                {"cv_text": PromptSection(cv_text)},
+                self.max_prompt_tokens
+            ),
+            "temperature": 0.1,
+            "step": "cv_parsing"
+        }
+    
+    def _cv_parsing_result(self, response: Dict) -> Dict:
         try:
             parsed_data = json.loads(response["content"])
         except json.JSONDecodeError:
@@ -119,24 +283,22 @@ Return a JSON object with the following structure:
         
         return {
             "parsed_data": parsed_data,
-            "usage": {
-                "prompt_tokens": response["prompt_tokens"],
-                "completion_tokens": response["completion_tokens"],
-                "response_time_ms": response["response_time_ms"]
-            }
+            "usage": self._usage(response)
         }
     
-    def evaluate_cv(
+    def parse_cv_to_structured_data(self, cv_text: str) -> Dict:
+        """
+        Step 1: Parse CV into structured data using LLM.
+        """
+        response = self.call_llm(**self._cv_parsing_prompts(cv_text))
+        return self._cv_parsing_result(response)
+    
+    def _cv_evaluation_prompts(
         self,
         cv_structured_data: Dict,
         job_title: str,
         rag_context: str
     ) -> Dict:
-        """
-        Step 2: Evaluate CV against job requirements using RAG context.
-        
-        Returns cv_match_rate (0-1) and cv_feedback.
-        """
         system_prompt = """You are an expert technical recruiter evaluating candidates for backend engineering positions.
 
 Your task is to evaluate a candidate's CV against job requirements and scoring rubrics.
@@ -154,10 +316,10 @@ Evaluation Criteria (from rubric):
 Calculate weighted average and convert to match rate (0-1 scale).
 Provide detailed, constructive feedback."""
 
-        user_prompt = f"""Evaluate this candidate for the position: {job_title}
+        template = """Evaluate this candidate for the position: {job_title}
 
 CANDIDATE CV DATA:
-{json.dumps(cv_structured_data, indent=2)}
+{cv_data}
 
 RELEVANT JOB REQUIREMENTS AND RUBRIC:
 {rag_context}
@@ -178,13 +340,23 @@ Provide your evaluation in the following JSON format:
 }}
 
 Calculate match_rate as: (weighted_average - 1) / 4 to convert 1-5 scale to 0-1 scale."""
-
-        response = self.call_llm(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            temperature=0.3
-        )
         
+        return {
+            **build_prompt(
+                system_prompt,
+                template,
+                {
+                    "job_title": job_title,
+                    "cv_data": PromptSection(cv_structured_data, kind="json"),
+                    "rag_context": PromptSection(rag_context, kind="context")
+                },
+                self.max_prompt_tokens
+            ),
+            "temperature": 0.3,
+            "step": "cv_evaluation"
+        }
+    
+    def _cv_evaluation_result(self, response: Dict) -> Dict:
         try:
             evaluation = json.loads(response["content"])
         except json.JSONDecodeError:
@@ -198,17 +370,24 @@ Calculate match_rate as: (weighted_average - 1) / 4 to convert 1-5 scale to 0-1
             "cv_match_rate": evaluation.get("match_rate", 0.5),
             "cv_feedback": evaluation.get("overall_feedback", "Evaluation completed."),
             "detailed_scores": evaluation,
-            "usage": {
-                "prompt_tokens": response["prompt_tokens"],
-                "completion_tokens": response["completion_tokens"],
-                "response_time_ms": response["response_time_ms"]
-            }
+            "usage": self._usage(response)
         }
     
-    def parse_project_report(self, project_text: str) -> Dict:
+    def evaluate_cv(
+        self,
+        cv_structured_data: Dict,
+        job_title: str,
+        rag_context: str
+    ) -> Dict:
         """
-        Step 3: Parse project report into structured data.
+        Step 2: Evaluate CV against job requirements using RAG context.
+        
+        Returns cv_match_rate (0-1) and cv_feedback.
         """
+        response = self.call_llm(**self._cv_evaluation_prompts(cv_structured_data, job_title, rag_context))
+        return self._cv_evaluation_result(response)
+    
+    def _project_parsing_prompts(self, project_text: str) -> Dict:
         system_prompt = """You are an expert code reviewer analyzing project reports.
 
 Extract structured information about:
@@ -221,7 +400,7 @@ Extract structured information about:
 
 Return structured JSON."""
 
-        user_prompt = f"""Parse the following project report and extract structured information:
+        template = """Parse the following project report and extract structured information:
 
 PROJECT REPORT:
 {project_text}
@@ -237,13 +416,19 @@ Return a JSON object with:
   "bonus_features": ["bonus1", "bonus2", ...],
   "code_quality_indicators": ["indicator1", "indicator2", ...]
 }}"""
-
-        response = self.call_llm(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            temperature=0.1
-        )
         
+        return {
+            **build_prompt(
+                system_prompt,
+                template,
+                {"project_text": PromptSection(project_text)},
+                self.max_prompt_tokens
+            ),
+            "temperature": 0.1,
+            "step": "project_parsing"
+        }
+    
+    def _project_parsing_result(self, response: Dict) -> Dict:
         try:
             parsed_data = json.loads(response["content"])
         except json.JSONDecodeError:
@@ -251,23 +436,21 @@ Return a JSON object with:
         
         return {
             "parsed_data": parsed_data,
-            "usage": {
-                "prompt_tokens": response["prompt_tokens"],
-                "completion_tokens": response["completion_tokens"],
-                "response_time_ms": response["response_time_ms"]
-            }
+            "usage": self._usage(response)
         }
     
-    def evaluate_project_report(
+    def parse_project_report(self, project_text: str) -> Dict:
+        """
+        Step 3: Parse project report into structured data.
+        """
+        response = self.call_llm(**self._project_parsing_prompts(project_text))
+        return self._project_parsing_result(response)
+    
+    def _project_evaluation_prompts(
         self,
         project_structured_data: Dict,
         rag_context: str
     ) -> Dict:
-        """
-        Step 4: Evaluate project report against case study requirements.
-        
-        Returns project_score (1-5) and project_feedback.
-        """
         system_prompt = """You are an expert technical evaluator assessing project deliverables.
 
 Evaluation Criteria (from rubric):
@@ -284,10 +467,10 @@ Evaluation Criteria (from rubric):
 
 Calculate weighted average for final score (1-5 scale)."""
 
-        user_prompt = f"""Evaluate this project report against the case study requirements.
+        template = """Evaluate this project report against the case study requirements.
 
 PROJECT DATA:
-{json.dumps(project_structured_data, indent=2)}
+{project_data}
 
 CASE STUDY REQUIREMENTS AND RUBRIC:
 {rag_context}
@@ -308,13 +491,22 @@ Provide evaluation in JSON format:
   "project_score": <1.00-5.00>,
   "overall_feedback": "3-5 sentences of constructive feedback on strengths and improvements"
 }}"""
-
-        response = self.call_llm(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            temperature=0.3
-        )
         
+        return {
+            **build_prompt(
+                system_prompt,
+                template,
+                {
+                    "project_data": PromptSection(project_structured_data, kind="json"),
+                    "rag_context": PromptSection(rag_context, kind="context")
+                },
+                self.max_prompt_tokens
+            ),
+            "temperature": 0.3,
+            "step": "project_evaluation"
+        }
+    
+    def _project_evaluation_result(self, response: Dict) -> Dict:
         try:
             evaluation = json.loads(response["content"])
         except json.JSONDecodeError:
@@ -327,22 +519,28 @@ Provide evaluation in JSON format:
             "project_score": evaluation.get("project_score", 3.0),
             "project_feedback": evaluation.get("project_feedback", "Evaluation completed."),
             "detailed_scores": evaluation,
-            "usage": {
-                "prompt_tokens": response["prompt_tokens"],
-                "completion_tokens": response["completion_tokens"],
-                "response_time_ms": response["response_time_ms"]
-            }
+            "usage": self._usage(response)
         }
     
-    def generate_overall_summary(
+    def evaluate_project_report(
+        self,
+        project_structured_data: Dict,
+        rag_context: str
+    ) -> Dict:
+        """
+        Step 4: Evaluate project report against case study requirements.
+        
+        Returns project_score (1-5) and project_feedback.
+        """
+        response = self.call_llm(**self._project_evaluation_prompts(project_structured_data, rag_context))
+        return self._project_evaluation_result(response)
+    
+    def _final_analysis_prompts(
         self,
         cv_evaluation: Dict,
         project_evaluation: Dict,
         job_title: str
     ) -> Dict:
-        """
-        Step 5: Synthesize all evaluations into final summary.
-        """
         system_prompt = """You are a senior technical hiring manager making final candidate assessments.
 
 Synthesize CV and project evaluations into a concise overall summary.
@@ -353,29 +551,49 @@ Your summary should:
 3. Provide a clear hiring recommendation
 4. Be 3-5 sentences, professional and constructive"""
 
-        user_prompt = f"""Create an overall candidate assessment for: {job_title}
+        template = """Create an overall candidate assessment for: {job_title}
 
 CV EVALUATION:
-- Match Rate: {cv_evaluation.get('cv_match_rate', 0):.2f}
-- Feedback: {cv_evaluation.get('cv_feedback', 'N/A')}
+- Match Rate: {cv_match_rate}
+- Feedback: {cv_feedback}
 
 PROJECT EVALUATION:
-- Score: {project_evaluation.get('project_score', 0):.2f}/5.00
-- Feedback: {project_evaluation.get('project_feedback', 'N/A')}
+- Score: {project_score}/5.00
+- Feedback: {project_feedback}
 
 Provide a concise overall summary (3-5 sentences) that synthesizes both evaluations and gives a clear recommendation."""
-
-        response = self.call_llm(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            temperature=0.4
-        )
         
+        return {
+            **build_prompt(
+                system_prompt,
+                template,
+                {
+                    "job_title": job_title,
+                    "cv_match_rate": f"{cv_evaluation.get('cv_match_rate', 0):.2f}",
+                    "cv_feedback": PromptSection(cv_evaluation.get('cv_feedback', 'N/A')),
+                    "project_score": f"{project_evaluation.get('project_score', 0):.2f}",
+                    "project_feedback": PromptSection(project_evaluation.get('project_feedback', 'N/A'))
+                },
+                self.max_prompt_tokens
+            ),
+            "temperature": 0.4,
+            "step": "final_analysis"
+        }
+    
+    def _final_analysis_result(self, response: Dict) -> Dict:
         return {
             "overall_summary": response["content"],
-            "usage": {
-                "prompt_tokens": response["prompt_tokens"],
-                "completion_tokens": response["completion_tokens"],
-                "response_time_ms": response["response_time_ms"]
-            }
+            "usage": self._usage(response)
         }
+    
+    def generate_overall_summary(
+        self,
+        cv_evaluation: Dict,
+        project_evaluation: Dict,
+        job_title: str
+    ) -> Dict:
+        """
+        Step 5: Synthesize all evaluations into final summary.
+        """
+        response = self.call_llm(**self._final_analysis_prompts(cv_evaluation, project_evaluation, job_title))
+        return self._final_analysis_result(response)
@@ -0,0 +1,222 @@
+"""
+Prometheus metrics for the API (/metrics) and the Celery workers (an
+exporter started by the worker's main process).
+
+Metrics are module-level and always recorded; METRICS_ENABLED only
+controls whether they are exposed. Processes that fork (Celery prefork,
+uvicorn/gunicorn with several workers) must run with
+PROMETHEUS_MULTIPROC_DIR set to an empty directory before starting, so
+every child writes its samples there and the endpoint aggregates them.
+"""
+from app.config import settings
+from prometheus_client import (
+    CollectorRegistry, Counter, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+from prometheus_client.core import GaugeMetricFamily
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Optional
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+STEP_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600, 1500)
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "API request latency by route template",
+    ["method", "route", "status"]
+)
+
+EVALUATION_STEP_DURATION = Histogram(
+    "evaluation_step_duration_seconds", "Duration of a pipeline step (restored checkpoints excluded)",
+    ["step", "status"], buckets=STEP_BUCKETS
+)
+EVALUATION_JOB_DURATION = Histogram(
+    "evaluation_job_duration_seconds", "Duration of one run_evaluation_pipeline attempt",
+    ["outcome"], buckets=STEP_BUCKETS
+)
+EVALUATION_JOBS = Counter(
+    "evaluation_jobs_total", "Pipeline attempts by outcome (completed, retried, failed)",
+    ["outcome"]
+)
+EVALUATION_STEP_FAILURES = Counter(
+    "evaluation_step_failures_total", "Pipeline failures by step and error type",
+    ["step", "error_type"]
+)
+
+LLM_REQUESTS = Counter(
+    "llm_requests_total", "LLM calls by model and step; cached calls never reach the provider",
+    ["provider", "model", "step", "cached"]
+)
+LLM_PROMPT_TOKENS = Counter(
+    "llm_prompt_tokens_total", "Prompt tokens sent to the provider, as reported in its usage",
+    ["provider", "model", "step"]
+)
+LLM_COMPLETION_TOKENS = Counter(
+    "llm_completion_tokens_total", "Completion tokens returned by the provider",
+    ["provider", "model", "step"]
+)
+LLM_RETRIES = Counter(
+    "llm_retries_total", "LLM API calls retried after a retryable error",
+    ["error"]
+)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Database calls, including connection checkout",
+    ["statement"], buckets=DB_BUCKETS
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "Time to check a connection out of the pool",
+    buckets=DB_BUCKETS
+)
+
+_STATEMENTS = {"select", "insert", "update", "delete", "with"}
+
+
+def statement_kind(query: str) -> str:
+    """Low-cardinality label for a SQL statement: its leading keyword"""
+    keyword = query.lstrip().split(None, 1)[0].lower() if query.strip() else ""
+    return keyword if keyword in _STATEMENTS else "other"
+
+
+@contextmanager
+def observe_db_query(query: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        DB_QUERY_DURATION.labels(statement_kind(query)).observe(time.perf_counter() - start)
+
+
+def timed_step(step: str, func: Callable) -> Callable:
+    """Wrap a pipeline step function so each run is observed, labelled success/failed"""
+    def run(**kwargs):
+        start = time.perf_counter()
+        status = "failed"
+        try:
+            result = func(**kwargs)
+            status = "success"
+            return result
+        finally:
+            EVALUATION_STEP_DURATION.labels(step, status).observe(time.perf_counter() - start)
+    return run
+
+
+def record_job(outcome: str, seconds: float):
+    EVALUATION_JOBS.labels(outcome).inc()
+    EVALUATION_JOB_DURATION.labels(outcome).observe(seconds)
+
+
+def record_step_failure(step: str, error: BaseException):
+    EVALUATION_STEP_FAILURES.labels(step, type(error).__name__).inc()
+
+
+def record_llm_call(provider: str, step: Optional[str], response: Dict):
+    """Count one answered LLM call; tokens only when the provider was actually called"""
+    model = response.get("model") or "unknown"
+    step = step or "llm_call"
+    cached = bool(response.get("cached"))
+    LLM_REQUESTS.labels(provider, model, step, str(cached).lower()).inc()
+    if not cached:
+        LLM_PROMPT_TOKENS.labels(provider, model, step).inc(response.get("prompt_tokens") or 0)
+        LLM_COMPLETION_TOKENS.labels(provider, model, step).inc(response.get("completion_tokens") or 0)
+
+
+def record_llm_retry(retry_state):
+    """tenacity before_sleep hook"""
+    error = retry_state.outcome.exception()
+    LLM_RETRIES.labels(type(error).__name__ if error else "unknown").inc()
+
+
+class CeleryQueueCollector:
+    """
+    Messages waiting in each Celery queue, read from the broker at scrape
+    time. A passive declare works on every kombu transport (for Redis it
+    counts all priority lists of the queue); a queue that doesn't exist
+    yet reports 0. Broker errors are logged and the metric is omitted.
+    """
+    def __init__(self, queues: Iterable[str]):
+        self.queues = list(queues)
+
+    def collect(self):
+        from app.tasks.celery_config import celery_app
+
+        depths = {}
+        try:
+            with celery_app.connection_for_read() as connection:
+                for queue in self.queues:
+                    channel = connection.channel()
+                    try:
+                        depths[queue] = channel.queue_declare(queue=queue, passive=True).message_count
+                    except connection.channel_errors:
+                        depths[queue] = 0
+                    finally:
+                        try:
+                            channel.close()
+                        except Exception:
+                            pass
+        except Exception as e:
+            logger.warning(f"Failed to read Celery queue lengths: {str(e)}")
+            return
+
+        gauge = GaugeMetricFamily("celery_queue_length", "Messages waiting in a Celery queue", labels=["queue"])
+        for queue, depth in depths.items():
+            gauge.add_metric([queue], depth)
+        yield gauge
+
+
+def is_multiprocess() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def metrics_registry() -> CollectorRegistry:
+    """The registry to expose: all processes' samples in multiprocess mode, else this process'"""
+    if not is_multiprocess():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics(registry: Optional[CollectorRegistry] = None):
+    """(body, content type) for a scrape"""
+    return generate_latest(registry or metrics_registry()), CONTENT_TYPE_LATEST
+
+
+def start_worker_exporter(port: Optional[int] = None) -> bool:
+    """
+    Serve the worker metrics (pipeline, LLM, DB and queue lengths) on
+    METRICS_WORKER_PORT. Called once from the Celery main process before
+    the pool forks. Returns False if disabled or the port is taken.
+    """
+    port = settings.METRICS_WORKER_PORT if port is None else port
+    if not settings.METRICS_ENABLED or not port:
+        return False
+
+    from app.tasks.celery_config import celery_app
+    from prometheus_client import start_http_server
+
+    if not is_multiprocess():
+        logger.warning(
+            "PROMETHEUS_MULTIPROC_DIR is not set: the worker exporter only sees the main "
+            "process, not the pool processes that run tasks"
+        )
+    registry = metrics_registry()
+    queues = sorted({route["queue"] for route in (celery_app.conf.task_routes or {}).values()})
+    registry.register(CeleryQueueCollector(queues))
+
+    try:
+        start_http_server(port, registry=registry)
+    except OSError as e:
+        logger.error(f"Failed to start the worker metrics exporter on port {port}: {str(e)}")
+        return False
+    logger.info(f"Worker metrics exporter listening on :{port} (queues: {', '.join(queues)})")
+    return True
+
+
+def mark_process_dead(pid: Optional[int] = None):
+    """Drop a finished pool process' live samples (multiprocess mode only)"""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(pid or os.getpid())
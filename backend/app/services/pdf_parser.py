@@ -1,42 +1,201 @@
 import PyPDF2
 import pdfplumber
-from typing import Dict, Optional
+from app.config import settings
+from billiard.exceptions import WorkerLostError
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+import atexit
+import billiard
+import hashlib
+import logging
+import math
+import os
 import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Identifies the extraction + cleaning pipeline. Cached texts produced by a
+# different version, pdfplumber release or page/char limits are ignored and
+# re-extracted.
+EXTRACTOR_VERSION = (
+    f"pdfplumber-{pdfplumber.__version__}/clean-2"
+    f"/pages-{settings.PDF_MAX_PAGES}/chars-{settings.PDF_MAX_CHARS}"
+)
+
+_process_pool = None
+_process_pool_pid: Optional[int] = None
+_process_pool_lock = threading.Lock()
+
+# Pid of a process in which the pool could not be started; it extracts serially
+_parallel_unavailable_pid: Optional[int] = None
+
+
+def _get_process_pool(workers: int):
+    """
+    Per-process extraction pool, created on first use.
+    
+    billiard (Celery's fork of multiprocessing) rather than
+    concurrent.futures: prefork pool processes are daemonic, and the
+    stdlib refuses to start children from them.
+    """
+    global _process_pool, _process_pool_pid
+
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_pid != os.getpid():
+            # spawn: the parent runs threads (DAG steps, DB pool), which fork
+            # would copy in an arbitrary lock state
+            _process_pool = billiard.get_context("spawn").Pool(processes=workers)
+            _process_pool_pid = os.getpid()
+        return _process_pool
+
+
+def _shutdown_process_pool():
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None and _process_pool_pid == os.getpid():
+            _process_pool.terminate()
+        _process_pool = None
+
+
+def _disable_parallel_extraction(error: BaseException):
+    """Stop trying the pool in this process after it failed to start"""
+    global _parallel_unavailable_pid
+    _shutdown_process_pool()
+    _parallel_unavailable_pid = os.getpid()
+    logger.warning(f"Page-parallel extraction unavailable in process {os.getpid()}, using serial: {str(error)}")
+
+
+atexit.register(_shutdown_process_pool)
+
+
+def _extract_page_range(file_path: str, start: int, end: int, max_chars: int) -> List[str]:
+    """Extract pages [start, end) in a pool worker, stopping after max_chars."""
+    texts = []
+    total = 0
+    with pdfplumber.open(file_path) as pdf:
+        for page_text in _iter_page_texts(pdf.pages[start:end]):
+            page_text = page_text or ""
+            texts.append(page_text)
+            total += len(page_text)
+            if total >= max_chars:
+                break
+    return texts
+
+
+def _iter_page_texts(pages) -> Iterable[str]:
+    for page in pages:
+        page_text = page.extract_text()
+        # Drop pdfplumber's per-page object cache as we go
+        page.flush_cache()
+        yield page_text
+
+
+def _join_pages(page_texts: Iterable[str], max_chars: int) -> str:
+    """Join page texts in order, consuming pages only until max_chars is reached."""
+    parts = []
+    total = 0
+    for page_text in page_texts:
+        if not page_text:
+            continue
+        parts.append(page_text)
+        total += len(page_text) + 1
+        if total >= max_chars:
+            break
+    return "\n".join(parts)[:max_chars].strip()
 
 
 class PDFParser:
     @staticmethod
-    def extract_text_pypdf2(file_path: str) -> str:
+    def extract_text_pypdf2(file_path: str, max_pages: Optional[int] = None, max_chars: Optional[int] = None) -> str:
         """
         Extract text from PDF using PyPDF2 (faster but less accurate).
         """
-        text = ""
+        max_pages = settings.PDF_MAX_PAGES if max_pages is None else max_pages
+        max_chars = settings.PDF_MAX_CHARS if max_chars is None else max_chars
         try:
             with open(file_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
+                pages = pdf_reader.pages[:max_pages]
+                return _join_pages((page.extract_text() for page in pages), max_chars)
         except Exception as e:
             raise Exception(f"Failed to extract text with PyPDF2: {str(e)}")
+    
+    @staticmethod
+    def _extract_pages_parallel(file_path: str, page_count: int, workers: int, max_chars: int) -> Optional[str]:
+        """
+        Extract page ranges on the process pool and join them in page order.
+        Returns None if the pool is unavailable so the caller can fall back
+        to serial extraction. A pool that fails to start is not retried in
+        the same process.
+        """
+        if _parallel_unavailable_pid == os.getpid():
+            return None
+        try:
+            pool = _get_process_pool(workers)
+        except (AssertionError, OSError, RuntimeError) as e:
+            _disable_parallel_extraction(e)
+            return None
         
-        return text.strip()
+        # A couple of ranges per worker keeps all workers busy; at most that
+        # many are in flight, so reaching max_chars stops the tail from being
+        # submitted at all
+        chunk = max(1, math.ceil(page_count / (workers * 2)))
+        ranges = deque((start, min(start + chunk, page_count)) for start in range(0, page_count, chunk))
+        in_flight = deque()
+        
+        def submit_next():
+            start, end = ranges.popleft()
+            in_flight.append(pool.apply_async(_extract_page_range, (file_path, start, end, max_chars)))
+        
+        def page_texts():
+            while ranges and len(in_flight) < workers * 2:
+                submit_next()
+            while in_flight:
+                texts = in_flight.popleft().get()
+                if ranges:
+                    submit_next()
+                yield from texts
+        
+        try:
+            return _join_pages(page_texts(), max_chars)
+        except WorkerLostError as e:
+            # A worker died (e.g. OOM); start a fresh pool next time
+            _shutdown_process_pool()
+            logger.warning(f"Extraction pool lost a worker, using serial: {str(e)}")
+            return None
     
     @staticmethod
-    def extract_text_pdfplumber(file_path: str) -> str:
+    def extract_text_pdfplumber(
+        file_path: str,
+        max_pages: Optional[int] = None,
+        max_chars: Optional[int] = None,
+        workers: Optional[int] = None
+    ) -> str:
         """
         Extract text from PDF using pdfplumber (more accurate, handles tables).
+        
+        Long documents are extracted page-parallel on a process pool; at most
+        max_pages pages and max_chars characters are extracted.
         """
-        text = ""
+        max_pages = settings.PDF_MAX_PAGES if max_pages is None else max_pages
+        max_chars = settings.PDF_MAX_CHARS if max_chars is None else max_chars
+        workers = settings.PDF_EXTRACT_WORKERS if workers is None else workers
         try:
             with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+                page_count = min(len(pdf.pages), max_pages)
+                parallel = workers > 1 and page_count >= settings.PDF_PARALLEL_MIN_PAGES
+                if not parallel:
+                    return _join_pages(_iter_page_texts(pdf.pages[:page_count]), max_chars)
+            
+            text = PDFParser._extract_pages_parallel(file_path, page_count, workers, max_chars)
+            if text is not None:
+                return text
+            
+            with pdfplumber.open(file_path) as pdf:
+                return _join_pages(_iter_page_texts(pdf.pages[:page_count]), max_chars)
         except Exception as e:
             raise Exception(f"Failed to extract text with pdfplumber: {str(e)}")
-        
-        return text.strip()
     
     @staticmethod
     def extract_text(file_path: str, method: str = "pdfplumber") -> str:
@@ -73,37 +232,65 @@ class PDFParser:
         return text.strip()
     
     @staticmethod
-    def parse_cv(file_path: str) -> Dict[str, str]:
+    def file_hash(file_path: str) -> str:
+        """SHA-256 of a file, read in fixed-size chunks."""
+        sha256 = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for block in iter(lambda: file.read(1024 * 1024), b""):
+                sha256.update(block)
+        return sha256.hexdigest()
+    
+    @staticmethod
+    def parse_document(file_path: str, text_store=None, file_hash: Optional[str] = None) -> Dict[str, str]:
         """
-        Parse CV and extract structured information.
+        Extract and clean a PDF, reusing a previously stored result when a
+        text store is given.
+        
+        Args:
+            file_path: Path to PDF file
+            text_store: Optional ExtractedTextStore keyed by file hash
+            file_hash: SHA-256 of the file if already known (e.g. from upload)
         
         Returns:
-            Dictionary with raw_text and cleaned_text
+            Dictionary with raw_text, cleaned_text, char_count and word_count
         """
+        if text_store is not None:
+            file_hash = file_hash or PDFParser.file_hash(file_path)
+            cached = text_store.get(file_hash, EXTRACTOR_VERSION)
+            if cached is not None:
+                return cached
+        
         raw_text = PDFParser.extract_text(file_path)
         cleaned_text = PDFParser.clean_text(raw_text)
         
-        return {
+        result = {
             "raw_text": raw_text,
             "cleaned_text": cleaned_text,
             "char_count": len(cleaned_text),
             "word_count": len(cleaned_text.split())
         }
+        
+        if text_store is not None:
+            text_store.put(file_hash, EXTRACTOR_VERSION, result)
+        
+        return result
     
     @staticmethod
-    def parse_project_report(file_path: str) -> Dict[str, str]:
+    def parse_cv(file_path: str, text_store=None, file_hash: Optional[str] = None) -> Dict[str, str]:
         """
-        Parse project report and extract structured information.
+        Parse CV and extract structured information.
         
         Returns:
             Dictionary with raw_text and cleaned_text
         """
-        raw_text = PDFParser.extract_text(file_path)
-        cleaned_text = PDFParser.clean_text(raw_text)
+        return PDFParser.parse_document(file_path, text_store, file_hash)
+    
+    @staticmethod
+    def parse_project_report(file_path: str, text_store=None, file_hash: Optional[str] = None) -> Dict[str, str]:
+        """
+        Parse project report and extract structured information.
         
-        return {
-            "raw_text": raw_text,
-            "cleaned_text": cleaned_text,
-            "char_count": len(cleaned_text),
-            "word_count": len(cleaned_text.split())
-        }
+        Returns:
+            Dictionary with raw_text and cleaned_text
+        """
+        return PDFParser.parse_document(file_path, text_store, file_hash)
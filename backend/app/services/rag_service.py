@@ -1,51 +1,124 @@
-import chromadb
-from chromadb.config import Settings
-from typing import List, Dict, Optional
-from sentence_transformers import SentenceTransformer
+from typing import Callable, List, Dict, Optional
 from app.config import settings
 from app.database import execute_query, execute_query_one
-import tiktoken
+from app.services.embedding_backends import Embedder, create_embedder
+from app.services.embedding_cache import get_embedding_cache
+from app.services.vector_store import VectorStore, create_vector_store
+from app.utils.prompt_builder import get_encoder
+from app.utils.ttl_cache import TTLCache
+import numpy as np
+import hashlib
+import json
 import uuid
+import os
+import re
+import time
+
+# Part of every document hash: bump when chunk_text() changes so stored
+# documents are re-chunked on the next sync
+CHUNKER_VERSION = "cdc-1"
+
+# Once a chunk holds half of chunk_size tokens, it ends after any
+# paragraph whose hash picks it as a cut point (~1 in CUT_POINT_DIVISOR).
+# Boundaries then follow the content rather than token offsets, so an
+# insertion only changes the chunks around it.
+CUT_POINT_DIVISOR = 4
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _is_cut_point(segment: str) -> bool:
+    return int(_sha256(segment)[:8], 16) % CUT_POINT_DIVISOR == 0
 
 
 class RAGService:
-    def __init__(self):
-        # Initialize ChromaDB client
-        self.chroma_client = chromadb.PersistentClient(
-            path=settings.CHROMA_PERSIST_DIR,
-            settings=Settings(anonymized_telemetry=False)
-        )
+    def __init__(self, vector_store: Optional[VectorStore] = None, embedder: Optional[Embedder] = None):
+        # Chunk storage and search (VECTOR_STORE_BACKEND: Chroma or in-process NumPy)
+        self.vector_store = vector_store or create_vector_store()
         
-        # Using all-MiniLM-L6-v2: fast, efficient, and works well for semantic search
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Using all-MiniLM-L6-v2: fast, efficient, and works well for semantic search.
+        # EMBEDDING_BACKEND runs it with sentence-transformers or ONNX Runtime.
+        self.embedder = embedder or create_embedder()
         
-        # Get or create collection
-        self.collection = self.chroma_client.get_or_create_collection(
-            name="reference_documents",
-            metadata={"hnsw:space": "cosine"}
-        )
+        # Persistent (model, text hash) -> vector cache; None if disabled
+        self.embedding_cache = get_embedding_cache()
         
-        # Initialize tokenizer for chunking
-        self.tokenizer = tiktoken.encoding_for_model("gpt-4")
+        # Tokenizer for chunking, shared with the prompt builder (falls back
+        # to an approximation when tiktoken's BPE file can't be downloaded)
+        self.tokenizer = get_encoder()
         
         # Chunking parameters
         self.chunk_size = 500  # tokens
         self.chunk_overlap = 50  # tokens
+        
+        # Memoized evaluation contexts, keyed by (kind, job_title, collection version)
+        self.context_cache = TTLCache(
+            max_entries=settings.RAG_CONTEXT_CACHE_SIZE,
+            ttl_seconds=settings.RAG_CONTEXT_CACHE_TTL
+        )
+        self._version_file = os.path.join(settings.CHROMA_PERSIST_DIR, "collection_version")
+        # Last version reported by a shared store (pgvector) and when it was read
+        self._store_version: Optional[str] = None
+        self._store_version_checked: Optional[float] = None
     
-    def chunk_text(self, text: str) -> List[str]:
+    def _segments(self, text: str):
         """
-        Split text into overlapping chunks based on token count.
+        (separator, text, tokens) for each paragraph; paragraphs longer
+        than chunk_size are broken into their lines.
         """
-        tokens = self.tokenizer.encode(text)
-        chunks = []
-        
+        for paragraph in re.split(r"\n\s*\n", text):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            tokens = self.tokenizer.encode(paragraph)
+            if len(tokens) <= self.chunk_size:
+                yield "\n\n", paragraph, tokens
+                continue
+            separator = "\n\n"
+            for line in paragraph.split("\n"):
+                line = line.strip()
+                if line:
+                    yield separator, line, self.tokenizer.encode(line)
+                    separator = "\n"
+    
+    def _token_windows(self, tokens: List) -> List[str]:
+        """Overlapping fixed-size windows, for a line longer than chunk_size"""
+        windows = []
         start = 0
         while start < len(tokens):
-            end = start + self.chunk_size
-            chunk_tokens = tokens[start:end]
-            chunk_text = self.tokenizer.decode(chunk_tokens)
-            chunks.append(chunk_text)
+            windows.append(self.tokenizer.decode(tokens[start:start + self.chunk_size]))
             start += self.chunk_size - self.chunk_overlap
+        return windows
+    
+    def chunk_text(self, text: str) -> List[str]:
+        """
+        Split text into chunks of up to chunk_size tokens along paragraph
+        (or line) boundaries, ending chunks at content-defined cut points.
+        A line longer than chunk_size becomes overlapping token windows.
+        """
+        chunks = []
+        parts, size = [], 0
+        
+        def flush():
+            nonlocal parts, size
+            if parts:
+                chunks.append("".join(separator + part for separator, part in parts)[len(parts[0][0]):])
+            parts, size = [], 0
+        
+        for separator, segment, tokens in self._segments(text):
+            if len(tokens) > self.chunk_size:
+                flush()
+                chunks.extend(self._token_windows(tokens))
+                continue
+            if size + len(tokens) > self.chunk_size:
+                flush()
+            parts.append((separator, segment))
+            size += len(tokens)
+            if size >= self.chunk_size // 2 and _is_cut_point(segment):
+                flush()
+        flush()
         
         return chunks
     
@@ -54,8 +127,51 @@ class RAGService:
         Generate embedding using Sentence Transformers.
         Replaced OpenAI embeddings with local Sentence Transformers model
         """
-        embedding = self.embedding_model.encode(text, convert_to_tensor=False)
-        return embedding.tolist()
+        return self.generate_embeddings([text])[0].tolist()
+    
+    def generate_embeddings(
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None,
+        normalize: bool = False
+    ) -> np.ndarray:
+        """
+        Generate embeddings for many texts in batched forward passes.
+        
+        Texts found in the embedding cache are not encoded again; all
+        misses (deduplicated) go through the model together and are cached.
+        
+        Args:
+            texts: Texts to embed
+            batch_size: Texts per forward pass (default: EMBEDDING_BATCH_SIZE)
+            normalize: L2-normalize each row
+        
+        Returns:
+            Contiguous float32 matrix of shape (len(texts), embedding_dim)
+        """
+        if not texts:
+            dim = self.embedder.dimension
+            return np.empty((0, dim), dtype=np.float32)
+        
+        if self.embedding_cache is None:
+            return self._encode(texts, batch_size, normalize)
+        
+        cached = self.embedding_cache.get_many(self.embedder.model_id, texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+        if missing:
+            # Cache raw vectors; normalization is applied per call below
+            encoded = self._encode(missing, batch_size, normalize=False)
+            self.embedding_cache.set_many(self.embedder.model_id, missing, encoded)
+            by_text = dict(zip(missing, encoded))
+            cached = [by_text[text] if vector is None else vector for text, vector in zip(texts, cached)]
+        
+        embeddings = np.vstack(cached).astype(np.float32)
+        if normalize:
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return np.ascontiguousarray(embeddings)
+    
+    def _encode(self, texts: List[str], batch_size: Optional[int], normalize: bool) -> np.ndarray:
+        return self.embedder.encode(texts, batch_size or settings.EMBEDDING_BATCH_SIZE, normalize)
     
     def ingest_reference_document(
         self,
@@ -70,51 +186,167 @@ class RAGService:
         
         Steps:
         1. Chunk the document text
-        2. Generate embeddings for each chunk
-        3. Store in ChromaDB with metadata
+        2. Generate embeddings for all chunks in batches
+        3. Store in the vector store with metadata
         """
-        # Chunk the document
-        chunks = self.chunk_text(content)
-        
-        # Prepare data for ChromaDB
-        ids = []
-        embeddings = []
-        documents = []
-        metadatas = []
+        return self.ingest_reference_documents([{
+            "id": document_id,
+            "document_type": document_type,
+            "title": title,
+            "content": content,
+            "metadata": metadata
+        }])
+    
+    def ingest_reference_documents(self, documents: List[Dict]) -> int:
+        """
+        Ingest several reference documents with one batched embedding pass.
         
+        Each document is a dict with id, document_type, title, content and
+        optional metadata. Returns the total number of chunks stored for
+        them. Unchanged documents are skipped (see sync_reference_documents).
+        """
+        return self.sync_reference_documents(documents)["chunks_total"]
+    
+    def document_hash(self, doc: Dict) -> str:
+        """
+        Hash of everything that determines a document's chunks and vectors:
+        its fields, the chunker and its parameters and the embedding
+        model/backend.
+        """
+        return _sha256(json.dumps([
+            CHUNKER_VERSION,
+            self.embedder.model_id,
+            self.chunk_size,
+            self.chunk_overlap,
+            doc["document_type"],
+            doc["title"],
+            doc["content"],
+            doc.get("metadata") or {}
+        ], sort_keys=True, ensure_ascii=False, default=str))
+    
+    def _build_chunks(self, doc: Dict, content_hash: str) -> List[Dict]:
+        chunks = self.chunk_text(doc["content"])
+        built = []
         for idx, chunk in enumerate(chunks):
-            # Generate embedding
-            embedding = self.generate_embedding(chunk)
-            
-            # Create unique ID
-            chunk_id = f"{document_id}_chunk_{idx}"
-            
             # Prepare metadata
             chunk_metadata = {
-                "document_id": document_id,
-                "document_type": document_type,
-                "title": title,
+                "document_id": str(doc["id"]),
+                "document_type": doc["document_type"],
+                "title": doc["title"],
                 "chunk_index": idx,
                 "total_chunks": len(chunks)
             }
             
-            if metadata:
-                chunk_metadata.update(metadata)
+            if doc.get("metadata"):
+                chunk_metadata.update(doc["metadata"])
             
-            ids.append(chunk_id)
-            embeddings.append(embedding)
-            documents.append(chunk)
-            metadatas.append(chunk_metadata)
-        
-        # Add to ChromaDB collection
-        self.collection.add(
-            ids=ids,
-            embeddings=embeddings,
-            documents=documents,
-            metadatas=metadatas
-        )
+            chunk_metadata["content_hash"] = content_hash
+            chunk_metadata["chunk_hash"] = _sha256(chunk)
+            built.append({"id": f"{doc['id']}_chunk_{idx}", "text": chunk, "metadata": chunk_metadata})
+        return built
+    
+    def sync_reference_documents(self, documents: List[Dict], remove_missing: bool = False) -> Dict:
+        """
+        Bring the vector store in line with `documents`, doing work only
+        for what changed.
+        
+        Every chunk stores its document's content_hash and its own
+        chunk_hash. Documents whose stored content_hash matches are skipped
+        without chunking or embedding. A changed document is re-chunked;
+        chunks whose text matches one already stored for it reuse that
+        embedding, so only new text goes through the model. Chunk positions
+        past the new chunk count are deleted. With remove_missing, chunks
+        of documents not in `documents` are deleted too.
+        
+        Returns a report: document ids per outcome (added, changed,
+        unchanged, removed) and chunk counts (embedded, reused, written,
+        deleted, total).
+        """
+        report = {
+            "added": [],
+            "changed": [],
+            "unchanged": [],
+            "removed": [],
+            "chunks_embedded": 0,
+            "chunks_reused": 0,
+            "chunks_written": 0,
+            "chunks_deleted": 0,
+            "chunks_total": 0
+        }
+        wanted_ids = [str(doc["id"]) for doc in documents]
+        
+        # Stored chunk metadata (no vectors) grouped by document
+        stored: Dict[str, Dict[str, Dict]] = {}
+        for chunk in self.vector_store.get(document_ids=None if remove_missing else wanted_ids):
+            stored.setdefault(str(chunk["metadata"].get("document_id")), {})[chunk["id"]] = chunk["metadata"]
+        
+        pending = []
+        for doc in documents:
+            doc_id = str(doc["id"])
+            content_hash = self.document_hash(doc)
+            stored_chunks = stored.get(doc_id, {})
+            
+            if stored_chunks and all(m.get("content_hash") == content_hash for m in stored_chunks.values()):
+                report["unchanged"].append(doc_id)
+                report["chunks_total"] += len(stored_chunks)
+                continue
+            
+            chunks = self._build_chunks(doc, content_hash)
+            if not chunks and not stored_chunks:
+                # Empty document that was never stored
+                report["unchanged"].append(doc_id)
+                continue
+            
+            report["changed" if stored_chunks else "added"].append(doc_id)
+            pending.append((doc_id, chunks, stored_chunks))
+        
+        # Vectors of the changed documents' current chunks, by chunk text hash
+        reusable: Dict[str, Dict[str, np.ndarray]] = {}
+        changed_ids = [doc_id for doc_id, _, stored_chunks in pending if stored_chunks]
+        if changed_ids:
+            for chunk in self.vector_store.get(document_ids=changed_ids, include_embeddings=True):
+                chunk_hash = chunk["metadata"].get("chunk_hash")
+                if chunk_hash:
+                    reusable.setdefault(str(chunk["metadata"]["document_id"]), {})[chunk_hash] = chunk["embedding"]
+        
+        ids, texts, metadatas, vectors, to_embed, stale_ids = [], [], [], [], [], []
+        for doc_id, chunks, stored_chunks in pending:
+            known = reusable.get(doc_id, {})
+            for chunk in chunks:
+                vector = known.get(chunk["metadata"]["chunk_hash"])
+                if vector is None:
+                    to_embed.append(len(ids))
+                ids.append(chunk["id"])
+                texts.append(chunk["text"])
+                metadatas.append(chunk["metadata"])
+                vectors.append(vector)
+            new_ids = {chunk["id"] for chunk in chunks}
+            stale_ids.extend(chunk_id for chunk_id in stored_chunks if chunk_id not in new_ids)
+        
+        if remove_missing:
+            present = set(wanted_ids)
+            for doc_id, stored_chunks in stored.items():
+                if doc_id not in present:
+                    report["removed"].append(doc_id)
+                    stale_ids.extend(stored_chunks)
+        
+        if ids:
+            # One batched forward pass for every new chunk text
+            embedded = self.generate_embeddings([texts[i] for i in to_embed])
+            for row, i in enumerate(to_embed):
+                vectors[i] = embedded[row]
+            self.vector_store.add(ids, np.vstack(vectors).astype(np.float32), texts, metadatas)
+        if stale_ids:
+            self.vector_store.delete(stale_ids)
+        if ids or stale_ids:
+            self._bump_collection_version()
         
-        return len(chunks)
+        report["chunks_embedded"] = len(to_embed)
+        report["chunks_reused"] = len(ids) - len(to_embed)
+        report["chunks_written"] = len(ids)
+        report["chunks_deleted"] = len(stale_ids)
+        report["chunks_total"] += len(ids)
+        return report
     
     def retrieve_relevant_context(
         self,
@@ -134,26 +366,34 @@ class RAGService:
             List of relevant chunks with metadata
         """
         # Generate query embedding
-        query_embedding = self.generate_embedding(query)
+        query_embedding = self.generate_embeddings([query])
         
-        # Query ChromaDB
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k * 2,  # Get more results for filtering
-            where={"document_type": {"$in": document_types}} if document_types else None
-        )
-        
-        # Format results
-        relevant_chunks = []
-        if results['documents'] and results['documents'][0]:
-            for idx, doc in enumerate(results['documents'][0][:top_k]):
-                relevant_chunks.append({
-                    "text": doc,
-                    "metadata": results['metadatas'][0][idx],
-                    "distance": results['distances'][0][idx] if results.get('distances') else None
-                })
+        return self.vector_store.query(query_embedding[0], top_k, document_types)
+    
+    @staticmethod
+    def _format_context(chunks: List[Dict]) -> str:
+        # Combine chunks into context
+        context_parts = []
+        for chunk in chunks:
+            doc_type = chunk['metadata']['document_type']
+            title = chunk['metadata']['title']
+            text = chunk['text']
+            context_parts.append(f"[{doc_type.upper()} - {title}]\n{text}\n")
         
-        return relevant_chunks
+        return "\n".join(context_parts)
+    
+    def _get_cached_context(self, kind: str, job_title: Optional[str], build: Callable[[], str]) -> str:
+        """
+        Return a memoized context string. The key includes the collection
+        version, so any re-ingestion (in this or another process) makes old
+        entries unreachable.
+        """
+        key = (kind, job_title, self.get_collection_version())
+        context = self.context_cache.get(key)
+        if context is None:
+            context = build()
+            self.context_cache.set(key, context)
+        return context
     
     def get_context_for_cv_evaluation(self, job_title: str) -> str:
         """
@@ -163,23 +403,17 @@ class RAGService:
         - Job description requirements
         - CV scoring rubric
         """
-        query = f"Evaluate CV for {job_title} position. Technical skills, experience level, achievements, cultural fit."
-        
-        chunks = self.retrieve_relevant_context(
-            query=query,
-            document_types=['job_description', 'cv_rubric'],
-            top_k=5
-        )
-        
-        # Combine chunks into context
-        context_parts = []
-        for chunk in chunks:
-            doc_type = chunk['metadata']['document_type']
-            title = chunk['metadata']['title']
-            text = chunk['text']
-            context_parts.append(f"[{doc_type.upper()} - {title}]\n{text}\n")
+        def build() -> str:
+            query = f"Evaluate CV for {job_title} position. Technical skills, experience level, achievements, cultural fit."
+            
+            chunks = self.retrieve_relevant_context(
+                query=query,
+                document_types=['job_description', 'cv_rubric'],
+                top_k=5
+            )
+            return self._format_context(chunks)
         
-        return "\n".join(context_parts)
+        return self._get_cached_context("cv", job_title, build)
     
     def get_context_for_project_evaluation(self) -> str:
         """
@@ -189,36 +423,79 @@ class RAGService:
         - Case study brief requirements
         - Project scoring rubric
         """
-        query = "Evaluate project report. Correctness, code quality, resilience, error handling, documentation, creativity."
-        
-        chunks = self.retrieve_relevant_context(
-            query=query,
-            document_types=['case_study_brief', 'project_rubric'],
-            top_k=5
-        )
+        def build() -> str:
+            query = "Evaluate project report. Correctness, code quality, resilience, error handling, documentation, creativity."
+            
+            chunks = self.retrieve_relevant_context(
+                query=query,
+                document_types=['case_study_brief', 'project_rubric'],
+                top_k=5
+            )
+            return self._format_context(chunks)
         
-        # Combine chunks into context
-        context_parts = []
-        for chunk in chunks:
-            doc_type = chunk['metadata']['document_type']
-            title = chunk['metadata']['title']
-            text = chunk['text']
-            context_parts.append(f"[{doc_type.upper()} - {title}]\n{text}\n")
+        return self._get_cached_context("project", None, build)
+    
+    def get_collection_version(self) -> str:
+        """
+        Token identifying the current contents of the collection. Stored in
+        a file next to the Chroma data so writers in other processes (e.g.
+        the ingestion scripts) invalidate every worker's context cache.
+        Stores shared across nodes (pgvector) report their own version;
+        that costs a query, so it is re-read at most every
+        RAG_VERSION_CHECK_INTERVAL seconds (and after writes from this
+        process).
+        """
+        now = time.monotonic()
+        if (self._store_version_checked is None
+                or now - self._store_version_checked >= settings.RAG_VERSION_CHECK_INTERVAL):
+            self._store_version = self.vector_store.version()
+            self._store_version_checked = now
+        version = self._store_version
+        if version is not None:
+            return version
+        try:
+            with open(self._version_file, "r") as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return ""
+    
+    def _bump_collection_version(self):
+        os.makedirs(os.path.dirname(self._version_file), exist_ok=True)
+        tmp_path = f"{self._version_file}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(uuid.uuid4().hex)
+        os.replace(tmp_path, self._version_file)
+        self._store_version_checked = None
+        self.context_cache.clear()
+    
+    def get_context_cache_stats(self) -> Dict:
+        """Hit/miss counters for the evaluation context cache"""
+        return self.context_cache.stats()
+    
+    def warm_up(self):
+        """
+        Exercise the embedding model, tokenizer and collection once so the
+        first real job does not pay their lazy initialization cost.
+        """
+        # Straight to the model: a cache hit would leave it unloaded
+        embedding = self.embedder.encode(["warm-up query"], 1, False)
+        self.tokenizer.encode("warm-up query")
         
-        return "\n".join(context_parts)
+        if self.vector_store.count() > 0:
+            self.vector_store.query(embedding[0], 1)
     
     def clear_collection(self):
         """Clear all documents from the collection (useful for re-ingestion)"""
-        self.chroma_client.delete_collection("reference_documents")
-        self.collection = self.chroma_client.get_or_create_collection(
-            name="reference_documents",
-            metadata={"hnsw:space": "cosine"}
-        )
+        self.vector_store.clear()
+        self._bump_collection_version()
     
     def get_collection_stats(self) -> Dict:
         """Get statistics about the vector database"""
-        count = self.collection.count()
+        count = self.vector_store.count()
         return {
             "total_chunks": count,
-            "collection_name": self.collection.name
+            "collection_name": self.vector_store.name,
+            "vector_store": type(self.vector_store).__name__,
+            "context_cache": self.get_context_cache_stats(),
+            "embedding_cache": self.embedding_cache.stats() if self.embedding_cache else None
         }
@@ -0,0 +1,258 @@
+import redis
+from app.config import settings
+from collections import deque
+from typing import Dict, Mapping, Optional
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# Two token buckets (requests/min, tokens/min) checked and debited together.
+# Redis' clock is used so every worker agrees on refill timing. Bucket
+# capacities learnt from response headers are stored in the bucket hashes
+# and take precedence over the configured ones.
+#
+# KEYS: requests bucket, tokens bucket, blocked-until key
+# ARGV: requests capacity, tokens capacity, tokens wanted
+# Returns 0 when granted, otherwise milliseconds to wait before retrying.
+ACQUIRE_SCRIPT = """
+local now_t = redis.call('TIME')
+local now = tonumber(now_t[1]) * 1000 + math.floor(tonumber(now_t[2]) / 1000)
+
+local blocked = tonumber(redis.call('GET', KEYS[3]) or '0')
+if blocked > now then
+    return blocked - now
+end
+
+local wanted = {1, tonumber(ARGV[3])}
+local state = {}
+local wait = 0
+for i = 1, 2 do
+    local bucket = redis.call('HMGET', KEYS[i], 'tokens', 'ts', 'cap')
+    local cap = tonumber(bucket[3]) or tonumber(ARGV[i])
+    local tokens = tonumber(bucket[1]) or cap
+    local ts = tonumber(bucket[2]) or now
+    local rate = cap / 60000
+    tokens = math.min(cap, tokens + math.max(0, now - ts) * rate)
+    local need = math.min(wanted[i], cap)
+    if tokens < need then
+        wait = math.max(wait, math.ceil((need - tokens) / rate))
+    end
+    state[i] = {tokens, need}
+end
+
+for i = 1, 2 do
+    local tokens = state[i][1]
+    if wait == 0 then
+        tokens = tokens - state[i][2]
+    end
+    redis.call('HSET', KEYS[i], 'tokens', tokens, 'ts', now)
+    redis.call('PEXPIRE', KEYS[i], 120000)
+end
+return wait
+"""
+
+# Apply what the API reported: cap the tokens bucket at the remaining
+# budget, remember the real limit, and settle the reservation (a positive
+# refund returns unused tokens, a negative one debits an overrun).
+#
+# KEYS: tokens bucket
+# ARGV: remaining (or ''), limit (or ''), refund
+SYNC_SCRIPT = """
+local now_t = redis.call('TIME')
+local now = tonumber(now_t[1]) * 1000 + math.floor(tonumber(now_t[2]) / 1000)
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'cap')
+local cap = tonumber(ARGV[2]) or tonumber(bucket[3])
+if not cap then
+    return 0
+end
+local tokens = tonumber(bucket[1]) or cap
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(cap, tokens + math.max(0, now - ts) * cap / 60000 + tonumber(ARGV[3]))
+local remaining = tonumber(ARGV[1])
+if remaining then
+    tokens = math.min(tokens, remaining)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now, 'cap', cap)
+redis.call('PEXPIRE', KEYS[1], 120000)
+return 0
+"""
+
+
+class RateLimitTimeout(Exception):
+    """Raised when rate-limit budget doesn't free up within LLM_RATE_LIMIT_MAX_WAIT"""
+    pass
+
+
+class CompletionEstimator:
+    """
+    Expected completion size for reservations: the p95 of recent
+    completions (per process), or `default` until any are seen. Reserving
+    the max_tokens cap instead would let a 6000 TPM budget admit about
+    one request at a time.
+    """
+    def __init__(self, default: int, window: int = 50):
+        self.default = default
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, completion_tokens: int):
+        with self._lock:
+            self._samples.append(completion_tokens)
+
+    def estimate(self, cap: int) -> int:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return min(self.default, cap)
+        return min(samples[min(len(samples) - 1, int(len(samples) * 0.95))], cap)
+
+
+class RedisRateLimiter:
+    """
+    Cluster-wide requests-per-minute and tokens-per-minute limiter for one
+    Groq model, shared by every worker through Redis.
+
+    acquire() reserves one request plus the prompt and expected completion
+    tokens (reservation()), sleeping until both buckets have room. After
+    the call, sync_from_headers() corrects the tokens bucket with Groq's
+    x-ratelimit-*-tokens headers and settles the reservation against the
+    tokens actually used; a failed call gives its whole reservation back.
+    block_for() makes every worker pause after a 429. If Redis is
+    unreachable calls are let through.
+    """
+    def __init__(
+        self,
+        client: redis.Redis,
+        model: str,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_wait: float,
+        completion_estimate: int = 1000
+    ):
+        self.client = client
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_wait = max_wait
+        self.completions = CompletionEstimator(completion_estimate)
+        prefix = f"groq:ratelimit:{model}"
+        self.keys = [f"{prefix}:requests", f"{prefix}:tokens", f"{prefix}:blocked_until"]
+        self._acquire = client.register_script(ACQUIRE_SCRIPT)
+        self._sync = client.register_script(SYNC_SCRIPT)
+
+    def reservation(self, prompt_tokens: int, max_completion_tokens: int) -> int:
+        """Tokens to reserve for a request: its prompt plus the expected completion"""
+        return prompt_tokens + self.completions.estimate(max_completion_tokens)
+
+    def _try_acquire(self, tokens: int) -> float:
+        """Seconds to wait before budget is available (0 = reserved now)"""
+        try:
+            wait_ms = self._acquire(
+                keys=self.keys,
+                args=[self.requests_per_minute, self.tokens_per_minute, max(int(tokens), 0)]
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Rate limiter unavailable, not limiting: {str(e)}")
+            return 0
+        return int(wait_ms) / 1000
+
+    def _next_wait(self, tokens: int, deadline: float) -> float:
+        wait = self._try_acquire(tokens)
+        if wait <= 0:
+            return 0
+        if time.monotonic() + wait > deadline:
+            raise RateLimitTimeout(
+                f"Groq rate-limit budget for {tokens} tokens not available within {self.max_wait}s"
+            )
+        # Jitter spreads out workers that were woken by the same refill
+        return wait + random.uniform(0, 0.05 + wait * 0.1)
+
+    def acquire(self, tokens: int):
+        """Block until one request and `tokens` tokens are reserved"""
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = self._next_wait(tokens, deadline)
+            if wait == 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int):
+        """acquire() for event loops; Redis calls run in a worker thread"""
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            wait = await asyncio.to_thread(self._next_wait, tokens, deadline)
+            if wait == 0:
+                return
+            await asyncio.sleep(wait)
+
+    def sync_from_headers(self, headers: Mapping[str, str], reserved_tokens: int = 0, used_tokens: int = 0):
+        """
+        Update the tokens bucket from a response. Groq's request headers
+        count requests per day, so only the TPM headers are applied.
+        """
+        remaining = headers.get("x-ratelimit-remaining-tokens")
+        limit = headers.get("x-ratelimit-limit-tokens")
+        refund = reserved_tokens - used_tokens
+        if remaining is None and limit is None and refund == 0:
+            return
+        try:
+            self._sync(keys=[self.keys[1]], args=[remaining or "", limit or "", refund])
+        except redis.RedisError as e:
+            logger.warning(f"Failed to sync rate limiter from headers: {str(e)}")
+
+    def block_for(self, seconds: Optional[float]):
+        """Pause all workers for `seconds` (e.g. a 429's retry-after)"""
+        if not seconds or seconds <= 0:
+            return
+        try:
+            until_ms = int(self.client.time()[0] * 1000 + seconds * 1000)
+            self.client.set(self.keys[2], until_ms, px=int(seconds * 1000))
+        except redis.RedisError as e:
+            logger.warning(f"Failed to record rate-limit pause: {str(e)}")
+
+    def stats(self) -> Dict:
+        try:
+            requests_bucket = self.client.hgetall(self.keys[0])
+            tokens_bucket = self.client.hgetall(self.keys[1])
+        except redis.RedisError:
+            return {}
+        return {
+            "requests_available": float(requests_bucket.get(b"tokens", self.requests_per_minute)),
+            "tokens_available": float(tokens_bucket.get(b"tokens", self.tokens_per_minute)),
+            "tokens_per_minute": float(tokens_bucket.get(b"cap", self.tokens_per_minute))
+        }
+
+
+_limiters: Dict[str, RedisRateLimiter] = {}
+_limiters_pid: Optional[int] = None
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str) -> Optional[RedisRateLimiter]:
+    """Per-process limiter for a model, or None if LLM_RATE_LIMIT_ENABLED is off"""
+    global _limiters, _limiters_pid
+
+    if not settings.LLM_RATE_LIMIT_ENABLED:
+        return None
+
+    with _limiters_lock:
+        if _limiters_pid != os.getpid():
+            _limiters = {}
+            _limiters_pid = os.getpid()
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limiter = RedisRateLimiter(
+                redis.Redis.from_url(settings.redis_url, socket_timeout=5),
+                model,
+                requests_per_minute=settings.LLM_RATE_LIMIT_RPM,
+                tokens_per_minute=settings.LLM_RATE_LIMIT_TPM,
+                max_wait=settings.LLM_RATE_LIMIT_MAX_WAIT,
+                completion_estimate=settings.LLM_RATE_LIMIT_COMPLETION_ESTIMATE
+            )
+            _limiters[model] = limiter
+        return limiter
@@ -0,0 +1,82 @@
+from app.services.rag_service import RAGService
+from app.services.llm_service import LLMService
+from typing import Optional
+import os
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """
+    Holds the services that are expensive to build (embedding model,
+    vector store, tokenizer, Groq HTTP client) so a worker process
+    creates them once and reuses them for every task.
+    """
+    def __init__(self):
+        self.pid = os.getpid()
+        self.rag_service = RAGService()
+        self.llm_service = LLMService()
+        self.ready = False
+
+    def warm_up(self):
+        """Run a dummy encode and query so the first job starts warm."""
+        start_time = time.time()
+        self.rag_service.warm_up()
+        self.ready = True
+        logger.info(f"Worker services warmed up in {time.time() - start_time:.2f}s (pid {self.pid})")
+
+
+_container: Optional[ServiceContainer] = None
+_lock = threading.Lock()
+
+
+def init_services(warm_up: bool = True) -> ServiceContainer:
+    """
+    Build (or rebuild after a fork) the process-wide service container.
+    Called from the Celery worker_process_init hook.
+    """
+    global _container
+
+    with _lock:
+        if _container is None or _container.pid != os.getpid():
+            _container = ServiceContainer()
+
+        if warm_up and not _container.ready:
+            _container.warm_up()
+
+        return _container
+
+
+def get_services() -> ServiceContainer:
+    """
+    Return the container for the current process, initializing it lazily
+    if the worker hook did not run (e.g. eager mode or a plain script).
+    """
+    container = _container
+    if container is None or container.pid != os.getpid():
+        return init_services(warm_up=False)
+    return container
+
+
+def is_ready() -> bool:
+    """True once the current process has a warmed-up container."""
+    container = _container
+    return container is not None and container.pid == os.getpid() and container.ready
+
+
+def reset_services():
+    """
+    Drop the container without touching its clients. Used after fork:
+    the child must not reuse the parent's SQLite handles, HTTP pools or
+    torch thread pools, so it builds its own on next use.
+    """
+    global _container, _lock
+    _container = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_services)
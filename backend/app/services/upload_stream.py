@@ -0,0 +1,148 @@
+from multipart.multipart import MultipartParser, parse_options_header
+from typing import Dict, Optional
+from uuid import uuid4
+import hashlib
+import os
+
+PDF_MAGIC = b"%PDF-"
+
+
+class UploadRejected(Exception):
+    """Upload refused while streaming; carries the HTTP status to return"""
+    def __init__(self, status_code: int, message: str):
+        self.status_code = status_code
+        self.message = message
+        super().__init__(message)
+
+
+class StreamingPDFWriter:
+    """
+    Writes one uploaded file to disk as it arrives.
+
+    The PDF magic bytes are checked on the first bytes received, the size
+    limit is enforced on every chunk, and a SHA-256 is computed while
+    writing, so memory use is constant regardless of file size. Data goes
+    to a temporary file that is only renamed into place on success.
+    """
+    def __init__(self, file_path: str, max_size: int, label: str, buffer_size: int = 65536):
+        self.file_path = file_path
+        self.tmp_path = f"{file_path}.part"
+        self.max_size = max_size
+        self.label = label
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        self._head = b""
+        self._file = open(self.tmp_path, "wb", buffering=buffer_size)
+
+    def write(self, data: bytes):
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise UploadRejected(413, f"{self.label} file size exceeds {self.max_size} bytes")
+
+        if len(self._head) < len(PDF_MAGIC):
+            self._head += data[:len(PDF_MAGIC) - len(self._head)]
+            if not PDF_MAGIC.startswith(self._head):
+                raise UploadRejected(400, f"{self.label} file is not a PDF")
+
+        self.sha256.update(data)
+        self._file.write(data)
+
+    def finish(self):
+        self._file.close()
+        if self._head != PDF_MAGIC:
+            raise UploadRejected(400, f"{self.label} file is not a PDF")
+        os.replace(self.tmp_path, self.file_path)
+
+    def abort(self):
+        if not self._file.closed:
+            self._file.close()
+        for path in (self.tmp_path, self.file_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    @property
+    def hexdigest(self) -> str:
+        return self.sha256.hexdigest()
+
+
+class MultipartPDFReceiver:
+    """
+    Incremental multipart/form-data parser that streams selected file
+    fields straight to disk through StreamingPDFWriter.
+
+    `fields` maps form field names to (file_type, label), e.g.
+    {"cv": ("cv", "CV")}. Unknown fields are ignored without buffering.
+    """
+    def __init__(self, content_type: str, upload_dir: str, max_size: int, fields: Dict[str, tuple]):
+        mime_type, params = parse_options_header(content_type)
+        if mime_type != b"multipart/form-data" or b"boundary" not in params:
+            raise UploadRejected(400, "Expected a multipart/form-data body")
+
+        self.upload_dir = upload_dir
+        self.max_size = max_size
+        self.fields = fields
+        self.writers: Dict[str, StreamingPDFWriter] = {}
+
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: Dict[bytes, bytes] = {}
+        self._current: Optional[StreamingPDFWriter] = None
+
+        self.parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._current = None
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if name not in self.fields or b"filename" not in options:
+            return
+        if name in self.writers:
+            raise UploadRejected(400, f"Field '{name}' was sent more than once")
+
+        file_type, label = self.fields[name]
+        file_path = os.path.join(self.upload_dir, f"{uuid4()}_{name}.pdf")
+        self._current = StreamingPDFWriter(file_path, self.max_size, label)
+        self.writers[name] = self._current
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        if self._current is not None:
+            self._current.write(data[start:end])
+
+    def _on_part_end(self):
+        if self._current is not None:
+            self._current.finish()
+            self._current = None
+
+    def feed(self, chunk: bytes):
+        self.parser.write(chunk)
+
+    def close(self):
+        self.parser.finalize()
+        if self._current is not None:
+            raise UploadRejected(400, "Multipart body ended in the middle of a file")
+
+    def abort(self):
+        for writer in self.writers.values():
+            writer.abort()
@@ -0,0 +1,462 @@
+from app.config import settings
+from app.database import execute_query, execute_query_one, execute_values_query, unit_of_work
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import uuid4
+import numpy as np
+import glob
+import json
+import os
+import threading
+
+COLLECTION_NAME = "reference_documents"
+
+
+class VectorStore:
+    """
+    Storage and similarity search for reference-document chunks.
+
+    RAGService embeds text itself and hands backends float32 vectors, so a
+    backend only stores rows and answers top-k queries. Distances are
+    cosine distances (1 - cosine similarity) for every backend.
+    """
+    name = COLLECTION_NAME
+
+    def add(self, ids: List[str], embeddings: np.ndarray, documents: List[str], metadatas: List[Dict]):
+        """Insert chunks, replacing any stored under the same ids"""
+        raise NotImplementedError
+
+    def get(self, document_ids: Optional[Sequence[str]] = None, include_embeddings: bool = False) -> List[Dict]:
+        """Stored chunks (all, or of document_ids) as {"id", "metadata"[, "embedding"]}"""
+        raise NotImplementedError
+
+    def delete(self, ids: Sequence[str]):
+        raise NotImplementedError
+
+    def query(self, embedding: np.ndarray, top_k: int, document_types: Optional[Sequence[str]] = None) -> List[Dict]:
+        """Return up to top_k chunks as {"text", "metadata", "distance"}, nearest first"""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def version(self) -> Optional[str]:
+        """
+        Token that changes whenever the stored chunks change, for stores
+        shared across nodes; None means RAGService tracks versions itself.
+        """
+        return None
+
+
+class ChromaVectorStore(VectorStore):
+    """Persistent ChromaDB collection (SQLite + HNSW); in-memory if persist_dir is None."""
+    def __init__(self, persist_dir: Optional[str]):
+        # Imported here so other backends don't load Chroma's stack
+        import chromadb
+        from chromadb.config import Settings
+
+        if persist_dir is None:
+            self.client = chromadb.EphemeralClient(settings=Settings(anonymized_telemetry=False))
+        else:
+            self.client = chromadb.PersistentClient(
+                path=persist_dir,
+                settings=Settings(anonymized_telemetry=False)
+            )
+        self.collection = self._get_collection()
+
+    def _get_collection(self):
+        return self.client.get_or_create_collection(
+            name=COLLECTION_NAME,
+            metadata={"hnsw:space": "cosine"}
+        )
+
+    def add(self, ids, embeddings, documents, metadatas):
+        self.collection.upsert(
+            ids=ids,
+            embeddings=embeddings.tolist(),
+            documents=documents,
+            metadatas=metadatas
+        )
+
+    def get(self, document_ids=None, include_embeddings=False):
+        if document_ids is not None and not document_ids:
+            return []
+        results = self.collection.get(
+            where={"document_id": {"$in": list(document_ids)}} if document_ids else None,
+            include=["metadatas", "embeddings"] if include_embeddings else ["metadatas"]
+        )
+        chunks = []
+        for idx, chunk_id in enumerate(results['ids']):
+            chunk = {"id": chunk_id, "metadata": results['metadatas'][idx]}
+            if include_embeddings:
+                chunk["embedding"] = np.asarray(results['embeddings'][idx], dtype=np.float32)
+            chunks.append(chunk)
+        return chunks
+
+    def delete(self, ids):
+        if ids:
+            self.collection.delete(ids=list(ids))
+
+    def query(self, embedding, top_k, document_types=None):
+        results = self.collection.query(
+            query_embeddings=[np.asarray(embedding, dtype=np.float32).ravel().tolist()],
+            n_results=top_k * 2,  # Get more results for filtering
+            where={"document_type": {"$in": list(document_types)}} if document_types else None
+        )
+
+        chunks = []
+        if results['documents'] and results['documents'][0]:
+            for idx, doc in enumerate(results['documents'][0][:top_k]):
+                chunks.append({
+                    "text": doc,
+                    "metadata": results['metadatas'][0][idx],
+                    "distance": results['distances'][0][idx] if results.get('distances') else None
+                })
+        return chunks
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def clear(self):
+        self.client.delete_collection(COLLECTION_NAME)
+        self.collection = self._get_collection()
+
+
+class _IndexSnapshot:
+    """Immutable view of a loaded NumPy index; swapped whole on reload."""
+    def __init__(self, matrix: np.ndarray, ids: List[str], documents: List[str], metadatas: List[Dict]):
+        self.matrix = matrix
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.type_masks: Dict[str, np.ndarray] = {}
+        types = np.array([metadata.get("document_type", "") for metadata in metadatas], dtype=object)
+        for document_type in set(types.tolist()):
+            self.type_masks[document_type] = types == document_type
+        self._rows_cache: Dict[Tuple[str, ...], np.ndarray] = {}
+
+    def rows_for(self, document_types: Sequence[str]) -> np.ndarray:
+        """Row indices of the given document types (cached per combination)"""
+        key = tuple(sorted(set(document_types)))
+        rows = self._rows_cache.get(key)
+        if rows is None:
+            mask = np.zeros(len(self.ids), dtype=bool)
+            for document_type in key:
+                if document_type in self.type_masks:
+                    mask |= self.type_masks[document_type]
+            rows = np.flatnonzero(mask)
+            self._rows_cache[key] = rows
+        return rows
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    In-process index for small corpora: all chunk embeddings live in one
+    contiguous, L2-normalized float32 (or float16) matrix, optionally
+    memory-mapped so worker processes share the pages. A query is one
+    matrix-vector product over the rows selected by precomputed
+    document_type masks, plus argpartition for the top-k.
+
+    Files in `directory`: embeddings-<id>.npy and an index.json manifest
+    (ids, texts, metadata) that is replaced atomically on every write.
+    Other processes notice the new manifest and reload on their next query.
+    """
+    def __init__(self, directory: str, dtype: str = "float32", mmap: bool = True):
+        self.directory = directory
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float16):
+            raise ValueError(f"Unsupported vector index dtype '{dtype}'")
+        self.mmap = mmap
+        self.manifest_path = os.path.join(directory, "index.json")
+        self._lock = threading.Lock()
+        self._snapshot = _IndexSnapshot(np.empty((0, 0), dtype=self.dtype), [], [], [])
+        self._stamp = None
+
+    def _manifest_stamp(self):
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _current(self) -> _IndexSnapshot:
+        """Loaded snapshot, reloading first if another process rewrote the index"""
+        stamp = self._manifest_stamp()
+        if stamp == self._stamp:
+            return self._snapshot
+        with self._lock:
+            if stamp != self._stamp:
+                self._snapshot = self._load()
+                self._stamp = stamp
+            return self._snapshot
+
+    def _load(self) -> _IndexSnapshot:
+        if not os.path.exists(self.manifest_path):
+            return _IndexSnapshot(np.empty((0, 0), dtype=self.dtype), [], [], [])
+        for attempt in range(3):
+            with open(self.manifest_path, "r") as f:
+                manifest = json.load(f)
+            path = os.path.join(self.directory, manifest["embeddings_file"])
+            try:
+                matrix = np.load(path, mmap_mode="r" if self.mmap else None)
+                break
+            except FileNotFoundError:
+                # A writer replaced the index between reading the manifest and the matrix
+                if attempt == 2:
+                    raise
+        if matrix.dtype != self.dtype:
+            # Index written with another VECTOR_INDEX_DTYPE; convert in memory
+            matrix = np.ascontiguousarray(matrix, dtype=self.dtype)
+        return _IndexSnapshot(matrix, manifest["ids"], manifest["documents"], manifest["metadatas"])
+
+    def _write(self, matrix: np.ndarray, ids: List[str], documents: List[str], metadatas: List[Dict]):
+        os.makedirs(self.directory, exist_ok=True)
+        embeddings_file = f"embeddings-{uuid4().hex}.npy"
+        tmp_path = os.path.join(self.directory, f"{embeddings_file}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(matrix, dtype=self.dtype))
+        os.replace(tmp_path, os.path.join(self.directory, embeddings_file))
+
+        manifest = {"embeddings_file": embeddings_file, "ids": ids, "documents": documents, "metadatas": metadatas}
+        tmp_manifest = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_manifest, "w") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_manifest, self.manifest_path)
+
+        # Readers that still map an old file keep it alive until they reload
+        for path in glob.glob(os.path.join(self.directory, "embeddings-*.npy")):
+            if os.path.basename(path) != embeddings_file:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def add(self, ids, embeddings, documents, metadatas):
+        with self._lock:
+            current = self._load()
+            # Re-adding an id replaces its row
+            replaced = set(ids)
+            keep = [i for i, chunk_id in enumerate(current.ids) if chunk_id not in replaced]
+            new_rows = _normalize(embeddings).astype(self.dtype)
+            if current.matrix.size:
+                matrix = np.concatenate([np.asarray(current.matrix[keep]), new_rows])
+            else:
+                matrix = new_rows
+            self._write(
+                matrix,
+                [current.ids[i] for i in keep] + list(ids),
+                [current.documents[i] for i in keep] + list(documents),
+                [current.metadatas[i] for i in keep] + list(metadatas)
+            )
+            self._stamp = None
+
+    def get(self, document_ids=None, include_embeddings=False):
+        snapshot = self._current()
+        wanted = set(document_ids) if document_ids is not None else None
+        chunks = []
+        for row, (chunk_id, metadata) in enumerate(zip(snapshot.ids, snapshot.metadatas)):
+            if wanted is not None and metadata.get("document_id") not in wanted:
+                continue
+            chunk = {"id": chunk_id, "metadata": metadata}
+            if include_embeddings:
+                chunk["embedding"] = np.asarray(snapshot.matrix[row], dtype=np.float32)
+            chunks.append(chunk)
+        return chunks
+
+    def delete(self, ids):
+        if not ids:
+            return
+        with self._lock:
+            current = self._load()
+            removed = set(ids)
+            keep = [i for i, chunk_id in enumerate(current.ids) if chunk_id not in removed]
+            if len(keep) == len(current.ids):
+                return
+            self._write(
+                np.asarray(current.matrix[keep]) if keep else np.empty((0, 0), dtype=self.dtype),
+                [current.ids[i] for i in keep],
+                [current.documents[i] for i in keep],
+                [current.metadatas[i] for i in keep]
+            )
+            self._stamp = None
+
+    def query(self, embedding, top_k, document_types=None):
+        snapshot = self._current()
+        if not snapshot.ids or top_k <= 0:
+            return []
+
+        rows = snapshot.rows_for(document_types) if document_types else None
+        candidates = snapshot.matrix if rows is None else snapshot.matrix[rows]
+        # NumPy has no BLAS path for float16; score in float32
+        query_vector = _normalize(np.asarray(embedding).ravel())
+        scores = candidates.astype(np.float32, copy=False) @ query_vector
+
+        k = min(top_k, len(scores))
+        if k == 0:
+            return []
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        chunks = []
+        for position in top:
+            row = int(rows[position]) if rows is not None else int(position)
+            chunks.append({
+                "text": snapshot.documents[row],
+                "metadata": snapshot.metadatas[row],
+                "distance": float(1.0 - scores[position])
+            })
+        return chunks
+
+    def count(self) -> int:
+        return len(self._current().ids)
+
+    def clear(self):
+        with self._lock:
+            self._write(np.empty((0, 0), dtype=self.dtype), [], [], [])
+            self._stamp = None
+
+
+def _vector_literal(vector: np.ndarray) -> str:
+    """pgvector text input, e.g. '[0.1,0.2]' (no client-side adapter needed)"""
+    return "[" + ",".join(format(float(x), ".8g") for x in vector) + "]"
+
+
+class PgVectorStore(VectorStore):
+    """
+    Chunks in Postgres (vector_embeddings, pgvector) behind an HNSW cosine
+    index, queried through the shared connection pool. Every node reads
+    the same rows, so there is no per-node index to build or keep in sync.
+    document_type filtering happens in SQL.
+    """
+    name = "vector_embeddings"
+
+    def __init__(self, ef_search: int):
+        self.ef_search = ef_search
+
+    def add(self, ids, embeddings, documents, metadatas):
+        rows = [
+            (
+                metadata["document_id"],
+                metadata["document_type"],
+                int(metadata["chunk_index"]),
+                document,
+                _vector_literal(embedding),
+                json.dumps(metadata, ensure_ascii=False)
+            )
+            for embedding, document, metadata in zip(embeddings, documents, metadatas)
+        ]
+        execute_values_query(
+            """
+            INSERT INTO vector_embeddings
+            (reference_document_id, document_type, chunk_index, chunk_text, embedding, metadata)
+            VALUES %s
+            ON CONFLICT (reference_document_id, chunk_index) DO UPDATE SET
+                document_type = EXCLUDED.document_type,
+                chunk_text = EXCLUDED.chunk_text,
+                embedding = EXCLUDED.embedding,
+                metadata = EXCLUDED.metadata,
+                created_at = NOW()
+            """,
+            rows,
+            template="(%s::uuid, %s, %s, %s, %s::vector, %s::jsonb)"
+        )
+
+    def get(self, document_ids=None, include_embeddings=False):
+        if document_ids is not None and not document_ids:
+            return []
+        embedding_column = ", embedding::text AS embedding" if include_embeddings else ""
+        query = f"""
+            SELECT reference_document_id, chunk_index, metadata{embedding_column}
+            FROM vector_embeddings
+            {"WHERE reference_document_id = ANY(%s::uuid[])" if document_ids else ""}
+            ORDER BY reference_document_id, chunk_index
+        """
+        rows = execute_query(query, (list(document_ids),) if document_ids else None)
+
+        chunks = []
+        for row in rows:
+            chunk = {"id": f"{row['reference_document_id']}_chunk_{row['chunk_index']}", "metadata": row['metadata']}
+            if include_embeddings:
+                chunk["embedding"] = np.array(json.loads(row['embedding']), dtype=np.float32)
+            chunks.append(chunk)
+        return chunks
+
+    def delete(self, ids):
+        # Chunk ids are "<reference_document_id>_chunk_<chunk_index>"
+        keys = [tuple(chunk_id.rsplit("_chunk_", 1)) for chunk_id in ids]
+        if not keys:
+            return
+        execute_values_query(
+            """
+            DELETE FROM vector_embeddings v
+            USING (VALUES %s) AS d(reference_document_id, chunk_index)
+            WHERE v.reference_document_id = d.reference_document_id
+            AND v.chunk_index = d.chunk_index
+            """,
+            keys,
+            template="(%s::uuid, %s::int)"
+        )
+
+    def query(self, embedding, top_k, document_types=None):
+        vector = _vector_literal(np.asarray(embedding, dtype=np.float32).ravel())
+        type_filter = "WHERE document_type = ANY(%s)" if document_types else ""
+        query = f"""
+            SELECT chunk_text, metadata, embedding <=> %s::vector AS distance
+            FROM vector_embeddings
+            {type_filter}
+            ORDER BY embedding <=> %s::vector
+            LIMIT %s
+        """
+        params = (vector, list(document_types), vector, top_k) if document_types else (vector, vector, top_k)
+
+        with unit_of_work():
+            # The HNSW scan filters after collecting ef_search candidates;
+            # a wider search keeps filtered queries from returning < top_k
+            execute_query("SELECT set_config('hnsw.ef_search', %s, true)", (str(self.ef_search),))
+            rows = execute_query(query, params)
+
+        return [
+            {"text": row['chunk_text'], "metadata": row['metadata'], "distance": float(row['distance'])}
+            for row in rows
+        ]
+
+    def count(self) -> int:
+        result = execute_query_one("SELECT COUNT(*) AS count FROM vector_embeddings")
+        return result['count'] if result else 0
+
+    def clear(self):
+        execute_query("DELETE FROM vector_embeddings", fetch=False)
+
+    def version(self) -> Optional[str]:
+        result = execute_query_one("""
+            SELECT COUNT(*) AS count, MAX(created_at) AS updated
+            FROM vector_embeddings
+        """)
+        return f"{result['count']}:{result['updated']}" if result else ""
+
+
+def create_vector_store(backend: Optional[str] = None) -> VectorStore:
+    """Build the backend selected by VECTOR_STORE_BACKEND ('chroma', 'numpy' or 'pgvector')"""
+    backend = (backend or settings.VECTOR_STORE_BACKEND).lower()
+    if backend == "chroma":
+        return ChromaVectorStore(settings.CHROMA_PERSIST_DIR)
+    if backend == "numpy":
+        return NumpyVectorStore(
+            settings.VECTOR_INDEX_DIR,
+            dtype=settings.VECTOR_INDEX_DTYPE,
+            mmap=settings.VECTOR_INDEX_MMAP
+        )
+    if backend == "pgvector":
+        return PgVectorStore(ef_search=settings.PGVECTOR_EF_SEARCH)
+    raise ValueError(f"Unknown vector store backend '{backend}'")
@@ -1,77 +1,150 @@
 from app.tasks.celery_config import celery_app
-from app.database import execute_query
+from app.database import execute_query, iter_query_batches, unit_of_work
+from app.config import settings
+from celery.exceptions import SoftTimeLimitExceeded
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Dict, Optional
 import os
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-@celery_app.task
-def cleanup_old_jobs():
+def _resolve_cutoff(cutoff_date: Optional[str]) -> datetime:
+    """Cutoff passed by a previous (interrupted) run, or now - retention"""
+    if cutoff_date:
+        return datetime.fromisoformat(cutoff_date)
+    return datetime.utcnow() - timedelta(days=settings.CLEANUP_RETENTION_DAYS)
+
+
+def _report_progress(task, progress: Dict):
+    # update_state needs a task id; there is none when called directly
+    if task.request.id:
+        task.update_state(state='PROGRESS', meta=progress)
+
+
+def _remove_file(file_path: str) -> str:
+    """Remove an uploaded file: 'deleted', 'missing' or 'failed'"""
+    try:
+        os.remove(file_path)
+        return 'deleted'
+    except FileNotFoundError:
+        return 'missing'
+    except Exception as e:
+        logger.warning(f"Failed to delete file {file_path}: {str(e)}")
+        return 'failed'
+
+
+@celery_app.task(bind=True)
+def cleanup_old_jobs(self, cutoff_date: Optional[str] = None, batch_size: Optional[int] = None):
+    """
+    Clean up finished evaluation jobs older than CLEANUP_RETENTION_DAYS.
+
+    Candidates are read through a server-side cursor and deleted in
+    batches of CLEANUP_BATCH_SIZE, one short transaction each, so locks
+    are held briefly. Every batch commits on its own: an interrupted run
+    leaves only unprocessed jobs behind and the next run picks them up.
+    """
+    cutoff = _resolve_cutoff(cutoff_date)
+    batch_size = batch_size or settings.CLEANUP_BATCH_SIZE
+    progress = {"deleted_count": 0, "batches": 0, "cutoff_date": cutoff.isoformat(), "complete": False}
+
+    select_query = """
+        SELECT id FROM evaluation_jobs
+        WHERE created_at < %s
+        AND status IN ('completed', 'failed')
     """
-    Clean up evaluation jobs older than 30 days.
+    # Status is re-checked in case a job was retried since it was selected
+    delete_query = """
+        DELETE FROM evaluation_jobs
+        WHERE id = ANY(%s::uuid[])
+        AND status IN ('completed', 'failed')
     """
+
     try:
-        cutoff_date = datetime.utcnow() - timedelta(days=30)
-        
-        query = """
-            DELETE FROM evaluation_jobs
-            WHERE created_at < %s
-            AND status IN ('completed', 'failed')
-        """
-        
-        deleted_count = execute_query(query, (cutoff_date,), fetch=False)
-        logger.info(f"Cleaned up {deleted_count} old evaluation jobs")
-        
-        return {"deleted_count": deleted_count, "cutoff_date": cutoff_date.isoformat()}
-    
+        for rows in iter_query_batches(select_query, (cutoff,), batch_size=batch_size):
+            ids = [str(row['id']) for row in rows]
+            progress["deleted_count"] += execute_query(delete_query, (ids,), fetch=False)
+            progress["batches"] += 1
+            _report_progress(self, progress)
+        progress["complete"] = True
+        logger.info(f"Cleaned up {progress['deleted_count']} old evaluation jobs")
+    except SoftTimeLimitExceeded:
+        logger.warning(
+            f"Job cleanup stopped at the time limit after {progress['deleted_count']} jobs; "
+            f"the next run continues"
+        )
     except Exception as e:
-        logger.error(f"Failed to cleanup old jobs: {str(e)}")
+        logger.error(f"Failed to cleanup old jobs after {progress['deleted_count']} deleted: {str(e)}")
         raise
 
+    return progress
+
 
-@celery_app.task
-def cleanup_old_documents():
+@celery_app.task(bind=True)
+def cleanup_old_documents(self, cutoff_date: Optional[str] = None, batch_size: Optional[int] = None):
     """
-    Clean up uploaded documents older than 30 days.
+    Clean up uploaded documents older than CLEANUP_RETENTION_DAYS.
+
+    Documents are read through a server-side cursor in batches of
+    CLEANUP_BATCH_SIZE. Each batch is deleted with one
+    DELETE ... RETURNING file_path, the files are removed on a thread
+    pool, and only then is the transaction committed. If the run is
+    interrupted mid-batch the rows stay, so the next run retries both the
+    rows and their files (already-removed files count as missing).
+    """
+    cutoff = _resolve_cutoff(cutoff_date)
+    batch_size = batch_size or settings.CLEANUP_BATCH_SIZE
+    progress = {
+        "deleted_files": 0,
+        "missing_files": 0,
+        "failed_files": 0,
+        "deleted_records": 0,
+        "batches": 0,
+        "cutoff_date": cutoff.isoformat(),
+        "complete": False
+    }
+
+    select_query = """
+        SELECT id FROM documents
+        WHERE uploaded_at < %s
     """
+    delete_query = """
+        DELETE FROM documents
+        WHERE id = ANY(%s::uuid[])
+        RETURNING file_path
+    """
+
     try:
-        cutoff_date = datetime.utcnow() - timedelta(days=30)
-        
-        # Get documents to delete
-        query = """
-            SELECT id, file_path FROM documents
-            WHERE uploaded_at < %s
-        """
-        
-        documents = execute_query(query, (cutoff_date,))
-        
-        deleted_files = 0
-        deleted_records = 0
-        
-        for doc in documents:
-            # Delete physical file
-            if os.path.exists(doc['file_path']):
-                try:
-                    os.remove(doc['file_path'])
-                    deleted_files += 1
-                except Exception as e:
-                    logger.warning(f"Failed to delete file {doc['file_path']}: {str(e)}")
-            
-            # Delete database record
-            delete_query = "DELETE FROM documents WHERE id = %s"
-            execute_query(delete_query, (doc['id'],), fetch=False)
-            deleted_records += 1
-        
-        logger.info(f"Cleaned up {deleted_files} files and {deleted_records} document records")
-        
-        return {
-            "deleted_files": deleted_files,
-            "deleted_records": deleted_records,
-            "cutoff_date": cutoff_date.isoformat()
-        }
-    
+        with ThreadPoolExecutor(max_workers=settings.CLEANUP_UNLINK_WORKERS) as executor:
+            for rows in iter_query_batches(select_query, (cutoff,), batch_size=batch_size):
+                ids = [str(row['id']) for row in rows]
+                with unit_of_work():
+                    deleted = execute_query(delete_query, (ids,))
+                    outcomes = list(executor.map(_remove_file, [row['file_path'] for row in deleted]))
+
+                progress["deleted_records"] += len(deleted)
+                progress["deleted_files"] += outcomes.count('deleted')
+                progress["missing_files"] += outcomes.count('missing')
+                progress["failed_files"] += outcomes.count('failed')
+                progress["batches"] += 1
+                _report_progress(self, progress)
+
+        progress["complete"] = True
+        logger.info(
+            f"Cleaned up {progress['deleted_files']} files and "
+            f"{progress['deleted_records']} document records"
+        )
+    except SoftTimeLimitExceeded:
+        logger.warning(
+            f"Document cleanup stopped at the time limit after {progress['deleted_records']} records; "
+            f"the next run continues"
+        )
     except Exception as e:
-        logger.error(f"Failed to cleanup old documents: {str(e)}")
+        logger.error(
+            f"Failed to cleanup old documents after {progress['deleted_records']} records: {str(e)}"
+        )
         raise
+
+    return progress
@@ -0,0 +1,27 @@
+"""
+Enqueue Celery tasks by name.
+
+The API only needs to put messages on the broker. Importing the task
+modules to call .delay() would pull the whole worker stack (PDF parsing,
+Groq client, RAG service and their dependencies) into every API process,
+so tasks are sent by name through the bare Celery app instead. Routing
+(task_routes) applies to send_task the same way it does to .delay().
+"""
+from app.tasks.celery_config import celery_app
+from celery import group
+from typing import Iterable
+
+EVALUATION_PIPELINE_TASK = 'app.tasks.evaluation_tasks.run_evaluation_pipeline'
+
+
+def enqueue_evaluation_pipeline(job_id: str):
+    """Queue the evaluation pipeline for one job"""
+    return celery_app.send_task(EVALUATION_PIPELINE_TASK, args=(str(job_id),))
+
+
+def enqueue_evaluation_pipelines(job_ids: Iterable[str]):
+    """Queue the evaluation pipeline for many jobs as one group"""
+    return group(
+        celery_app.signature(EVALUATION_PIPELINE_TASK, args=(str(job_id),))
+        for job_id in job_ids
+    ).apply_async()
@@ -2,8 +2,15 @@ from app.tasks.celery_config import celery_app
 from app.services.evaluation_service import EvaluationService
 from app.services.document_service import DocumentService
 from app.services.pdf_parser import PDFParser
-from app.services.rag_service import RAGService
-from app.services.llm_service import LLMService
+from app.services.llm_service import PROMPT_VERSION, LLM_PROVIDER
+from app.services.extracted_text_store import ExtractedTextStore
+from app.services.checkpoint_service import CheckpointService
+from app.services.job_events import get_job_event_publisher
+from app.services.evaluation_log_buffer import shutdown_evaluation_log_buffer
+from app.services.service_container import init_services, get_services
+from app.services import metrics
+from app.database import unit_of_work
+from app.utils.pipeline_dag import DAGExecutor
 from app.utils.error_handler import (
     handle_evaluation_error,
     format_error_message,
@@ -13,11 +20,45 @@ from app.utils.error_handler import (
 )
 from uuid import UUID
 import logging
+import time
 from celery.exceptions import SoftTimeLimitExceeded
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
 
 logger = logging.getLogger(__name__)
 
 
+@worker_init.connect
+def start_metrics_exporter(**kwargs):
+    """
+    Serve this worker's metrics (all pool processes, with
+    PROMETHEUS_MULTIPROC_DIR) and the Celery queue lengths.
+    """
+    metrics.start_worker_exporter()
+
+
+@worker_process_init.connect
+def init_worker_services(**kwargs):
+    """
+    Load the embedding model, vector store and Groq client once per
+    worker process (after the prefork) instead of once per task.
+    """
+    try:
+        init_services(warm_up=True)
+    except Exception as e:
+        # Tasks fall back to lazy initialization through get_services()
+        logger.error(f"Failed to warm up worker services: {str(e)}")
+
+
+@worker_process_shutdown.connect
+def flush_worker_evaluation_logs(**kwargs):
+    """
+    Write buffered evaluation logs before a pool process exits. Celery's
+    child processes leave via os._exit, so atexit handlers don't run.
+    """
+    shutdown_evaluation_log_buffer()
+    metrics.mark_process_dead()
+
+
 @celery_app.task(bind=True, max_retries=3, soft_time_limit=1500)
 def run_evaluation_pipeline(self, job_id: str):
     """
@@ -29,161 +70,220 @@ def run_evaluation_pipeline(self, job_id: str):
     3. Parse Project Report → Extract structured data
     4. Retrieve case study + project rubric → Evaluate project
     5. Synthesize → Generate overall summary
+    
+    Steps 1-2 and 3-4 run concurrently; step 5 waits for both branches.
+    Each completed step is checkpointed, so a retry resumes at the first
+    step that did not finish.
     """
     evaluation_service = EvaluationService()
     document_service = DocumentService()
     pdf_parser = PDFParser()
-    rag_service = RAGService()
-    llm_service = LLMService()
+    text_store = ExtractedTextStore()
+    checkpoint_service = CheckpointService()
+    event_publisher = get_job_event_publisher()
+    services = get_services()
+    rag_service = services.rag_service
+    llm_service = services.llm_service
     
     job_uuid = UUID(job_id)
+    started = time.perf_counter()
+    
+    def log_llm_step(step, result):
+        """Log a successful step with the provider and model that actually answered"""
+        usage = result['usage']
+        evaluation_service.log_evaluation_step(
+            job_uuid, step, LLM_PROVIDER, usage.get('model') or llm_service.model,
+            usage['prompt_tokens'],
+            usage['completion_tokens'],
+            usage['response_time_ms'],
+            'success',
+            cached=usage.get('cached', False)
+        )
     
     try:
-        # Update status to processing
-        evaluation_service.update_job_status(job_uuid, 'processing')
-        logger.info(f"[Job {job_id}] Starting evaluation pipeline")
-        
-        # Get job details
-        job = evaluation_service.get_evaluation_job(job_uuid)
-        if not job:
-            raise Exception(f"Job {job_id} not found")
-        
-        job_title = job['job_title']
-        cv_doc_id = job['cv_document_id']
-        project_doc_id = job['project_document_id']
-        
-        # Get document paths
-        cv_doc = document_service.get_document(cv_doc_id)
-        project_doc = document_service.get_document(project_doc_id)
+        # Status update and lookups share one pooled connection and transaction
+        with unit_of_work():
+            # Update status to processing
+            evaluation_service.update_job_status(job_uuid, 'processing')
+            event_publisher.publish(job_uuid, 'processing')
+            logger.info(f"[Job {job_id}] Starting evaluation pipeline")
+            
+            # Get job details
+            job = evaluation_service.get_evaluation_job(job_uuid)
+            if not job:
+                raise Exception(f"Job {job_id} not found")
+            
+            job_title = job['job_title']
+            cv_doc_id = job['cv_document_id']
+            project_doc_id = job['project_document_id']
+            
+            # Get document paths
+            cv_doc = document_service.get_document(cv_doc_id)
+            project_doc = document_service.get_document(project_doc_id)
         
         if not cv_doc or not project_doc:
             raise Exception("Documents not found")
         
+        # Outputs of steps completed by a previous attempt of this job
+        checkpoints = checkpoint_service.load_checkpoints(job_uuid)
+        
         # STEP 1: Parse CV
-        logger.info(f"[Job {job_id}] Step 1: Parsing CV")
-        try:
-            cv_parsed = pdf_parser.parse_cv(cv_doc['file_path'])
-            cv_structured = llm_service.parse_cv_to_structured_data(cv_parsed['cleaned_text'])
-            
-            evaluation_service.log_evaluation_step(
-                job_uuid, 'cv_parsing', 'openai', 'gpt-4-turbo-preview',
-                cv_structured['usage']['prompt_tokens'],
-                cv_structured['usage']['completion_tokens'],
-                cv_structured['usage']['response_time_ms'],
-                'success'
-            )
-        except Exception as e:
-            raise PDFParsingError(
-                message=f"Failed to parse CV: {str(e)}",
-                step="cv_parsing",
-                details={"file_path": cv_doc['file_path']}
-            )
+        def cv_parsing_step():
+            logger.info(f"[Job {job_id}] Step 1: Parsing CV")
+            try:
+                cv_parsed = pdf_parser.parse_cv(
+                    cv_doc['file_path'],
+                    text_store=text_store,
+                    file_hash=cv_doc.get('file_hash')
+                )
+                cv_structured = llm_service.parse_cv_to_structured_data(cv_parsed['cleaned_text'])
+                
+                log_llm_step('cv_parsing', cv_structured)
+                return cv_structured
+            except Exception as e:
+                raise PDFParsingError(
+                    message=f"Failed to parse CV: {str(e)}",
+                    step="cv_parsing",
+                    details={"file_path": cv_doc['file_path']}
+                )
         
         # STEP 2: Evaluate CV with RAG context
-        logger.info(f"[Job {job_id}] Step 2: Evaluating CV")
-        try:
-            cv_rag_context = rag_service.get_context_for_cv_evaluation(job_title)
-            cv_evaluation = llm_service.evaluate_cv(
-                cv_structured['parsed_data'],
-                job_title,
-                cv_rag_context
-            )
-            
-            evaluation_service.log_evaluation_step(
-                job_uuid, 'cv_evaluation', 'openai', 'gpt-4-turbo-preview',
-                cv_evaluation['usage']['prompt_tokens'],
-                cv_evaluation['usage']['completion_tokens'],
-                cv_evaluation['usage']['response_time_ms'],
-                'success'
-            )
-        except Exception as e:
-            raise LLMError(
-                message=f"Failed to evaluate CV: {str(e)}",
-                step="cv_evaluation",
-                details={"job_title": job_title}
-            )
+        def cv_evaluation_step(cv_parsing):
+            logger.info(f"[Job {job_id}] Step 2: Evaluating CV")
+            try:
+                cv_rag_context = rag_service.get_context_for_cv_evaluation(job_title)
+                cv_evaluation = llm_service.evaluate_cv(
+                    cv_parsing['parsed_data'],
+                    job_title,
+                    cv_rag_context
+                )
+                
+                log_llm_step('cv_evaluation', cv_evaluation)
+                return cv_evaluation
+            except Exception as e:
+                raise LLMError(
+                    message=f"Failed to evaluate CV: {str(e)}",
+                    step="cv_evaluation",
+                    details={"job_title": job_title}
+                )
         
         # STEP 3: Parse Project Report
-        logger.info(f"[Job {job_id}] Step 3: Parsing project report")
-        try:
-            project_parsed = pdf_parser.parse_project_report(project_doc['file_path'])
-            project_structured = llm_service.parse_project_report(project_parsed['cleaned_text'])
-            
-            evaluation_service.log_evaluation_step(
-                job_uuid, 'project_parsing', 'openai', 'gpt-4-turbo-preview',
-                project_structured['usage']['prompt_tokens'],
-                project_structured['usage']['completion_tokens'],
-                project_structured['usage']['response_time_ms'],
-                'success'
-            )
-        except Exception as e:
-            raise PDFParsingError(
-                message=f"Failed to parse project report: {str(e)}",
-                step="project_parsing",
-                details={"file_path": project_doc['file_path']}
-            )
+        def project_parsing_step():
+            logger.info(f"[Job {job_id}] Step 3: Parsing project report")
+            try:
+                project_parsed = pdf_parser.parse_project_report(
+                    project_doc['file_path'],
+                    text_store=text_store,
+                    file_hash=project_doc.get('file_hash')
+                )
+                project_structured = llm_service.parse_project_report(project_parsed['cleaned_text'])
+                
+                log_llm_step('project_parsing', project_structured)
+                return project_structured
+            except Exception as e:
+                raise PDFParsingError(
+                    message=f"Failed to parse project report: {str(e)}",
+                    step="project_parsing",
+                    details={"file_path": project_doc['file_path']}
+                )
         
         # STEP 4: Evaluate Project Report with RAG context
-        logger.info(f"[Job {job_id}] Step 4: Evaluating project report")
-        try:
-            project_rag_context = rag_service.get_context_for_project_evaluation()
-            project_evaluation = llm_service.evaluate_project_report(
-                project_structured['parsed_data'],
-                project_rag_context
-            )
-            
-            evaluation_service.log_evaluation_step(
-                job_uuid, 'project_evaluation', 'openai', 'gpt-4-turbo-preview',
-                project_evaluation['usage']['prompt_tokens'],
-                project_evaluation['usage']['completion_tokens'],
-                project_evaluation['usage']['response_time_ms'],
-                'success'
-            )
-        except Exception as e:
-            raise LLMError(
-                message=f"Failed to evaluate project: {str(e)}",
-                step="project_evaluation"
-            )
+        def project_evaluation_step(project_parsing):
+            logger.info(f"[Job {job_id}] Step 4: Evaluating project report")
+            try:
+                project_rag_context = rag_service.get_context_for_project_evaluation()
+                project_evaluation = llm_service.evaluate_project_report(
+                    project_parsing['parsed_data'],
+                    project_rag_context
+                )
+                
+                log_llm_step('project_evaluation', project_evaluation)
+                return project_evaluation
+            except Exception as e:
+                raise LLMError(
+                    message=f"Failed to evaluate project: {str(e)}",
+                    step="project_evaluation"
+                )
         
         # STEP 5: Generate Overall Summary
-        logger.info(f"[Job {job_id}] Step 5: Generating overall summary")
-        try:
-            overall = llm_service.generate_overall_summary(
-                cv_evaluation,
-                project_evaluation,
-                job_title
+        def final_analysis_step(cv_evaluation, project_evaluation):
+            logger.info(f"[Job {job_id}] Step 5: Generating overall summary")
+            try:
+                overall = llm_service.generate_overall_summary(
+                    cv_evaluation,
+                    project_evaluation,
+                    job_title
+                )
+                
+                log_llm_step('final_analysis', overall)
+                return overall
+            except Exception as e:
+                raise LLMError(
+                    message=f"Failed to generate summary: {str(e)}",
+                    step="final_analysis"
+                )
+        
+        # CV branch (1 -> 2) and project branch (3 -> 4) are independent;
+        # only the summary (5) needs both, so the branches run concurrently.
+        # Fingerprints cover the inputs that don't come from other steps, so
+        # a checkpoint is only reused when the step would see the same input.
+        prompt_version = [PROMPT_VERSION, llm_service.model]
+        pipeline = (
+            DAGExecutor(max_workers=2)
+            .add_step(
+                'cv_parsing', metrics.timed_step('cv_parsing', cv_parsing_step),
+                fingerprint=[cv_doc.get('file_hash') or cv_doc['file_path'], prompt_version]
             )
-            
-            evaluation_service.log_evaluation_step(
-                job_uuid, 'final_analysis', 'openai', 'gpt-4-turbo-preview',
-                overall['usage']['prompt_tokens'],
-                overall['usage']['completion_tokens'],
-                overall['usage']['response_time_ms'],
-                'success'
+            .add_step(
+                'cv_evaluation', metrics.timed_step('cv_evaluation', cv_evaluation_step), depends_on=['cv_parsing'],
+                fingerprint=[job_title, prompt_version]
+            )
+            .add_step(
+                'project_parsing', metrics.timed_step('project_parsing', project_parsing_step),
+                fingerprint=[project_doc.get('file_hash') or project_doc['file_path'], prompt_version]
+            )
+            .add_step(
+                'project_evaluation', metrics.timed_step('project_evaluation', project_evaluation_step), depends_on=['project_parsing'],
+                fingerprint=[prompt_version]
             )
-        except Exception as e:
-            raise LLMError(
-                message=f"Failed to generate summary: {str(e)}",
-                step="final_analysis"
+            .add_step(
+                'final_analysis', metrics.timed_step('final_analysis', final_analysis_step), depends_on=['cv_evaluation', 'project_evaluation'],
+                fingerprint=[job_title, prompt_version]
             )
+        )
+        def on_step_complete(step, input_hash, output):
+            checkpoint_service.save_checkpoint(job_uuid, step, input_hash, output)
+            event_publisher.publish(job_uuid, 'processing', step=step)
+        
+        outputs = pipeline.run(checkpoints=checkpoints, on_step_complete=on_step_complete)
+        
+        cv_evaluation = outputs['cv_evaluation']
+        project_evaluation = outputs['project_evaluation']
+        overall = outputs['final_analysis']
         
         # Update job with results
-        evaluation_service.update_job_results(
-            job_uuid,
-            cv_match_rate=cv_evaluation['cv_match_rate'],
-            cv_feedback=cv_evaluation['cv_feedback'],
-            project_score=project_evaluation['project_score'],
-            project_feedback=project_evaluation['project_feedback'],
-            overall_summary=overall['overall_summary']
-        )
+        results = {
+            "cv_match_rate": cv_evaluation['cv_match_rate'],
+            "cv_feedback": cv_evaluation['cv_feedback'],
+            "project_score": project_evaluation['project_score'],
+            "project_feedback": project_evaluation['project_feedback'],
+            "overall_summary": overall['overall_summary']
+        }
+        evaluation_service.update_job_results(job_uuid, **results)
+        checkpoint_service.clear_checkpoints(job_uuid)
+        event_publisher.publish(job_uuid, 'completed', result=results)
         
         logger.info(f"[Job {job_id}] Evaluation pipeline completed successfully")
+        metrics.record_job('completed', time.perf_counter() - started)
         return {"status": "completed", "job_id": job_id}
     
-    except SoftTimeLimitExceeded:
+    except SoftTimeLimitExceeded as e:
         logger.error(f"[Job {job_id}] Task exceeded time limit")
         error_message = "Evaluation took too long and was terminated"
         evaluation_service.update_job_status(job_uuid, 'failed', error_message)
+        event_publisher.publish(job_uuid, 'failed', error_message=error_message)
+        metrics.record_step_failure("evaluation_pipeline", e)
+        metrics.record_job('failed', time.perf_counter() - started)
         return {"status": "failed", "job_id": job_id, "error": error_message}
     
     except (PDFParsingError, LLMError, RAGError) as e:
@@ -193,15 +293,20 @@ def run_evaluation_pipeline(self, job_id: str):
         
         # Log failed step
         evaluation_service.log_evaluation_step(
-            job_uuid, e.step, 'openai', 'gpt-4-turbo-preview',
+            job_uuid, e.step, LLM_PROVIDER, llm_service.model,
             0, 0, 0, 'failed', str(e)
         )
+        metrics.record_step_failure(e.step, e)
         
         # Update job status
-        evaluation_service.update_job_status(job_uuid, 'failed', error_message)
+        will_retry = self.request.retries < self.max_retries
+        evaluation_service.update_job_status(job_uuid, 'failed', error_message, retry_pending=will_retry)
+        event_publisher.publish(job_uuid, 'failed', error_message=error_message, will_retry=will_retry)
+        
+        metrics.record_job('retried' if will_retry else 'failed', time.perf_counter() - started)
         
         # Retry with exponential backoff
-        if self.request.retries < self.max_retries:
+        if will_retry:
             retry_delay = 2 ** self.request.retries * 60  # 1min, 2min, 4min
             logger.info(f"[Job {job_id}] Retrying in {retry_delay}s (attempt {self.request.retries + 1})")
             raise self.retry(exc=e, countdown=retry_delay)
@@ -212,13 +317,22 @@ def run_evaluation_pipeline(self, job_id: str):
         logger.error(f"[Job {job_id}] Unexpected error: {str(e)}")
         error_info = handle_evaluation_error(e, "evaluation_pipeline")
         error_message = format_error_message(error_info)
+        metrics.record_step_failure("evaluation_pipeline", e)
         
-        evaluation_service.update_job_status(job_uuid, 'failed', error_message)
+        will_retry = self.request.retries < self.max_retries
+        evaluation_service.update_job_status(job_uuid, 'failed', error_message, retry_pending=will_retry)
+        event_publisher.publish(job_uuid, 'failed', error_message=error_message, will_retry=will_retry)
+        
+        metrics.record_job('retried' if will_retry else 'failed', time.perf_counter() - started)
         
         # Retry for unexpected errors
-        if self.request.retries < self.max_retries:
+        if will_retry:
             retry_delay = 2 ** self.request.retries * 60
             logger.info(f"[Job {job_id}] Retrying in {retry_delay}s (attempt {self.request.retries + 1})")
             raise self.retry(exc=e, countdown=retry_delay)
         
         return {"status": "failed", "job_id": job_id, "error": error_message}
+    
+    finally:
+        # Step logs are buffered during the job; write them in one INSERT
+        evaluation_service.flush_evaluation_logs()
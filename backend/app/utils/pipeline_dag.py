@@ -0,0 +1,162 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineStep:
+    """A named unit of work and the steps whose outputs it needs."""
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        depends_on: Sequence[str] = (),
+        fingerprint: Any = None
+    ):
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on)
+        self.fingerprint = fingerprint
+
+    def input_hash(self, inputs: Dict[str, Any]) -> str:
+        """
+        Hash of everything the step's output depends on: its name, its
+        fingerprint (inputs not produced by other steps) and its dependency
+        outputs.
+        """
+        payload = json.dumps(
+            {"step": self.name, "fingerprint": self.fingerprint, "inputs": inputs},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DAGExecutor:
+    """
+    Minimal DAG executor for the evaluation pipeline.
+
+    Each step runs as soon as all of its dependencies have finished and
+    receives their outputs as keyword arguments named after the steps.
+    Independent steps run concurrently on a thread pool (the work is
+    dominated by network round-trips, so threads are sufficient).
+
+    If a step (or on_step_complete) raises, no further steps are
+    scheduled, steps already in flight are allowed to finish, and the
+    first exception is re-raised unchanged so callers keep their existing
+    error handling.
+
+    Checkpoints: run() accepts outputs saved by an earlier attempt as
+    {step: {"input_hash": ..., "output": ...}}. A step whose saved input
+    hash matches its current inputs is not run again; its saved output is
+    used instead. on_step_complete(name, input_hash, output) is called
+    for every step that does run, so the caller can persist it.
+    """
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self.steps: Dict[str, PipelineStep] = {}
+
+    def add_step(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        depends_on: Sequence[str] = (),
+        fingerprint: Any = None
+    ) -> "DAGExecutor":
+        if name in self.steps:
+            raise ValueError(f"Duplicate pipeline step '{name}'")
+        self.steps[name] = PipelineStep(name, func, depends_on, fingerprint)
+        return self
+
+    def _validate(self):
+        for step in self.steps.values():
+            for dep in step.depends_on:
+                if dep not in self.steps:
+                    raise ValueError(f"Step '{step.name}' depends on unknown step '{dep}'")
+
+        # Kahn's algorithm: every step must be reachable in topological order
+        remaining = {name: set(step.depends_on) for name, step in self.steps.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Pipeline has a dependency cycle among: {sorted(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    def run(
+        self,
+        checkpoints: Optional[Dict[str, Dict[str, Any]]] = None,
+        on_step_complete: Optional[Callable[[str, str, Any], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute all steps and return a dict of step name -> output.
+        """
+        self._validate()
+        checkpoints = checkpoints or {}
+
+        results: Dict[str, Any] = {}
+        input_hashes: Dict[str, str] = {}
+        pending = dict(self.steps)
+        running = {}
+        error: Optional[BaseException] = None
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline")
+        try:
+            while pending or running:
+                while error is None:
+                    ready: List[PipelineStep] = [
+                        step for step in pending.values()
+                        if all(dep in results for dep in step.depends_on)
+                    ]
+                    resumed = False
+                    for step in ready:
+                        del pending[step.name]
+                        kwargs = {dep: results[dep] for dep in step.depends_on}
+                        input_hashes[step.name] = step.input_hash(kwargs)
+
+                        checkpoint = checkpoints.get(step.name)
+                        if checkpoint and checkpoint.get("input_hash") == input_hashes[step.name]:
+                            logger.info(f"Pipeline step '{step.name}' restored from checkpoint")
+                            results[step.name] = checkpoint["output"]
+                            resumed = True
+                        else:
+                            running[executor.submit(step.func, **kwargs)] = step.name
+
+                    # Restored steps may have unblocked their dependents
+                    if not resumed:
+                        break
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    exc = future.exception()
+                    if exc is not None:
+                        if error is None:
+                            error = exc
+                        else:
+                            logger.warning(f"Pipeline step '{name}' also failed: {str(exc)}")
+                    else:
+                        results[name] = future.result()
+                        if on_step_complete is not None:
+                            on_step_complete(name, input_hashes[name], results[name])
+        except BaseException:
+            # on_step_complete raised or we were interrupted (e.g. SoftTimeLimitExceeded).
+            # Threads can't be killed, so wait for steps in flight rather than letting
+            # them keep running against the job after the caller has moved on.
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+
+        executor.shutdown(wait=True, cancel_futures=True)
+
+        if error is not None:
+            raise error
+
+        return results
@@ -0,0 +1,229 @@
+import tiktoken
+from typing import Any, Dict, List, Union
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+_encoder = None
+
+OMISSION_MARKER = "\n[... {omitted} tokens omitted ...]\n"
+
+# RAGService._format_context starts every chunk with "[DOC_TYPE - Title]"
+CONTEXT_BLOCK_BOUNDARY = re.compile(r"\n(?=\[[^\]\n]+ - [^\]\n]*\]\n)")
+
+
+class _ApproximateEncoder:
+    """~4 characters per token; used only if tiktoken's BPE file can't be loaded."""
+    CHARS_PER_TOKEN = 4
+
+    def encode(self, text: str, **kwargs) -> List[str]:
+        return [text[i:i + self.CHARS_PER_TOKEN] for i in range(0, len(text), self.CHARS_PER_TOKEN)]
+
+    def decode(self, tokens: List[str]) -> str:
+        return "".join(tokens)
+
+
+def get_encoder():
+    """
+    Shared tiktoken encoder (the one RAGService chunks with). Groq models
+    use their own tokenizers, so counts are estimates; budgets leave
+    headroom for the difference.
+    """
+    global _encoder
+    if _encoder is None:
+        try:
+            _encoder = tiktoken.encoding_for_model("gpt-4")
+        except Exception as e:
+            # tiktoken downloads its BPE file on first use; don't fail prompts offline
+            logger.warning(f"tiktoken encoder unavailable, approximating token counts: {str(e)}")
+            _encoder = _ApproximateEncoder()
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    return len(get_encoder().encode(text, disallowed_special=()))
+
+
+def compact_json(data: Any) -> str:
+    """JSON without indentation or spaces after separators"""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    """
+    Keep the head and tail of text within max_tokens (3/4 head, 1/4 tail),
+    marking the cut. Documents front-load summaries and end with
+    conclusions, so both ends carry the most signal.
+    """
+    encoder = get_encoder()
+    tokens = encoder.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+
+    marker_tokens = count_tokens(OMISSION_MARKER.format(omitted=len(tokens)))
+    keep = max_tokens - marker_tokens
+    if keep <= 0:
+        return encoder.decode(tokens[:max(max_tokens, 0)])
+
+    head = keep * 3 // 4
+    tail = keep - head
+    omitted = len(tokens) - head - tail
+    return (
+        encoder.decode(tokens[:head]).rstrip()
+        + OMISSION_MARKER.format(omitted=omitted)
+        + (encoder.decode(tokens[-tail:]).lstrip() if tail else "")
+    )
+
+
+def allocate_budget(budget: int, demands: List[int], weights: List[float]) -> List[int]:
+    """
+    Split budget across sections by weight. Sections needing less than
+    their share get exactly what they need and the rest is redistributed
+    among the others, so no tokens are left unused while anything is cut.
+    """
+    allocation = [0] * len(demands)
+    active = [i for i, demand in enumerate(demands) if demand > 0]
+    remaining = max(budget, 0)
+
+    while active:
+        total_weight = sum(weights[i] for i in active)
+        shares = {i: int(remaining * weights[i] / total_weight) for i in active}
+        satisfied = [i for i in active if demands[i] <= shares[i]]
+        if not satisfied:
+            for i in active:
+                allocation[i] = shares[i]
+            break
+        for i in satisfied:
+            allocation[i] = demands[i]
+            remaining -= demands[i]
+            active.remove(i)
+
+    return allocation
+
+
+def _truncate_json_values(data: Any, max_string: int, max_items: int) -> Any:
+    if isinstance(data, dict):
+        return {key: _truncate_json_values(value, max_string, max_items) for key, value in data.items()}
+    if isinstance(data, list):
+        items = [_truncate_json_values(value, max_string, max_items) for value in data[:max_items]]
+        if len(data) > max_items:
+            items.append(f"... {len(data) - max_items} more")
+        return items
+    if isinstance(data, str) and len(data) > max_string:
+        return data[:max_string] + "..."
+    return data
+
+
+def shrink_json(data: Any, max_tokens: int) -> str:
+    """
+    Compact JSON within max_tokens: long strings and lists are shortened
+    (halving the limits each round) while keys and structure are kept.
+    """
+    text = compact_json(data)
+    max_string, max_items = 2000, 50
+    while count_tokens(text) > max_tokens and max_string > 16:
+        text = compact_json(_truncate_json_values(data, max_string, max_items))
+        max_string //= 2
+        max_items = max(max_items // 2, 3)
+    if count_tokens(text) > max_tokens:
+        text = truncate_text(text, max_tokens)
+    return text
+
+
+def trim_context(context: str, max_tokens: int) -> str:
+    """
+    Trim RAG context chunk by chunk, sharing the budget evenly so every
+    retrieved source (job description, rubric, ...) stays represented.
+    """
+    if count_tokens(context) <= max_tokens:
+        return context
+
+    blocks = CONTEXT_BLOCK_BOUNDARY.split(context)
+    separator_tokens = len(blocks) - 1
+    allocation = allocate_budget(
+        max_tokens - separator_tokens,
+        [count_tokens(block) for block in blocks],
+        [1.0] * len(blocks)
+    )
+    return "\n".join(
+        truncate_text(block, tokens) for block, tokens in zip(blocks, allocation) if tokens > 0
+    )
+
+
+class PromptSection:
+    """
+    A variable part of a prompt that may be trimmed to fit the budget.
+
+    kind: 'text' (head/tail truncation), 'json' (compact, then shortened
+    values) or 'context' (RAG chunks trimmed evenly). weight sets the
+    section's share of the budget relative to the other sections.
+    """
+    def __init__(self, content: Any, kind: str = "text", weight: float = 1.0):
+        if kind not in ("text", "json", "context"):
+            raise ValueError(f"Unknown prompt section kind '{kind}'")
+        self.content = content
+        self.kind = kind
+        self.weight = weight
+
+    def render(self) -> str:
+        if self.kind == "json":
+            return compact_json(self.content)
+        return "" if self.content is None else str(self.content)
+
+    def fit(self, max_tokens: int) -> str:
+        if self.kind == "json":
+            return shrink_json(self.content, max_tokens)
+        if self.kind == "context":
+            return trim_context(self.render(), max_tokens)
+        return truncate_text(self.render(), max_tokens)
+
+
+def build_prompt(
+    system_prompt: str,
+    template: str,
+    sections: Dict[str, Union[str, PromptSection]],
+    max_prompt_tokens: int
+) -> Dict[str, Any]:
+    """
+    Fill a str.format template so that system + user prompt stay within
+    max_prompt_tokens.
+
+    Plain string values are inserted as-is; PromptSection values share
+    whatever budget the fixed text leaves, in proportion to their weight.
+    Trimming is deterministic, so identical inputs give identical prompts
+    (and LLM cache hits).
+
+    Returns:
+        Dictionary with system_prompt, user_prompt and prompt_tokens
+    """
+    fixed = {name: value for name, value in sections.items() if not isinstance(value, PromptSection)}
+    variable = {name: value for name, value in sections.items() if isinstance(value, PromptSection)}
+
+    rendered = {name: section.render() for name, section in variable.items()}
+    user_prompt = template.format(**fixed, **rendered)
+    prompt_tokens = count_tokens(system_prompt) + count_tokens(user_prompt)
+
+    if prompt_tokens > max_prompt_tokens and variable:
+        names = list(variable)
+        demands = [count_tokens(rendered[name]) for name in names]
+        # Token counts aren't exactly additive across section boundaries;
+        # keep a couple of tokens per section in reserve
+        fixed_tokens = prompt_tokens - sum(demands) + 2 * len(names)
+        allocation = allocate_budget(
+            max_prompt_tokens - fixed_tokens,
+            demands,
+            [variable[name].weight for name in names]
+        )
+        for name, demand, tokens in zip(names, demands, allocation):
+            if tokens < demand:
+                rendered[name] = variable[name].fit(tokens)
+        user_prompt = template.format(**fixed, **rendered)
+        prompt_tokens = count_tokens(system_prompt) + count_tokens(user_prompt)
+
+    return {
+        "system_prompt": system_prompt,
+        "user_prompt": user_prompt,
+        "prompt_tokens": prompt_tokens
+    }
@@ -4,27 +4,75 @@ from tenacity import (
     wait_exponential,
     retry_if_exception_type
 )
-from openai import RateLimitError, APIError, APITimeoutError
+from groq import RateLimitError, APIConnectionError, InternalServerError
 from app.config import settings
+from app.services.metrics import record_llm_retry
+from typing import Optional
+import re
+
+# APITimeoutError is a subclass of APIConnectionError
+RETRYABLE_LLM_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+_exponential_wait = wait_exponential(multiplier=1, min=2, max=10)
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse Groq reset headers such as '2m59.56s', '7.66s' or '320ms' into seconds"""
+    if not value:
+        return None
+    total = 0.0
+    matched = False
+    for amount, unit in re.findall(r"([\d.]+)(ms|h|m|s)", value):
+        matched = True
+        total += float(amount) * {"h": 3600, "m": 60, "s": 1, "ms": 0.001}[unit]
+    if matched:
+        return total
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Delay requested by the API (retry-after or reset headers), if any"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    for header in ("retry-after", "x-ratelimit-reset-tokens"):
+        seconds = parse_reset_duration(headers.get(header))
+        if seconds:
+            return seconds
+    return None
+
+
+def wait_for_retry(retry_state) -> float:
+    """Exponential backoff, but never sooner than the API asked us to wait."""
+    backoff = _exponential_wait(retry_state)
+    retry_after = retry_after_seconds(retry_state.outcome.exception())
+    if retry_after:
+        return max(backoff, min(retry_after, settings.LLM_RATE_LIMIT_MAX_WAIT))
+    return backoff
 
 
 def create_llm_retry_decorator():
     """
     Create a retry decorator for LLM API calls with exponential backoff.
-    
-    Retries on:
-    - Rate limit errors
-    - API errors
-    - Timeout errors
-    
+
+    Retries on (Groq SDK exceptions, raised before wrapping in LLMError):
+    - Rate limit errors (429), honouring retry-after
+    - Connection errors and timeouts
+    - Server errors (5xx)
+
     Strategy:
     - Max 3 attempts
     - Exponential backoff: 2^x * 1 second (2s, 4s, 8s)
     """
     return retry(
         stop=stop_after_attempt(settings.MAX_RETRIES),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((RateLimitError, APIError, APITimeoutError)),
+        wait=wait_for_retry,
+        retry=retry_if_exception_type(RETRYABLE_LLM_ERRORS),
+        before_sleep=record_llm_retry,
         reraise=True
     )
 
@@ -0,0 +1,168 @@
+"""
+Benchmark: sentence-transformers vs ONNX Runtime (fp32 / dynamic int8) embeddings on CPU.
+
+Embeds the reference corpus (reference_documents, chunked the way
+ingestion chunks it) with each backend. Every backend runs in a fresh
+child process so import/load time and peak RSS are its own. Reports:
+load time (import + model load + first call), corpus throughput,
+single-query latency (p50/p95), peak RSS and the minimum/mean cosine
+similarity to the sentence-transformers vectors.
+
+Export the ONNX models first (scripts/export_onnx_embedding_model.py --quantize).
+
+Usage:
+    python benchmarks/bench_embedding_backends.py
+    python benchmarks/bench_embedding_backends.py --backends onnx-fp32,onnx-int8 --threads 1
+    python benchmarks/bench_embedding_backends.py --text-file corpus.txt   # without a database
+"""
+
+import sys
+import os
+import argparse
+import json
+import resource
+import subprocess
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import numpy as np
+
+QUERIES = [
+    "Evaluate CV for Backend Engineer position. Technical skills, experience level, achievements, cultural fit.",
+    "Evaluate project report. Correctness, code quality, resilience, error handling, documentation, creativity."
+]
+
+
+def load_corpus(text_file: str = None):
+    """Reference document chunks, chunked exactly like RAGService ingestion"""
+    from app.services.rag_service import RAGService
+    from app.services.vector_store import NumpyVectorStore
+
+    # The embedder loads lazily and the throwaway store is never written
+    rag_service = RAGService(vector_store=NumpyVectorStore(tempfile.mkdtemp()))
+    if text_file:
+        with open(text_file, "r") as f:
+            contents = [f.read()]
+    else:
+        from app.database import execute_query
+        contents = [row['content'] for row in execute_query(
+            "SELECT content FROM reference_documents ORDER BY document_type, created_at"
+        )]
+    return [chunk for content in contents for chunk in rag_service.chunk_text(content)]
+
+
+def build_embedder(backend: str, args):
+    from app.services.embedding_backends import OnnxEmbedder, SentenceTransformerEmbedder
+
+    if backend == "sentence-transformers":
+        return SentenceTransformerEmbedder(args.model_name)
+    if backend in ("onnx-fp32", "onnx-int8"):
+        return OnnxEmbedder(args.model_dir, quantized=backend == "onnx-int8", threads=args.threads, min_cosine=None)
+    raise ValueError(f"Unknown backend '{backend}'")
+
+
+def run_child(args):
+    """Measure one backend; writes its embeddings and a JSON result to --workdir"""
+    if args.threads and args.child == "sentence-transformers":
+        import torch
+        torch.set_num_threads(args.threads)
+
+    with open(os.path.join(args.workdir, "chunks.json"), "r") as f:
+        chunks = json.load(f)
+
+    start = time.perf_counter()
+    embedder = build_embedder(args.child, args)
+    embedder.encode(QUERIES[:1], 1, False)
+    load_seconds = time.perf_counter() - start
+
+    best = float("inf")
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        embeddings = embedder.encode(chunks, args.batch_size, False)
+        best = min(best, time.perf_counter() - start)
+
+    latencies = []
+    for i in range(args.queries):
+        start = time.perf_counter()
+        embedder.encode([QUERIES[i % len(QUERIES)]], 1, False)
+        latencies.append(time.perf_counter() - start)
+
+    np.save(os.path.join(args.workdir, f"{args.child}.npy"), embeddings)
+    result = {
+        "backend": args.child,
+        "load_s": load_seconds,
+        "chunks_per_s": len(chunks) / best,
+        "query_p50_ms": float(np.percentile(latencies, 50)) * 1000,
+        "query_p95_ms": float(np.percentile(latencies, 95)) * 1000,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+    with open(os.path.join(args.workdir, f"{args.child}.json"), "w") as f:
+        json.dump(result, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Embedding backend throughput, latency, memory and agreement')
+    parser.add_argument('--backends', default='sentence-transformers,onnx-fp32,onnx-int8', help='Comma-separated backends')
+    parser.add_argument('--model-name', default=None, help='sentence-transformers model (default: the RAG model)')
+    parser.add_argument('--model-dir', default=None, help='Exported ONNX directory (default: EMBEDDING_ONNX_DIR)')
+    parser.add_argument('--text-file', default=None, help='Benchmark on this text instead of reference_documents')
+    parser.add_argument('--batch-size', type=int, default=32, help='Texts per forward pass')
+    parser.add_argument('--threads', type=int, default=0, help='Intra-op threads (0 = library default)')
+    parser.add_argument('--repeats', type=int, default=3, help='Corpus passes (best is reported)')
+    parser.add_argument('--queries', type=int, default=50, help='Single-query latency samples')
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    from app.config import settings
+    from app.services.embedding_backends import EMBEDDING_MODEL_NAME, cosine_agreement
+    args.model_name = args.model_name or EMBEDDING_MODEL_NAME
+    args.model_dir = args.model_dir or settings.EMBEDDING_ONNX_DIR
+
+    if args.child:
+        run_child(args)
+        return
+
+    backends = [b.strip() for b in args.backends.split(',') if b.strip()]
+    workdir = tempfile.mkdtemp(prefix="bench_embeddings_")
+    chunks = load_corpus(args.text_file)
+    with open(os.path.join(workdir, "chunks.json"), "w") as f:
+        json.dump(chunks, f)
+    print(f"Corpus: {len(chunks)} chunks, batch size {args.batch_size}, threads {args.threads or 'default'}")
+
+    results = []
+    for backend in backends:
+        command = [sys.executable, os.path.abspath(__file__), '--child', backend, '--workdir', workdir] + [
+            f"--{name.replace('_', '-')}={getattr(args, name)}"
+            for name in ('model_name', 'model_dir', 'batch_size', 'threads', 'repeats', 'queries')
+        ]
+        subprocess.run(command, check=True)
+        with open(os.path.join(workdir, f"{backend}.json"), "r") as f:
+            results.append(json.load(f))
+
+    reference = None
+    if "sentence-transformers" in backends:
+        reference = np.load(os.path.join(workdir, "sentence-transformers.npy"))
+
+    print(f"{'backend':<24}{'load s':>8}{'chunks/s':>10}{'q p50 ms':>10}{'q p95 ms':>10}{'RSS MB':>9}{'min cos':>9}{'mean cos':>10}")
+    for result in results:
+        agreement = None
+        if reference is not None:
+            agreement = cosine_agreement(reference, np.load(os.path.join(workdir, f"{result['backend']}.npy")))
+        print(
+            f"{result['backend']:<24}{result['load_s']:>8.2f}{result['chunks_per_s']:>10.1f}"
+            f"{result['query_p50_ms']:>10.2f}{result['query_p95_ms']:>10.2f}{result['peak_rss_mb']:>9.0f}"
+            f"{agreement.min() if agreement is not None else float('nan'):>9.5f}"
+            f"{agreement.mean() if agreement is not None else float('nan'):>10.5f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
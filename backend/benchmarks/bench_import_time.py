@@ -0,0 +1,92 @@
+"""
+Benchmark: cold API import time and memory after boot.
+
+Starts fresh interpreters that import app.main, run the app's startup
+and answer one GET /health, the work every gunicorn/uvicorn worker does
+before serving. Reports the median import time, RSS after boot, the
+number of loaded modules and which heavy worker-only packages (torch,
+chromadb, pdfplumber, groq, ...) got pulled in. Use the thresholds to
+fail CI on a regression.
+
+Usage:
+    python benchmarks/bench_import_time.py --runs 5
+    python benchmarks/bench_import_time.py --max-import-s 1.5 --max-rss-mb 120
+"""
+
+import sys
+import os
+import argparse
+import json
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Only the Celery workers need these
+HEAVY_MODULES = [
+    "torch", "sentence_transformers", "transformers", "onnxruntime", "chromadb",
+    "numpy", "pdfplumber", "PyPDF2", "groq", "tiktoken", "supabase",
+    "app.tasks.evaluation_tasks", "app.services.rag_service", "app.services.llm_service"
+]
+
+PROBE = """
+import json, resource, sys, time
+from dotenv import load_dotenv
+load_dotenv()
+start = time.perf_counter()
+import app.main
+import_s = time.perf_counter() - start
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    client.get("/health")
+rss_kb = next(int(line.split()[1]) for line in open("/proc/self/status") if line.startswith("VmRSS:"))
+print(json.dumps({
+    "import_s": import_s,
+    "rss_mb": rss_kb / 1024,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+    "heavy": [name for name in %r if name in sys.modules]
+}))
+""" % (HEAVY_MODULES,)
+
+
+def probe() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR,
+        check=True,
+        capture_output=True,
+        text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold import time and RSS of the API process')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to start (median is reported)')
+    parser.add_argument('--max-import-s', type=float, default=None, help='Fail if the median import time exceeds this')
+    parser.add_argument('--max-rss-mb', type=float, default=None, help='Fail if the median RSS after boot exceeds this')
+    args = parser.parse_args()
+
+    results = [probe() for _ in range(args.runs)]
+    import_s = statistics.median(r["import_s"] for r in results)
+    rss_mb = statistics.median(r["rss_mb"] for r in results)
+    peak_mb = statistics.median(r["peak_rss_mb"] for r in results)
+
+    print(f"import app.main: {import_s:.3f} s (median of {args.runs})")
+    print(f"RSS after boot:  {rss_mb:.0f} MB (peak {peak_mb:.0f} MB)")
+    print(f"modules loaded:  {results[-1]['modules']}")
+    print(f"heavy modules:   {', '.join(results[-1]['heavy']) or 'none'}")
+
+    failures = []
+    if args.max_import_s is not None and import_s > args.max_import_s:
+        failures.append(f"import time {import_s:.3f} s > {args.max_import_s} s")
+    if args.max_rss_mb is not None and rss_mb > args.max_rss_mb:
+        failures.append(f"RSS {rss_mb:.0f} MB > {args.max_rss_mb} MB")
+    if failures:
+        print("REGRESSION: " + "; ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: serial vs page-parallel pdfplumber extraction.
+
+Generates synthetic text-only PDFs of increasing page counts (no external
+PDF tooling needed) and times PDFParser.extract_text_pdfplumber with one
+worker against the process-pool mode.
+
+Usage:
+    python benchmarks/bench_pdf_extraction.py --pages 10,50,150 --workers 4
+"""
+
+import sys
+import os
+import argparse
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.pdf_parser import PDFParser
+
+SAMPLE_LINE = (
+    "Implemented the evaluation pipeline with retries, RAG context and structured scoring"
+)
+
+
+def build_pdf(path: str, num_pages: int, lines_per_page: int = 45, label: str = "Page"):
+    """Write a minimal valid PDF with num_pages pages of Helvetica text (label makes files distinct)"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once page object ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page_number in range(num_pages):
+        lines = [b"BT /F1 10 Tf 40 800 Td 12 TL"]
+        for line_number in range(lines_per_page):
+            text = f"{label} {page_number + 1} line {line_number + 1}: {SAMPLE_LINE}"
+            lines.append(f"({text}) Tj T*".encode("latin-1"))
+        lines.append(b"ET")
+        stream = b"\n".join(lines)
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, num_pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def time_extraction(path: str, workers: int, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        PDFParser.extract_text_pdfplumber(path, workers=workers)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serial vs parallel PDF extraction")
+    parser.add_argument("--pages", default="10,50,150", help="Comma-separated page counts")
+    parser.add_argument("--workers", type=int, default=4, help="Process pool size for parallel mode")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per mode (best time is reported)")
+    args = parser.parse_args()
+
+    page_counts = [int(p) for p in args.pages.split(",")]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Warm the pool so worker start-up is not billed to the first document
+        warm_path = os.path.join(tmp_dir, "warm.pdf")
+        build_pdf(warm_path, 30)
+        PDFParser.extract_text_pdfplumber(warm_path, workers=args.workers)
+
+        print(f"{'pages':>6} {'serial s':>10} {'parallel s':>11} {'pages/s ser':>12} {'pages/s par':>12} {'speedup':>8}")
+        for num_pages in page_counts:
+            path = os.path.join(tmp_dir, f"report_{num_pages}.pdf")
+            build_pdf(path, num_pages)
+
+            serial = PDFParser.extract_text_pdfplumber(path, workers=1)
+            parallel = PDFParser.extract_text_pdfplumber(path, workers=args.workers)
+            assert serial == parallel, "parallel extraction changed the text"
+
+            serial_time = time_extraction(path, 1, args.repeats)
+            parallel_time = time_extraction(path, args.workers, args.repeats)
+            print(
+                f"{num_pages:>6} {serial_time:>10.3f} {parallel_time:>11.3f} "
+                f"{num_pages / serial_time:>12.1f} {num_pages / parallel_time:>12.1f} "
+                f"{serial_time / parallel_time:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
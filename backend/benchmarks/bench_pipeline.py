@@ -0,0 +1,373 @@
+"""
+Benchmark: the whole evaluation pipeline, offline.
+
+Runs run_evaluation_pipeline in-process (Celery eager apply) against:
+- generated fixture PDFs (a fresh pair per job, sizes from --pages),
+- a stub Groq-compatible server with configurable latency and token
+  counts (stub_groq_server.py, started as a child process),
+- an in-memory Chroma collection seeded with synthetic reference
+  documents,
+- SQLite stand-ins for the Postgres services (pipeline_standins.py), or
+  a real Postgres database with --database-url.
+
+For each concurrency level it runs --jobs jobs on that many threads and
+reports per-step and whole-job p50/p95 latency, jobs/s and RSS. The
+process-wide peak RSS is reported as well. Results are written as JSON
+(default benchmarks/results/pipeline-<timestamp>.json); pass an earlier
+file as --baseline to print the change.
+
+Concurrency uses threads in one process, i.e. one worker process with
+the prefork pool replaced by threads; multiply by worker processes for
+a node's capacity.
+
+Usage:
+    python benchmarks/bench_pipeline.py --embedder hash
+    python benchmarks/bench_pipeline.py --concurrency 1,4,8 --jobs 16 --pages 2,10,40 --latency-ms 800
+    python benchmarks/bench_pipeline.py --baseline benchmarks/results/pipeline-20240101-120000.json
+    python benchmarks/bench_pipeline.py --database-url postgresql://localhost/bench   # migrated database
+"""
+
+import sys
+import os
+import argparse
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+REFERENCE_DOCUMENTS = {
+    "job_description": "Backend Engineer. Build APIs with Python and FastAPI, design PostgreSQL schemas, "
+                       "run background jobs with Celery and Redis, integrate LLM providers and vector search.",
+    "cv_rubric": "Technical skills match (40%), experience level (25%), relevant achievements (20%), "
+                 "cultural and collaboration fit (15%). Score each 1-5 and explain the rating.",
+    "case_study_brief": "Build a service that evaluates a candidate CV and project report against a job "
+                        "description using RAG retrieval, chained LLM calls, retries and a job queue.",
+    "project_rubric": "Correctness (30%), code quality (25%), resilience and error handling (20%), "
+                      "documentation (15%), creativity and bonus features (10%). Score each 1-5."
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='End-to-end evaluation pipeline throughput and latency')
+    parser.add_argument('--concurrency', default='1,4,8', help='Comma-separated concurrent job counts')
+    parser.add_argument('--jobs', type=int, default=8, help='Jobs per concurrency level')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed jobs before the first level')
+    parser.add_argument('--pages', default='2,10,40', help='Fixture PDF page counts, cycled across jobs')
+    parser.add_argument('--latency-ms', type=float, default=300.0, help='Stub LLM delay per request')
+    parser.add_argument('--per-token-ms', type=float, default=0.0, help='Stub LLM extra delay per completion token')
+    parser.add_argument('--completion-tokens', type=int, default=250, help='Stub LLM completion tokens')
+    parser.add_argument('--jitter', type=float, default=0.1, help='Stub LLM relative delay spread')
+    parser.add_argument('--stub-url', default=None, help='Use a running stub server instead of starting one')
+    parser.add_argument('--embedder', choices=['configured', 'hash'], default='configured',
+                        help="'configured' uses EMBEDDING_BACKEND; 'hash' needs no model files")
+    parser.add_argument('--database-url', default=None, help='Use real Postgres services (migrated schema)')
+    parser.add_argument('--output', default=None, help='Results JSON path')
+    parser.add_argument('--baseline', default=None, help='Earlier results JSON to compare against')
+    return parser.parse_args()
+
+
+def configure_environment(args, workdir: str):
+    """Must run before app.config is imported"""
+    os.environ.update({
+        "LLM_CACHE_BACKEND": "none",
+        "LLM_RATE_LIMIT_ENABLED": "false",
+        "JOB_EVENTS_ENABLED": "false",
+        "EMBEDDING_CACHE_ENABLED": "false",
+        "CHROMA_PERSIST_DIR": os.path.join(workdir, "chroma"),
+    })
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    # Required settings that nothing in an offline run connects to
+    for name, value in {
+        "DATABASE_URL": "postgresql://bench@127.0.0.1:1/bench",
+        "SUPABASE_URL": "http://127.0.0.1:1",
+        "SUPABASE_KEY": "bench",
+        "SUPABASE_SERVICE_KEY": "bench",
+        "GROQ_API_KEY": "bench",
+        "REDIS_PASSWORD": "bench",
+        "SECRET_KEY": "bench",
+    }.items():
+        os.environ.setdefault(name, value)
+
+
+def start_stub_server(args):
+    command = [
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_groq_server.py"),
+        "--latency-ms", str(args.latency_ms), "--per-token-ms", str(args.per_token_ms),
+        "--completion-tokens", str(args.completion_tokens), "--jitter", str(args.jitter)
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    return process, process.stdout.readline().strip()
+
+
+def percentiles(samples) -> dict:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0, "p50_ms": None, "p95_ms": None}
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        "count": len(ordered),
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[p95_index] * 1000
+    }
+
+
+def current_rss_mb() -> float:
+    with open("/proc/self/status", "r") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmRSS:")) / 1024
+
+
+class PipelineBench:
+    def __init__(self, args, workdir: str, stub_url: str):
+        import groq
+        import app.tasks.evaluation_tasks as evaluation_tasks
+        from app.services.llm_service import LLMService
+        from app.services.rag_service import RAGService
+        from app.services.vector_store import ChromaVectorStore
+        from app.utils.pipeline_dag import DAGExecutor
+        from pipeline_standins import HashingEmbedder
+
+        self.args = args
+        self.workdir = workdir
+        self.evaluation_tasks = evaluation_tasks
+        self.step_times = {}
+        self.lock = threading.Lock()
+
+        embedder = HashingEmbedder() if args.embedder == "hash" else None
+        rag_service = RAGService(vector_store=ChromaVectorStore(None), embedder=embedder)
+        llm_service = LLMService(client=groq.Groq(api_key="bench", base_url=stub_url, max_retries=0))
+        self.services = type("BenchServices", (), {"rag_service": rag_service, "llm_service": llm_service})()
+
+        bench = self
+
+        class TimedDAGExecutor(DAGExecutor):
+            def add_step(self, name, func, depends_on=(), fingerprint=None):
+                def timed(**kwargs):
+                    start = time.perf_counter()
+                    try:
+                        return func(**kwargs)
+                    finally:
+                        bench.record_step(name, time.perf_counter() - start)
+                return super().add_step(name, timed, depends_on, fingerprint)
+
+        evaluation_tasks.get_services = lambda: self.services
+        evaluation_tasks.DAGExecutor = TimedDAGExecutor
+
+        if args.database_url:
+            from app.services.document_service import DocumentService
+            from app.services.evaluation_service import EvaluationService
+            self.document_service = DocumentService()
+            self.evaluation_service = EvaluationService()
+        else:
+            import pipeline_standins
+            database = pipeline_standins.StandinDatabase()
+            pipeline_standins.use_database(database)
+            evaluation_tasks.EvaluationService = pipeline_standins.StandinEvaluationService
+            evaluation_tasks.DocumentService = pipeline_standins.StandinDocumentService
+            evaluation_tasks.CheckpointService = pipeline_standins.StandinCheckpointService
+            evaluation_tasks.ExtractedTextStore = pipeline_standins.StandinExtractedTextStore
+            self.document_service = self.evaluation_service = database
+
+        self.page_counts = [int(p) for p in args.pages.split(',') if p.strip()]
+        self.fixture_count = 0
+
+    def record_step(self, name: str, seconds: float):
+        with self.lock:
+            self.step_times.setdefault(name, []).append(seconds)
+
+    def seed_reference_documents(self):
+        import uuid
+        documents = [
+            {
+                "id": str(uuid.uuid5(uuid.NAMESPACE_URL, f"bench/{document_type}")),
+                "document_type": document_type,
+                "title": document_type.replace("_", " ").title(),
+                # Repeated so each type spans several chunks, like the real references
+                "content": " ".join([content] * 60)
+            }
+            for document_type, content in REFERENCE_DOCUMENTS.items()
+        ]
+        return self.services.rag_service.ingest_reference_documents(documents)
+
+    def _create_document(self, file_type: str, num_pages: int) -> str:
+        from bench_pdf_extraction import build_pdf
+        from app.services.pdf_parser import PDFParser
+
+        self.fixture_count += 1
+        path = os.path.join(self.workdir, f"{file_type}-{self.fixture_count}-{num_pages}p.pdf")
+        # A distinct label per file, so the extracted text store never short-circuits parsing
+        build_pdf(path, num_pages, label=f"{file_type.upper()} {self.fixture_count} page")
+        file_hash = PDFParser.file_hash(path)
+        if self.args.database_url:
+            document = self.document_service.create_document(
+                os.path.basename(path), file_type, path, os.path.getsize(path), "application/pdf", file_hash
+            )
+        else:
+            document = self.document_service.create_document(file_type, path, os.path.getsize(path), file_hash)
+        return str(document["id"])
+
+    def create_jobs(self, count: int):
+        job_ids = []
+        for _ in range(count):
+            num_pages = self.page_counts[self.fixture_count // 2 % len(self.page_counts)]
+            cv_id = self._create_document("cv", num_pages)
+            project_id = self._create_document("project", num_pages)
+            job = self.evaluation_service.create_evaluation_job("Backend Engineer", cv_id, project_id)
+            job_ids.append(str(job["id"]))
+        return job_ids
+
+    def run_job(self, job_id: str):
+        task = self.evaluation_tasks.run_evaluation_pipeline
+        start = time.perf_counter()
+        # retries=max_retries: a failure is reported, not retried inline by eager mode
+        result = task.apply(args=[job_id], retries=task.max_retries)
+        elapsed = time.perf_counter() - start
+        value = result.result if result.successful() else {"status": "failed", "error": str(result.result)}
+        return elapsed, value
+
+    def run_level(self, concurrency: int) -> dict:
+        job_ids = self.create_jobs(self.args.jobs)
+        with self.lock:
+            self.step_times = {}
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(self.run_job, job_ids))
+        wall = time.perf_counter() - start
+
+        failures = [value.get("error") for _, value in outcomes if value.get("status") != "completed"]
+        with self.lock:
+            steps = {name: percentiles(times) for name, times in sorted(self.step_times.items())}
+        return {
+            "concurrency": concurrency,
+            "jobs": len(job_ids),
+            "failed": len(failures),
+            "errors": sorted(set(failures))[:5],
+            "wall_s": wall,
+            "jobs_per_s": (len(job_ids) - len(failures)) / wall,
+            "job": percentiles([elapsed for elapsed, _ in outcomes]),
+            "steps": steps,
+            "rss_mb": current_rss_mb()
+        }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def print_level(level: dict, baseline: dict = None):
+    def delta(current, previous, lower_is_better=True):
+        if previous is None or current is None or not previous:
+            return ""
+        change = (current - previous) / previous * 100
+        better = change < 0 if lower_is_better else change > 0
+        return f" ({change:+.0f}%{' better' if better else ''})"
+
+    job = level["job"]
+    base_job = (baseline or {}).get("job", {})
+    print(
+        f"concurrency {level['concurrency']}: {level['jobs_per_s']:.2f} jobs/s"
+        f"{delta(level['jobs_per_s'], (baseline or {}).get('jobs_per_s'), lower_is_better=False)}, "
+        f"job p50 {job['p50_ms']:.0f} ms{delta(job['p50_ms'], base_job.get('p50_ms'))}, "
+        f"p95 {job['p95_ms']:.0f} ms{delta(job['p95_ms'], base_job.get('p95_ms'))}, "
+        f"failed {level['failed']}/{level['jobs']}, RSS {level['rss_mb']:.0f} MB"
+    )
+    for name, step in level["steps"].items():
+        base_step = (baseline or {}).get("steps", {}).get(name, {})
+        print(
+            f"    {name:<20} p50 {step['p50_ms']:>8.0f} ms{delta(step['p50_ms'], base_step.get('p50_ms')):<16}"
+            f"p95 {step['p95_ms']:>8.0f} ms{delta(step['p95_ms'], base_step.get('p95_ms'))}"
+        )
+    for error in level["errors"]:
+        print(f"    error: {error}")
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    configure_environment(args, workdir)
+
+    stub_process = None
+    stub_url = args.stub_url
+    if stub_url is None:
+        stub_process, stub_url = start_stub_server(args)
+
+    try:
+        bench = PipelineBench(args, workdir, stub_url)
+        chunks = bench.seed_reference_documents()
+        print(f"Stub LLM at {stub_url}; {chunks} reference chunks; pages {args.pages}; {args.jobs} jobs per level")
+
+        if args.warmup:
+            for job_id in bench.create_jobs(args.warmup):
+                bench.run_job(job_id)
+
+        levels = [bench.run_level(int(c)) for c in args.concurrency.split(',') if c.strip()]
+    finally:
+        if stub_process is not None:
+            stub_process.terminate()
+            stub_process.wait()
+
+    from app.config import settings
+    results = {
+        "benchmark": "pipeline",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "jobs_per_level": args.jobs,
+            "pages": args.pages,
+            "stub_latency_ms": args.latency_ms,
+            "stub_per_token_ms": args.per_token_ms,
+            "stub_completion_tokens": args.completion_tokens,
+            "stub_jitter": args.jitter,
+            "embedder": bench.services.rag_service.embedder.model_id,
+            # Token counts (chunking, prompt budgets) are approximate without tiktoken's BPE file
+            "tokenizer": getattr(bench.services.rag_service.tokenizer, "name", "approximate"),
+            "database": "postgres" if args.database_url else "sqlite-standins",
+            "pdf_extract_workers": settings.PDF_EXTRACT_WORKERS,
+            "llm_model": settings.LLM_MODEL
+        },
+        "levels": levels,
+        # ru_maxrss is in KiB on Linux; PDF extraction pool processes are not included
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+
+    baseline_levels = {}
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline_levels = {level["concurrency"]: level for level in json.load(f)["levels"]}
+        print(f"Compared to {args.baseline}")
+    for level in levels:
+        print_level(level, baseline_levels.get(level["concurrency"]))
+    print(f"peak RSS: {results['peak_rss_mb']:.0f} MB")
+
+    output = args.output or os.path.join(
+        BACKEND_DIR, "benchmarks", "results", f"pipeline-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: Chroma vs in-process NumPy vector store query latency.
+
+Builds reference-corpus-sized indexes (random unit vectors with the
+all-MiniLM-L6-v2 dimension, spread over the four reference document
+types) in temporary directories and times filtered top-k queries, the
+shape RAGService.retrieve_relevant_context issues. No embedding model or
+network is needed.
+
+Usage:
+    python benchmarks/bench_vector_store.py --chunks 300,3000 --queries 500
+"""
+
+import sys
+import os
+import argparse
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.vector_store import ChromaVectorStore, NumpyVectorStore
+import numpy as np
+
+DIMENSION = 384
+DOCUMENT_TYPES = ["job_description", "cv_rubric", "case_study_brief", "project_rubric"]
+QUERY_TYPES = ["job_description", "cv_rubric"]
+
+
+def build_corpus(num_chunks: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((num_chunks, DIMENSION)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    ids = [f"doc{i // 8}_chunk_{i % 8}" for i in range(num_chunks)]
+    documents = [f"Reference chunk {i}" for i in range(num_chunks)]
+    metadatas = [
+        {"document_id": f"doc{i // 8}", "document_type": DOCUMENT_TYPES[(i // 8) % 4], "title": f"Doc {i // 8}",
+         "chunk_index": i % 8, "total_chunks": 8}
+        for i in range(num_chunks)
+    ]
+    return ids, embeddings, documents, metadatas
+
+
+def time_queries(store, queries: np.ndarray, top_k: int):
+    """Per-query latencies in microseconds (after one warm-up query)"""
+    store.query(queries[0], top_k, QUERY_TYPES)
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        store.query(query, top_k, QUERY_TYPES)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return np.array(latencies)
+
+
+def recall(store, exact, queries: np.ndarray, top_k: int) -> float:
+    hits = 0
+    for query in queries:
+        expected = {chunk["text"] for chunk in exact.query(query, top_k, QUERY_TYPES)}
+        hits += len(expected & {chunk["text"] for chunk in store.query(query, top_k, QUERY_TYPES)})
+    return hits / (len(queries) * top_k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chroma vs NumPy vector store query latency")
+    parser.add_argument("--chunks", default="300,3000", help="Comma-separated index sizes")
+    parser.add_argument("--queries", type=int, default=500, help="Queries per backend")
+    parser.add_argument("--top-k", type=int, default=5, help="Results per query")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    queries = rng.standard_normal((args.queries, DIMENSION)).astype(np.float32)
+
+    print(f"{'chunks':>7} {'backend':<16} {'p50 us':>9} {'p95 us':>9} {'qps':>9} {'recall':>7} {'speedup':>8}")
+    for num_chunks in [int(c) for c in args.chunks.split(",")]:
+        corpus = build_corpus(num_chunks)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            stores = {
+                "chroma": ChromaVectorStore(os.path.join(tmp_dir, "chroma")),
+                "numpy-float32": NumpyVectorStore(os.path.join(tmp_dir, "np32"), dtype="float32"),
+                "numpy-float16": NumpyVectorStore(os.path.join(tmp_dir, "np16"), dtype="float16"),
+            }
+            for store in stores.values():
+                store.add(*corpus)
+
+            exact = stores["numpy-float32"]
+            baseline = None
+            for name, store in stores.items():
+                latencies = time_queries(store, queries, args.top_k)
+                p50 = np.percentile(latencies, 50)
+                baseline = baseline or p50
+                print(
+                    f"{num_chunks:>7} {name:<16} {p50:>9.1f} {np.percentile(latencies, 95):>9.1f} "
+                    f"{1e6 / latencies.mean():>9.0f} {recall(store, exact, queries[:100], args.top_k):>7.3f} "
+                    f"{baseline / p50:>7.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+In-process stand-ins for the Postgres-backed services used by
+run_evaluation_pipeline, so bench_pipeline.py runs without a database.
+
+They implement exactly the methods the pipeline calls, on one shared
+SQLite connection (in memory by default). Each stand-in is instantiated
+by the task with no arguments, like the real services, so they all use
+the module-level StandinDatabase set by use_database().
+
+HashingEmbedder is an offline embedder (feature hashing of words) for
+runs where the sentence-transformers / ONNX model is not available. Its
+vectors are meaningless beyond word overlap; retrieval still does the
+same amount of work.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import uuid
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE documents (
+    id TEXT PRIMARY KEY, filename TEXT, file_type TEXT, file_path TEXT,
+    file_size INTEGER, mime_type TEXT, file_hash TEXT
+);
+CREATE TABLE evaluation_jobs (
+    id TEXT PRIMARY KEY, job_title TEXT, cv_document_id TEXT, project_document_id TEXT,
+    status TEXT, cv_match_rate REAL, cv_feedback TEXT, project_score REAL,
+    project_feedback TEXT, overall_summary TEXT, error_message TEXT
+);
+CREATE TABLE evaluation_logs (
+    evaluation_job_id TEXT, step_name TEXT, llm_provider TEXT, llm_model TEXT,
+    prompt_tokens INTEGER, completion_tokens INTEGER, total_tokens INTEGER,
+    response_time_ms INTEGER, status TEXT, error_message TEXT, cached INTEGER
+);
+CREATE TABLE evaluation_checkpoints (
+    evaluation_job_id TEXT, step_name TEXT, input_hash TEXT, output TEXT,
+    PRIMARY KEY (evaluation_job_id, step_name)
+);
+CREATE TABLE document_texts (
+    file_hash TEXT, extractor_version TEXT, cleaned_text TEXT, char_count INTEGER, word_count INTEGER,
+    PRIMARY KEY (file_hash, extractor_version)
+);
+"""
+
+
+class StandinDatabase:
+    """One SQLite connection shared by every stand-in, serialized by a lock"""
+    def __init__(self, path: str = ":memory:"):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def execute(self, query: str, params=()) -> List[Dict]:
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+            self.conn.commit()
+        return [dict(row) for row in rows]
+
+    def executemany(self, query: str, rows: List[tuple]):
+        with self.lock:
+            self.conn.executemany(query, rows)
+            self.conn.commit()
+
+    def create_document(self, file_type: str, file_path: str, file_size: int, file_hash: str) -> Dict:
+        document_id = str(uuid.uuid4())
+        self.execute(
+            "INSERT INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (document_id, file_path.rsplit("/", 1)[-1], file_type, file_path, file_size, "application/pdf", file_hash)
+        )
+        return {"id": document_id}
+
+    def create_evaluation_job(self, job_title: str, cv_document_id: str, project_document_id: str) -> Dict:
+        job_id = str(uuid.uuid4())
+        self.execute(
+            "INSERT INTO evaluation_jobs (id, job_title, cv_document_id, project_document_id, status) "
+            "VALUES (?, ?, ?, ?, 'queued')",
+            (job_id, job_title, str(cv_document_id), str(project_document_id))
+        )
+        return {"id": job_id}
+
+
+_database: Optional[StandinDatabase] = None
+
+
+def use_database(database: StandinDatabase):
+    global _database
+    _database = database
+
+
+def _db() -> StandinDatabase:
+    if _database is None:
+        raise RuntimeError("Call use_database() before running the pipeline with stand-ins")
+    return _database
+
+
+class StandinEvaluationService:
+    def __init__(self):
+        self._logs = []
+
+    def get_evaluation_job(self, job_id) -> Optional[Dict]:
+        rows = _db().execute("SELECT * FROM evaluation_jobs WHERE id = ?", (str(job_id),))
+        return rows[0] if rows else None
+
+    def update_job_status(self, job_id, status: str, error_message: Optional[str] = None):
+        _db().execute(
+            "UPDATE evaluation_jobs SET status = ?, error_message = COALESCE(?, error_message) WHERE id = ?",
+            (status, error_message, str(job_id))
+        )
+
+    def update_job_results(
+        self,
+        job_id,
+        cv_match_rate=None,
+        cv_feedback=None,
+        project_score=None,
+        project_feedback=None,
+        overall_summary=None
+    ):
+        _db().execute(
+            "UPDATE evaluation_jobs SET cv_match_rate = ?, cv_feedback = ?, project_score = ?, "
+            "project_feedback = ?, overall_summary = ?, status = 'completed' WHERE id = ?",
+            (cv_match_rate, cv_feedback, project_score, project_feedback, overall_summary, str(job_id))
+        )
+
+    def log_evaluation_step(
+        self,
+        job_id,
+        step_name: str,
+        llm_provider: str,
+        llm_model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        response_time_ms: int,
+        status: str,
+        error_message: Optional[str] = None,
+        cached: bool = False
+    ):
+        # Buffered like the real service and written by flush_evaluation_logs()
+        self._logs.append(
+            (str(job_id), step_name, llm_provider, llm_model, prompt_tokens, completion_tokens,
+             prompt_tokens + completion_tokens, response_time_ms, status, error_message, int(cached))
+        )
+
+    def flush_evaluation_logs(self):
+        logs, self._logs = self._logs, []
+        if logs:
+            _db().executemany("INSERT INTO evaluation_logs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", logs)
+
+
+class StandinDocumentService:
+    def get_document(self, document_id) -> Optional[Dict]:
+        rows = _db().execute("SELECT * FROM documents WHERE id = ?", (str(document_id),))
+        return rows[0] if rows else None
+
+
+class StandinCheckpointService:
+    def load_checkpoints(self, job_id) -> Dict[str, Dict[str, Any]]:
+        rows = _db().execute(
+            "SELECT step_name, input_hash, output FROM evaluation_checkpoints WHERE evaluation_job_id = ?",
+            (str(job_id),)
+        )
+        return {
+            row['step_name']: {"input_hash": row['input_hash'], "output": json.loads(row['output'])}
+            for row in rows
+        }
+
+    def save_checkpoint(self, job_id, step_name: str, input_hash: str, output: Any):
+        _db().execute(
+            "INSERT OR REPLACE INTO evaluation_checkpoints VALUES (?, ?, ?, ?)",
+            (str(job_id), step_name, input_hash, json.dumps(output, default=str))
+        )
+
+    def clear_checkpoints(self, job_id):
+        _db().execute("DELETE FROM evaluation_checkpoints WHERE evaluation_job_id = ?", (str(job_id),))
+
+
+class StandinExtractedTextStore:
+    def get(self, file_hash: str, extractor_version: str) -> Optional[Dict]:
+        rows = _db().execute(
+            "SELECT cleaned_text, char_count, word_count FROM document_texts "
+            "WHERE file_hash = ? AND extractor_version = ?",
+            (file_hash, extractor_version)
+        )
+        if not rows:
+            return None
+        return dict(rows[0], raw_text=None, cached=True)
+
+    def put(self, file_hash: str, extractor_version: str, parsed: Dict):
+        _db().execute(
+            "INSERT OR IGNORE INTO document_texts VALUES (?, ?, ?, ?, ?)",
+            (file_hash, extractor_version, parsed['cleaned_text'], parsed['char_count'], parsed['word_count'])
+        )
+
+
+class HashingEmbedder:
+    """Offline Embedder: L2-normalizable bag of hashed words, no model to load"""
+    def __init__(self, dimension: int = 384):
+        self._dimension = dimension
+        self.model_id = f"hashing-{dimension}"
+
+    def encode(self, texts: List[str], batch_size: int, normalize: bool) -> np.ndarray:
+        vectors = np.zeros((len(texts), self._dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+                vectors[row, int.from_bytes(digest, "little") % self._dimension] += 1.0
+        if normalize:
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
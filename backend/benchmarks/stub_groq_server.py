@@ -0,0 +1,145 @@
+"""
+Stub Groq (OpenAI-compatible) chat completions server for offline benchmarks.
+
+Answers POST .../chat/completions after a configurable delay with a
+completion whose usage reports a configurable token count. The content
+is a single JSON object that satisfies every LLMService parser (CV and
+project parsing, both evaluations); the final summary step just uses it
+as text. No request is validated beyond being JSON.
+
+Delay per request = latency-ms + per-token-ms * completion-tokens,
+scaled by a random factor in [1 - jitter, 1 + jitter].
+
+Usage:
+    python benchmarks/stub_groq_server.py --port 8089 --latency-ms 400 --completion-tokens 300
+    # then point groq.Groq(base_url="http://127.0.0.1:8089") at it
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FEEDBACK = "Solid backend fundamentals with clear ownership of production services. "
+
+
+def completion_content(completion_tokens: int) -> str:
+    """JSON answer padded to roughly completion_tokens tokens (~4 chars each)"""
+    feedback = (FEEDBACK * (1 + completion_tokens * 4 // len(FEEDBACK)))[:max(completion_tokens * 4 - 400, 40)]
+    return json.dumps({
+        "name": "Benchmark Candidate",
+        "technical_skills": ["python", "postgresql", "celery", "redis"],
+        "experience_years": 5,
+        "technologies_used": ["fastapi", "chromadb"],
+        "key_features": ["evaluation pipeline", "rag retrieval"],
+        "match_rate": 0.82,
+        "overall_feedback": feedback,
+        "project_score": 4.1,
+        "project_feedback": feedback
+    })
+
+
+class StubGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if not self.path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Request body is not JSON"}})
+            return
+
+        config = self.server.config
+        completion_tokens = config.completion_tokens
+        delay_ms = config.latency_ms + config.per_token_ms * completion_tokens
+        delay_ms *= random.uniform(1 - config.jitter, 1 + config.jitter)
+        time.sleep(max(delay_ms, 0) / 1000)
+
+        prompt_chars = sum(len(message.get("content") or "") for message in request.get("messages", []))
+        prompt_tokens = max(prompt_chars // 4, 1)
+        with self.server.lock:
+            self.server.requests += 1
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": completion_content(completion_tokens)},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        })
+
+
+def make_server(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    latency_ms: float = 300.0,
+    per_token_ms: float = 0.0,
+    completion_tokens: int = 250,
+    jitter: float = 0.1
+) -> ThreadingHTTPServer:
+    """Bound (not yet serving) stub server; port 0 picks a free port"""
+    server = ThreadingHTTPServer((host, port), StubGroqHandler)
+    server.daemon_threads = True
+    server.config = argparse.Namespace(
+        latency_ms=latency_ms, per_token_ms=per_token_ms,
+        completion_tokens=completion_tokens, jitter=jitter
+    )
+    server.lock = threading.Lock()
+    server.requests = 0
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stub Groq chat completions server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0, help='0 picks a free port (printed on startup)')
+    parser.add_argument('--latency-ms', type=float, default=300.0, help='Fixed delay per request')
+    parser.add_argument('--per-token-ms', type=float, default=0.0, help='Extra delay per completion token')
+    parser.add_argument('--completion-tokens', type=int, default=250, help='Completion tokens per response')
+    parser.add_argument('--jitter', type=float, default=0.1, help='Relative random spread of the delay')
+    args = parser.parse_args()
+
+    server = make_server(
+        args.host, args.port, args.latency_ms, args.per_token_ms, args.completion_tokens, args.jitter
+    )
+    host, port = server.server_address[:2]
+    # First line of output: the base URL (bench_pipeline.py reads it)
+    print(f"http://{host}:{port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served {server.requests} requests", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Export the sentence-transformers embedding model to ONNX for EMBEDDING_BACKEND=onnx.
+
+This script:
+1. Loads the sentence-transformers model and exports its transformer to
+   model.onnx (dynamic batch and sequence axes)
+2. Optionally writes a dynamic int8 quantized copy, model.int8.onnx
+3. Saves tokenizer.json and an embedder.json manifest (pooling, max
+   sequence length, normalization)
+4. Embeds the reference documents (or built-in samples if the database
+   is unreachable) with every variant and records the minimum cosine
+   similarity to the sentence-transformers vectors in the manifest.
+   Variants below EMBEDDING_ONNX_MIN_COSINE fail the export and are
+   refused by the backend at startup.
+
+Usage:
+    python scripts/export_onnx_embedding_model.py --quantize
+    python scripts/export_onnx_embedding_model.py --output-dir ./models/all-MiniLM-L6-v2-onnx
+"""
+
+import sys
+import os
+import argparse
+import json
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dotenv import load_dotenv
+import logging
+
+# Load environment variables
+load_dotenv()
+
+from app.config import settings
+from app.services.embedding_backends import (
+    EMBEDDING_MODEL_NAME,
+    MANIFEST_FILE,
+    OnnxEmbedder,
+    SentenceTransformerEmbedder,
+    cosine_agreement
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+SAMPLE_TEXTS = [
+    "Evaluate CV for Backend Engineer position. Technical skills, experience level, achievements, cultural fit.",
+    "Evaluate project report. Correctness, code quality, resilience, error handling, documentation, creativity.",
+    "Designs RESTful APIs, models relational data in PostgreSQL and builds asynchronous job pipelines with retries.",
+    "Scoring rubric: 1 = no evidence, 3 = meets expectations, 5 = exceptional and well documented.",
+    "Implemented retrieval-augmented generation with a vector database and prompt chaining over LLM calls."
+]
+
+
+def load_verification_texts(rag_chunker) -> list:
+    """Chunks of the reference documents, or the built-in samples without a database"""
+    try:
+        from app.database import execute_query
+        documents = execute_query("SELECT content FROM reference_documents ORDER BY document_type, created_at")
+    except Exception as e:
+        logger.warning(f"Could not read reference documents ({str(e)}); verifying on built-in samples")
+        return SAMPLE_TEXTS
+
+    texts = [chunk for doc in documents for chunk in rag_chunker(doc['content'])]
+    return (texts or SAMPLE_TEXTS) + SAMPLE_TEXTS
+
+
+def export(output_dir: str, quantize: bool, opset: int):
+    import torch
+    from sentence_transformers import models
+
+    reference = SentenceTransformerEmbedder(EMBEDDING_MODEL_NAME)
+    model = reference.model
+    transformer = model[0].auto_model.eval()
+    tokenizer = model.tokenizer
+
+    pooling = [module for module in model if isinstance(module, models.Pooling)]
+    if not pooling or pooling[0].get_pooling_mode_str() != "mean":
+        raise ValueError(f"{EMBEDDING_MODEL_NAME} does not use mean pooling; OnnxEmbedder cannot reproduce it")
+
+    class HiddenStates(torch.nn.Module):
+        """Expose last_hidden_state only; pooling runs in NumPy"""
+        def __init__(self, transformer):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, input_ids, attention_mask, token_type_ids=None):
+            return self.transformer(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                token_type_ids=token_type_ids
+            )[0]
+
+    os.makedirs(output_dir, exist_ok=True)
+    dummy = tokenizer(["export the embedding model"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in dummy]
+    axes = {0: "batch", 1: "sequence"}
+
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    logger.info(f"Exporting {EMBEDDING_MODEL_NAME} to {fp32_path}...")
+    with torch.no_grad():
+        torch.onnx.export(
+            HiddenStates(transformer),
+            tuple(dummy[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={name: axes for name in input_names + ["last_hidden_state"]},
+            opset_version=opset,
+            do_constant_folding=True,
+            dynamo=False
+        )
+    files = {"fp32": "model.onnx"}
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        int8_path = os.path.join(output_dir, "model.int8.onnx")
+        logger.info(f"Quantizing weights to int8: {int8_path}")
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+        files["int8"] = "model.int8.onnx"
+
+    tokenizer.backend_tokenizer.save(os.path.join(output_dir, "tokenizer.json"))
+
+    manifest = {
+        "model_name": EMBEDDING_MODEL_NAME,
+        "files": files,
+        "dimension": model.get_sentence_embedding_dimension(),
+        "max_seq_length": model.max_seq_length,
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": tokenizer.pad_token_id,
+        "pooling": "mean",
+        "normalize": any(isinstance(module, models.Normalize) for module in model),
+        "min_cosine": {}
+    }
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return reference, manifest, manifest_path
+
+
+def verify(reference, manifest: dict, manifest_path: str, output_dir: str, texts: list) -> bool:
+    logger.info(f"Verifying on {len(texts)} texts against sentence-transformers...")
+    expected = reference.encode(texts, settings.EMBEDDING_BATCH_SIZE, normalize=False)
+
+    passed = True
+    for variant in manifest["files"]:
+        # Not verified yet, so skip the agreement check
+        candidate = OnnxEmbedder(output_dir, quantized=variant == "int8", min_cosine=None)
+        agreement = cosine_agreement(expected, candidate.encode(texts, settings.EMBEDDING_BATCH_SIZE, normalize=False))
+        manifest["min_cosine"][variant] = round(float(agreement.min()), 6)
+        ok = agreement.min() >= settings.EMBEDDING_ONNX_MIN_COSINE
+        passed = passed and ok
+        logger.info(
+            f"  {'✓' if ok else '✗'} {variant}: min cosine {agreement.min():.5f}, "
+            f"mean {agreement.mean():.5f} (required {settings.EMBEDDING_ONNX_MIN_COSINE})"
+        )
+
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX")
+    parser.add_argument("--output-dir", default=settings.EMBEDDING_ONNX_DIR, help="Directory for the exported files")
+    parser.add_argument("--quantize", action="store_true", help="Also write a dynamic int8 model")
+    parser.add_argument("--opset", type=int, default=14, help="ONNX opset version")
+    args = parser.parse_args()
+
+    try:
+        reference, manifest, manifest_path = export(args.output_dir, args.quantize, args.opset)
+
+        # Chunk like ingestion does, so verification sees real chunk lengths
+        from app.services.rag_service import RAGService
+        texts = load_verification_texts(RAGService(embedder=reference).chunk_text)
+
+        if not verify(reference, manifest, manifest_path, args.output_dir, texts):
+            logger.error("ONNX embeddings disagree with sentence-transformers; the backend will refuse them")
+            sys.exit(1)
+        logger.info(f"Export complete. Set EMBEDDING_BACKEND=onnx and EMBEDDING_ONNX_DIR={args.output_dir}")
+    except Exception as e:
+        logger.error(f"Export failed: {str(e)}")
+        sys.exit(1)
@@ -3,16 +3,18 @@ Script to ingest reference documents into the vector database.
 
 This script:
 1. Reads reference documents from the database
-2. Chunks the content
-3. Generates embeddings
-4. Stores in ChromaDB for RAG retrieval
+2. Skips documents whose content hash matches what is already stored
+3. Re-chunks changed documents and embeds only chunk text not stored yet
+4. Upserts changed chunks and deletes stale ones (and removed documents)
 
 Usage:
-    python scripts/ingest_reference_documents.py
+    python scripts/ingest_reference_documents.py          # incremental
+    python scripts/ingest_reference_documents.py --full   # clear and rebuild
 """
 
 import sys
 import os
+import argparse
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -33,18 +35,22 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def ingest_all_reference_documents():
+def ingest_all_reference_documents(full: bool = False):
     """
-    Ingest all reference documents from the database into ChromaDB.
+    Sync all reference documents from the database into the vector store.
+    
+    Only added or edited documents are re-chunked, and only chunk text that
+    is not already stored is embedded, so a run costs time proportional to
+    the edit. `full` clears the collection first and re-embeds everything.
     """
     logger.info("Starting reference document ingestion...")
     
     # Initialize RAG service
     rag_service = RAGService()
     
-    # Clear existing collection (optional - comment out to keep existing data)
-    logger.info("Clearing existing vector database...")
-    rag_service.clear_collection()
+    if full:
+        logger.info("Clearing existing vector database...")
+        rag_service.clear_collection()
     
     # Fetch all reference documents from database
     query = """
@@ -57,42 +63,54 @@ def ingest_all_reference_documents():
     
     if not documents:
         logger.warning("No reference documents found in database")
+        # Still drop whatever is left in the store from deleted documents
+        report = rag_service.sync_reference_documents([], remove_missing=True)
+        logger.info(
+            f"Removed {len(report['removed'])} documents ({report['chunks_deleted']} chunks) from the vector store"
+        )
         return
     
-    logger.info(f"Found {len(documents)} reference documents to ingest")
+    logger.info(f"Found {len(documents)} reference documents")
+    titles = {str(doc['id']): f"{doc['document_type']} - {doc['title']}" for doc in documents}
+    
+    # Documents no longer in the table are removed from the store as well
+    report = rag_service.sync_reference_documents([
+        {
+            "id": str(doc['id']),
+            "document_type": doc['document_type'],
+            "title": doc['title'],
+            "content": doc['content'],
+            "metadata": doc['metadata'] if doc['metadata'] else {}
+        }
+        for doc in documents
+    ], remove_missing=True)
     
-    # Ingest each document
-    total_chunks = 0
-    for doc in documents:
-        logger.info(f"Ingesting: {doc['document_type']} - {doc['title']}")
-        
-        try:
-            num_chunks = rag_service.ingest_reference_document(
-                document_id=str(doc['id']),
-                document_type=doc['document_type'],
-                title=doc['title'],
-                content=doc['content'],
-                metadata=doc['metadata'] if doc['metadata'] else {}
-            )
-            
-            total_chunks += num_chunks
-            logger.info(f"  ✓ Created {num_chunks} chunks")
-            
-        except Exception as e:
-            logger.error(f"  ✗ Failed to ingest document: {str(e)}")
-            continue
+    for outcome, marker in (("added", "+"), ("changed", "~"), ("removed", "-")):
+        for doc_id in report[outcome]:
+            logger.info(f"  {marker} {outcome}: {titles.get(doc_id, doc_id)}")
     
     # Get collection stats
     stats = rag_service.get_collection_stats()
     logger.info(f"\nIngestion complete!")
-    logger.info(f"Total documents: {len(documents)}")
-    logger.info(f"Total chunks: {total_chunks}")
+    logger.info(
+        f"Documents: {len(report['added'])} added, {len(report['changed'])} changed, "
+        f"{len(report['unchanged'])} unchanged, {len(report['removed'])} removed"
+    )
+    logger.info(
+        f"Chunks: {report['chunks_embedded']} embedded, {report['chunks_reused']} reused, "
+        f"{report['chunks_written']} written, {report['chunks_deleted']} deleted"
+    )
+    logger.info(f"Total chunks: {report['chunks_total']}")
     logger.info(f"Collection stats: {stats}")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest reference documents into the vector store")
+    parser.add_argument("--full", action="store_true", help="Clear the collection and re-embed every document")
+    args = parser.parse_args()
+    
     try:
-        ingest_all_reference_documents()
+        ingest_all_reference_documents(full=args.full)
     except Exception as e:
         logger.error(f"Ingestion failed: {str(e)}")
         sys.exit(1)
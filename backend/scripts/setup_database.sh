@@ -38,6 +38,14 @@ execute_sql "scripts/001_create_tables.sql"
 echo "Step 2: Seeding reference documents..."
 execute_sql "scripts/002_seed_reference_documents.sql"
 
+echo "Step 3: Applying migrations..."
+execute_sql "scripts/003_add_evaluation_logs_cached.sql"
+execute_sql "scripts/004_add_documents_file_hash.sql"
+execute_sql "scripts/005_create_document_texts.sql"
+execute_sql "scripts/006_create_evaluation_checkpoints.sql"
+execute_sql "scripts/007_create_evaluation_batches.sql"
+execute_sql "scripts/008_pgvector_embeddings.sql"
+
 echo "=== Database setup complete! ==="
 echo ""
 echo "Next steps:"
@@ -1,5 +1,10 @@
 #!/bin/bash
 
+# Pool processes write metric samples here; the worker exporter
+# (METRICS_WORKER_PORT) aggregates them. Must start out empty.
+export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/celery_metrics}"
+rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 # Start Celery worker with proper configuration
 celery -A app.tasks.celery_config worker \
     --loglevel=info \
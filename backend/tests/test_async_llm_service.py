@@ -0,0 +1,136 @@
+import pytest
+import asyncio
+import json
+import threading
+import time
+import groq
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.services.llm_service import LLMService
+from app.services.async_llm_service import AsyncLLMService
+from app.utils.error_handler import LLMError
+
+
+class StubGroqHandler(BaseHTTPRequestHandler):
+    """Minimal Groq-compatible /chat/completions endpoint"""
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.delay)
+            if server.status != 200:
+                payload = {"error": {"message": "bad request", "type": "invalid_request_error"}}
+            else:
+                payload = {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body["model"],
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": server.content},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": {"prompt_tokens": 12, "completion_tokens": 5, "total_tokens": 17}
+                }
+            data = json.dumps(payload).encode()
+            self.send_response(server.status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubGroqHandler)
+    server.lock = threading.Lock()
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.delay = 0.0
+    server.status = 200
+    server.content = json.dumps({"name": "Jane Doe", "technical_skills": ["python"]})
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _base_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_async_methods_match_sync_results(stub_server):
+    """Test that the async path returns the same shape and values as the sync path"""
+    sync_service = LLMService(client=groq.Groq(api_key="test", base_url=_base_url(stub_server)))
+    sync_result = sync_service.parse_cv_to_structured_data("CV content")
+
+    async def run():
+        service = AsyncLLMService(client=groq.AsyncGroq(api_key="test", base_url=_base_url(stub_server)))
+        try:
+            return await service.parse_cv_to_structured_data("CV content")
+        finally:
+            await service.aclose()
+
+    async_result = asyncio.run(run())
+
+    assert async_result['parsed_data'] == sync_result['parsed_data'] == {
+        "name": "Jane Doe", "technical_skills": ["python"]
+    }
+    assert async_result['usage']['prompt_tokens'] == 12
+    assert async_result['usage']['completion_tokens'] == 5
+    assert async_result['usage'].keys() == sync_result['usage'].keys()
+
+
+def test_in_flight_requests_are_capped(stub_server):
+    """Test that the per-process semaphore bounds concurrent requests"""
+    stub_server.delay = 0.05
+    stub_server.content = "Strong candidate."
+
+    async def run():
+        service = AsyncLLMService(
+            client=groq.AsyncGroq(api_key="test", base_url=_base_url(stub_server)),
+            max_concurrency=3
+        )
+        try:
+            return await asyncio.gather(*[
+                service.generate_overall_summary(
+                    {"cv_match_rate": 0.8, "cv_feedback": "good"},
+                    {"project_score": 4.0, "project_feedback": "solid"},
+                    "Backend Engineer"
+                )
+                for _ in range(10)
+            ])
+        finally:
+            await service.aclose()
+
+    results = asyncio.run(run())
+
+    assert len(results) == 10
+    assert all(r['overall_summary'] == "Strong candidate." for r in results)
+    assert 1 < stub_server.max_in_flight <= 3
+
+
+def test_api_errors_are_wrapped_in_llm_error(stub_server):
+    """Test that Groq API failures surface as LLMError like the sync path"""
+    stub_server.status = 400
+
+    async def run():
+        service = AsyncLLMService(client=groq.AsyncGroq(api_key="test", base_url=_base_url(stub_server)))
+        try:
+            await service.parse_project_report("Project report")
+        finally:
+            await service.aclose()
+
+    with pytest.raises(LLMError):
+        asyncio.run(run())
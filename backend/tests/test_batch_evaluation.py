@@ -0,0 +1,101 @@
+import pytest
+from datetime import datetime
+from uuid import uuid4
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.models.evaluation import BatchProgress
+from app.routers import evaluate, result
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(evaluate.router, prefix="/api")
+    app.include_router(result.router, prefix="/api")
+    return TestClient(app)
+
+
+def make_pairs(count):
+    return [{"cv_document_id": str(uuid4()), "project_document_id": str(uuid4())} for _ in range(count)]
+
+
+def test_batch_creates_jobs_and_dispatches_one_group(client):
+    """Test that a batch validates documents once and queues every job together"""
+    pairs = make_pairs(3)
+    batch_id = uuid4()
+
+    def create_batch(job_title, document_pairs):
+        return {
+            "id": batch_id, "job_title": job_title, "total_jobs": len(document_pairs),
+            "created_at": datetime.utcnow(),
+            "jobs": [{"id": uuid4(), "status": "queued"} for _ in document_pairs]
+        }
+
+    with patch.object(evaluate.evaluation_service, 'find_missing_documents', return_value=[]) as find_missing, \
+         patch.object(evaluate.evaluation_service, 'create_evaluation_batch', side_effect=create_batch), \
+         patch.object(evaluate, 'enqueue_evaluation_pipelines') as enqueue:
+        response = client.post("/api/evaluate/batch", json={"job_title": "Backend Engineer", "candidates": pairs})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["id"] == str(batch_id)
+    assert body["progress"] == {"total": 3, "queued": 3, "processing": 0, "completed": 0, "failed": 0, "retrying": 0}
+    assert len(body["job_ids"]) == 3
+    find_missing.assert_called_once()
+    assert len(find_missing.call_args[0][0]) == 6
+    enqueue.assert_called_once()
+    assert [str(job_id) for job_id in enqueue.call_args[0][0]] == body["job_ids"]
+
+
+def test_batch_with_missing_document_queues_nothing(client):
+    """Test that one unknown document rejects the whole batch"""
+    pairs = make_pairs(2)
+    missing = pairs[1]["project_document_id"]
+
+    with patch.object(evaluate.evaluation_service, 'find_missing_documents', return_value=[missing]), \
+         patch.object(evaluate.evaluation_service, 'create_evaluation_batch') as create_batch, \
+         patch.object(evaluate, 'enqueue_evaluation_pipelines') as enqueue:
+        response = client.post("/api/evaluate/batch", json={"job_title": "Backend Engineer", "candidates": pairs})
+
+    assert response.status_code == 404
+    assert missing in response.json()["detail"]
+    create_batch.assert_not_called()
+    enqueue.assert_not_called()
+
+
+def test_batch_progress_and_results(client):
+    """Test aggregate status and per-job results of a batch"""
+    batch_id = uuid4()
+    batch = {
+        "id": batch_id, "job_title": "Backend Engineer", "total_jobs": 2, "created_at": datetime.utcnow(),
+        "queued": 0, "processing": 1, "completed": 1, "failed": 0, "retrying": 0
+    }
+    jobs = [
+        {"id": uuid4(), "status": "completed", "cv_document_id": uuid4(), "project_document_id": uuid4(),
+         "cv_match_rate": 0.8, "cv_feedback": "Good", "project_score": 4.5, "project_feedback": "Solid",
+         "overall_summary": "Hire", "created_at": datetime.utcnow(), "completed_at": datetime.utcnow()},
+        {"id": uuid4(), "status": "processing", "cv_document_id": uuid4(), "project_document_id": uuid4(),
+         "created_at": datetime.utcnow()},
+    ]
+
+    with patch.object(evaluate.evaluation_service, 'get_evaluation_batch', return_value=batch), \
+         patch.object(result.evaluation_service, 'get_evaluation_batch', return_value=batch), \
+         patch.object(result.evaluation_service, 'get_batch_jobs', return_value=jobs):
+        progress = client.get(f"/api/evaluate/batch/{batch_id}").json()
+        results = client.get(f"/api/result/batch/{batch_id}").json()
+
+    assert progress["status"] == "processing"
+    assert progress["progress"]["completed"] == 1
+    assert [item["status"] for item in results["results"]] == ["completed", "processing"]
+    assert results["results"][0]["result"]["overall_summary"] == "Hire"
+    assert results["results"][1]["result"] is None
+
+
+def test_batch_stays_processing_while_a_failed_job_will_be_retried():
+    """Test that only failures without a pending retry count as finished"""
+    retrying = BatchProgress(total=2, completed=1, retrying=1)
+    assert retrying.status == "processing"
+
+    finished = BatchProgress(total=2, completed=1, failed=1)
+    assert finished.status == "completed"
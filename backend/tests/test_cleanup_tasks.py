@@ -0,0 +1,81 @@
+from unittest.mock import patch
+from app.database import iter_query_batches
+from app.tasks.cleanup_tasks import cleanup_old_documents
+
+
+class FakeNamedCursor:
+    def __init__(self, conn, name):
+        self.conn = conn
+        self.name = name
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, query, params=None):
+        self.rows = [{"id": i} for i in range(5)]
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        self.conn.fetches.append(len(batch))
+        return batch
+
+
+class FakeConnection:
+    def __init__(self):
+        self.cursor_names = []
+        self.fetches = []
+        self.commits = 0
+
+    def cursor(self, name=None):
+        self.cursor_names.append(name)
+        return FakeNamedCursor(self, name)
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_iter_query_batches_streams_through_a_named_cursor():
+    """Test that rows are fetched in bounded batches from a server-side cursor on one connection"""
+    conn = FakeConnection()
+    with patch('app.database.get_pool') as get_pool:
+        get_pool.return_value.getconn.return_value = conn
+        batches = list(iter_query_batches("SELECT id FROM documents", batch_size=2))
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert conn.fetches == [2, 2, 1, 0]
+    assert conn.cursor_names[0].startswith("batch_")
+    assert conn.commits == 1
+    get_pool.return_value.putconn.assert_called_once_with(conn, discard=False)
+
+
+def test_cleanup_old_documents_deletes_in_batches(tmp_path):
+    """Test that each batch is one DELETE ... RETURNING and its files are removed"""
+    documents = {}
+    for i in range(3):
+        path = tmp_path / f"doc{i}.pdf"
+        path.write_bytes(b"%PDF")
+        documents[f"id-{i}"] = str(path)
+    documents["id-3"] = str(tmp_path / "already-gone.pdf")
+    batches = [[{"id": "id-0"}, {"id": "id-1"}], [{"id": "id-2"}, {"id": "id-3"}]]
+
+    def delete(query, params=None, fetch=True):
+        return [{"file_path": documents[doc_id]} for doc_id in params[0]]
+
+    with patch('app.tasks.cleanup_tasks.iter_query_batches', return_value=iter(batches)) as iter_batches, \
+            patch('app.tasks.cleanup_tasks.execute_query', side_effect=delete) as execute_query:
+        result = cleanup_old_documents(cutoff_date="2024-01-01T00:00:00", batch_size=2)
+
+    assert iter_batches.call_args.kwargs["batch_size"] == 2
+    assert [call.args[1] for call in execute_query.call_args_list] == [(["id-0", "id-1"],), (["id-2", "id-3"],)]
+    assert "RETURNING file_path" in execute_query.call_args.args[0]
+    assert result["deleted_records"] == 4
+    assert result["deleted_files"] == 3
+    assert result["missing_files"] == 1
+    assert result["batches"] == 2
+    assert result["complete"] is True
+    assert result["cutoff_date"] == "2024-01-01T00:00:00"
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,166 @@
+import pytest
+import threading
+import time
+from unittest.mock import patch
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from app.database import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    """Stand-in for a psycopg2 connection"""
+    def __init__(self):
+        self.closed = 0
+        self.rollbacks = 0
+        self.commits = 0
+        self.queries = []
+        self.healthy = True
+
+    def cursor(self):
+        conn = self
+
+        class Cursor:
+            rowcount = 0
+
+            def fetchall(self):
+                return []
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                return False
+
+            def execute(self, query, params=None):
+                if not conn.healthy:
+                    raise Exception("server closed the connection unexpectedly")
+                conn.queries.append(query)
+                if "missing_table" in query:
+                    raise Exception('relation "missing_table" does not exist')
+
+        return Cursor()
+
+    def get_transaction_status(self):
+        return TRANSACTION_STATUS_IDLE
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+def make_pool(**overrides):
+    options = dict(min_size=0, max_size=2, max_idle=300, max_lifetime=3600, timeout=1, ping_after=10)
+    options.update(overrides)
+    return ConnectionPool("postgresql://fake", **options)
+
+
+@pytest.fixture
+def fake_connect():
+    with patch('app.database.psycopg2.connect', side_effect=lambda *a, **k: FakeConnection()) as connect:
+        yield connect
+
+
+def test_connections_are_reused(fake_connect):
+    """Test that a returned connection is handed out again instead of reconnecting"""
+    pool = make_pool()
+
+    conn = pool.getconn()
+    pool.putconn(conn)
+
+    assert pool.getconn() is conn
+    assert fake_connect.call_count == 1
+    assert pool.stats()['checked_out'] == 1
+
+
+def test_exhausted_pool_waits_then_times_out(fake_connect):
+    """Test that checkouts block while the pool is full and fail after the timeout"""
+    pool = make_pool(max_size=1, timeout=0.2)
+    held = pool.getconn()
+
+    # Released by another thread while we wait
+    threading.Timer(0.05, pool.putconn, args=(held,)).start()
+    assert pool.getconn() is held
+    assert pool.stats()['waits'] == 1
+
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+
+
+def test_stale_connections_are_replaced(fake_connect):
+    """Test pre-ping and idle recycling"""
+    pool = make_pool(ping_after=0, max_idle=0.05)
+
+    conn = pool.getconn()
+    pool.putconn(conn)
+    conn.healthy = False
+
+    replacement = pool.getconn()
+    assert replacement is not conn
+    assert conn.closed
+    pool.putconn(replacement)
+
+    time.sleep(0.1)
+    assert pool.getconn() is not replacement
+    assert replacement.closed
+    assert pool.stats()['connections_recycled'] == 2
+
+
+def test_broken_connections_are_discarded(fake_connect):
+    """Test that putconn(discard=True) frees the slot"""
+    pool = make_pool(max_size=1)
+
+    conn = pool.getconn()
+    pool.putconn(conn, discard=True)
+
+    assert conn.closed
+    assert pool.getconn() is not conn
+
+
+def test_unit_of_work_shares_one_connection_lazily(fake_connect):
+    """Test that a unit of work checks out a single connection, and only when used"""
+    from app import database
+
+    pool = make_pool()
+    with patch.object(database, 'get_pool', return_value=pool):
+        with database.unit_of_work():
+            assert fake_connect.call_count == 0
+            with database.get_db_connection() as first, database.get_db_connection() as second:
+                assert first is second
+        assert fake_connect.call_count == 1
+        assert pool.stats()['checked_out'] == 0
+
+
+def test_unit_of_work_does_not_commit_after_a_swallowed_error(fake_connect):
+    """Test that a caught statement error rolls the unit back loudly, unless it ran in a savepoint"""
+    from app import database
+
+    pool = make_pool()
+    with patch.object(database, 'get_pool', return_value=pool):
+        with pytest.raises(database.TransactionAborted):
+            with database.unit_of_work():
+                database.execute_query("UPDATE jobs SET status = 'processing'", fetch=False)
+                try:
+                    database.execute_query("INSERT INTO missing_table VALUES (1)", fetch=False)
+                except Exception:
+                    pass
+        conn = pool.getconn()
+        assert conn.commits == 0 and conn.rollbacks >= 1
+        pool.putconn(conn)
+
+        with database.unit_of_work():
+            database.execute_query("UPDATE jobs SET status = 'processing'", fetch=False)
+            try:
+                with database.savepoint():
+                    database.execute_query("INSERT INTO missing_table VALUES (1)", fetch=False)
+            except Exception:
+                pass
+            database.execute_query("SELECT 1")
+        conn = pool.getconn()
+        assert conn.commits == 1
+        assert [q for q in conn.queries if "SAVEPOINT" in q] == [
+            "SAVEPOINT best_effort_0", "ROLLBACK TO SAVEPOINT best_effort_0"
+        ]
@@ -0,0 +1,65 @@
+import json
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from app.services.embedding_backends import OnnxEmbedder
+
+
+class FakeTokenizer:
+    """Token id = word length; pads to the longest text in the batch with id 0"""
+    def encode_batch(self, texts):
+        lengths = [len(text.split()) for text in texts]
+        longest = max(lengths)
+        return [
+            SimpleNamespace(
+                ids=[len(word) for word in text.split()] + [0] * (longest - n),
+                attention_mask=[1] * n + [0] * (longest - n)
+            )
+            for text, n in zip(texts, lengths)
+        ]
+
+
+class FakeSession:
+    """Hidden state of a token is [id, 1]; padding positions get garbage"""
+    def run(self, outputs, feeds):
+        ids = feeds["input_ids"].astype(np.float32)
+        hidden = np.stack([ids, np.ones_like(ids)], axis=-1)
+        hidden[feeds["attention_mask"] == 0] = 99.0
+        return [hidden]
+
+
+def write_manifest(directory, min_cosine):
+    manifest = {
+        "model_name": "mini", "files": {"fp32": "model.onnx", "int8": "model.int8.onnx"},
+        "dimension": 2, "max_seq_length": 8, "pad_token": "[PAD]", "pad_token_id": 0,
+        "pooling": "mean", "normalize": False, "min_cosine": min_cosine
+    }
+    (directory / "embedder.json").write_text(json.dumps(manifest))
+
+
+def test_onnx_embedder_refuses_unverified_variants(tmp_path):
+    """Test that a variant below the cosine tolerance (or never verified) is refused"""
+    write_manifest(tmp_path, {"fp32": 0.9999, "int8": 0.95})
+
+    assert OnnxEmbedder(str(tmp_path), min_cosine=0.99).model_id == "mini:onnx-fp32"
+    with pytest.raises(ValueError):
+        OnnxEmbedder(str(tmp_path), quantized=True, min_cosine=0.99)
+
+    write_manifest(tmp_path, {})
+    with pytest.raises(ValueError):
+        OnnxEmbedder(str(tmp_path), min_cosine=0.99)
+    assert OnnxEmbedder(str(tmp_path), quantized=True, min_cosine=None).model_id == "mini:onnx-int8"
+
+
+def test_onnx_embedder_mean_pools_real_tokens_in_input_order(tmp_path):
+    """Test that padding is excluded from pooling and length-sorted batches come back in order"""
+    write_manifest(tmp_path, {"fp32": 1.0})
+    embedder = OnnxEmbedder(str(tmp_path))
+    embedder._session, embedder._tokenizer, embedder._input_names = FakeSession(), FakeTokenizer(), {"input_ids"}
+
+    texts = ["abcd ab", "a", "abc abc abc", "ab"]
+    embeddings = embedder.encode(texts, batch_size=2, normalize=False)
+
+    assert embeddings.tolist() == [[3.0, 1.0], [1.0, 1.0], [3.0, 1.0], [2.0, 1.0]]
+    normalized = embedder.encode(texts, batch_size=3, normalize=True)
+    assert np.allclose(np.linalg.norm(normalized, axis=1), 1.0)
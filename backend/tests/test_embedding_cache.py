@@ -0,0 +1,48 @@
+import numpy as np
+from app.services.embedding_cache import EmbeddingCache
+from app.services.rag_service import RAGService
+
+
+class FakeEmbedder:
+    model_id = "fake-model"
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size, normalize):
+        self.encoded.append(list(texts))
+        return np.array([[len(text), 1.0, 2.0] for text in texts], dtype=np.float32)
+
+
+def test_cache_batches_lookups_and_evicts_least_recently_used(tmp_path):
+    """Test batch lookups, whitespace-insensitive keys, per-model keys and the LRU bound"""
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite3"), max_entries=2)
+    cache.set_many("m", ["alpha", "beta"], np.array([[1, 2], [3, 4]], dtype=np.float32))
+
+    vectors = cache.get_many("m", ["alpha", " beta\n", "gamma"])
+    assert vectors[0].tolist() == [1, 2] and vectors[1].tolist() == [3, 4] and vectors[2] is None
+    assert cache.get_many("other-model", ["alpha"]) == [None]
+
+    # "alpha" was read last, so "beta" is evicted by the third entry
+    cache.get_many("m", ["alpha"])
+    cache.set_many("m", ["gamma"], np.array([[5, 6]], dtype=np.float32))
+    assert cache.count() == 2
+    assert cache.get_many("m", ["beta"]) == [None]
+
+    stats = cache.stats()
+    assert stats["hits"] == 3 and stats["misses"] == 3 and stats["hit_rate"] == 0.5
+
+
+def test_generate_embeddings_only_encodes_misses_once(tmp_path):
+    """Test that repeated texts are served from the cache and misses are encoded in one batch"""
+    rag_service = RAGService.__new__(RAGService)
+    rag_service.embedder = FakeEmbedder()
+    rag_service.embedding_cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite3"), max_entries=100)
+
+    first = rag_service.generate_embeddings(["a", "bb", "a"])
+    second = rag_service.generate_embeddings(["bb", "ccc"], normalize=True)
+
+    assert rag_service.embedder.encoded == [["a", "bb"], ["ccc"]]
+    assert first[:, 0].tolist() == [1, 2, 1]
+    assert np.allclose(np.linalg.norm(second, axis=1), 1.0)
+    assert np.allclose(second[0], first[1] / np.linalg.norm(first[1]))
@@ -0,0 +1,43 @@
+from unittest.mock import patch
+from app.services.evaluation_log_buffer import EvaluationLogBuffer
+
+
+def make_row(step, job_id="00000000-0000-0000-0000-000000000001"):
+    return (job_id, step, "groq", "llama", 10, 5, 15, 120, "success", None, False)
+
+
+def test_rows_are_written_in_one_multi_row_insert():
+    """Test that buffered step logs are flushed with a single statement"""
+    buffer = EvaluationLogBuffer(flush_interval=3600, batch_size=100, max_pending=100)
+    for step in ("cv_parsing", "cv_evaluation", "final_analysis"):
+        buffer.add(make_row(step))
+
+    with patch('app.services.evaluation_log_buffer.execute_values_query') as execute_values_query:
+        assert buffer.flush() == 3
+        assert buffer.flush() == 0
+        buffer.close()
+
+    execute_values_query.assert_called_once()
+    query, rows = execute_values_query.call_args.args
+    assert "INSERT INTO evaluation_logs" in query
+    assert [row[1] for row in rows] == ["cv_parsing", "cv_evaluation", "final_analysis"]
+    assert buffer.stats()["rows_written"] == 3 and buffer.pending() == 0
+
+
+def test_failed_flush_keeps_rows_for_the_next_one():
+    """Test that rows survive a failed write, in order, and only overflow is dropped"""
+    buffer = EvaluationLogBuffer(flush_interval=3600, batch_size=100, max_pending=3)
+    buffer.add(make_row("cv_parsing"))
+    buffer.add(make_row("cv_evaluation"))
+
+    with patch('app.services.evaluation_log_buffer.execute_values_query', side_effect=Exception("db down")):
+        assert buffer.flush() == 0
+    buffer.add(make_row("project_parsing"))
+    buffer.add(make_row("project_evaluation"))
+
+    with patch('app.services.evaluation_log_buffer.execute_values_query') as execute_values_query:
+        buffer.close()
+
+    rows = execute_values_query.call_args.args[1]
+    assert [row[1] for row in rows] == ["cv_evaluation", "project_parsing", "project_evaluation"]
+    assert buffer.stats()["flush_failures"] == 1
@@ -1,68 +1,92 @@
+import os
 import pytest
+from contextlib import contextmanager
 from unittest.mock import Mock, patch
+from uuid import uuid4
+from app.services import service_container
 from app.tasks.evaluation_tasks import run_evaluation_pipeline
 from app.utils.error_handler import PDFParsingError, LLMError
 
 
-def test_evaluation_pipeline_success():
-    """Test successful evaluation pipeline execution"""
+@contextmanager
+def pipeline_mocks():
+    """Patch the task's collaborators; nothing touches Postgres, Redis or Groq"""
     with patch('app.tasks.evaluation_tasks.EvaluationService') as mock_eval_service, \
          patch('app.tasks.evaluation_tasks.DocumentService') as mock_doc_service, \
          patch('app.tasks.evaluation_tasks.PDFParser') as mock_parser, \
-         patch('app.tasks.evaluation_tasks.RAGService') as mock_rag, \
-         patch('app.tasks.evaluation_tasks.LLMService') as mock_llm:
-        
-        # Setup mocks
+         patch('app.tasks.evaluation_tasks.ExtractedTextStore'), \
+         patch('app.tasks.evaluation_tasks.CheckpointService') as mock_checkpoints, \
+         patch('app.tasks.evaluation_tasks.get_job_event_publisher'), \
+         patch('app.tasks.evaluation_tasks.unit_of_work'), \
+         patch('app.tasks.evaluation_tasks.get_services') as mock_services:
+
         mock_eval_service.return_value.get_evaluation_job.return_value = {
             'job_title': 'Backend Engineer',
             'cv_document_id': 'cv-123',
             'project_document_id': 'project-456'
         }
-        
+
         mock_doc_service.return_value.get_document.return_value = {
             'file_path': '/path/to/file.pdf'
         }
-        
+
+        mock_checkpoints.return_value.load_checkpoints.return_value = {}
+        mock_services.return_value.llm_service.model = 'llama-test'
+
+        yield mock_parser, mock_services
+
+
+def test_evaluation_pipeline_success():
+    """Test successful evaluation pipeline execution"""
+    job_id = str(uuid4())
+    with pipeline_mocks() as (mock_parser, mock_services):
         mock_parser.return_value.parse_cv.return_value = {
             'cleaned_text': 'CV content'
         }
-        
-        mock_llm.return_value.parse_cv_to_structured_data.return_value = {
+
+        mock_llm = mock_services.return_value.llm_service
+        mock_llm.parse_cv_to_structured_data.return_value = {
             'parsed_data': {},
             'usage': {'prompt_tokens': 100, 'completion_tokens': 50, 'response_time_ms': 1000}
         }
-        
+
         # Execute
-        result = run_evaluation_pipeline('job-123')
-        
+        result = run_evaluation_pipeline(job_id)
+
         # Assert
         assert result['status'] == 'completed'
-        assert result['job_id'] == 'job-123'
+        assert result['job_id'] == job_id
+        mock_services.assert_called_once()
 
 
 def test_evaluation_pipeline_pdf_parsing_error():
-    """Test handling of PDF parsing errors"""
-    with patch('app.tasks.evaluation_tasks.EvaluationService') as mock_eval_service, \
-         patch('app.tasks.evaluation_tasks.DocumentService') as mock_doc_service, \
-         patch('app.tasks.evaluation_tasks.PDFParser') as mock_parser:
-        
-        # Setup mocks
-        mock_eval_service.return_value.get_evaluation_job.return_value = {
-            'job_title': 'Backend Engineer',
-            'cv_document_id': 'cv-123',
-            'project_document_id': 'project-456'
-        }
-        
-        mock_doc_service.return_value.get_document.return_value = {
-            'file_path': '/path/to/file.pdf'
-        }
-        
+    """Test handling of PDF parsing errors once retries are exhausted"""
+    with pipeline_mocks() as (mock_parser, mock_services), \
+         patch.object(run_evaluation_pipeline, 'max_retries', 0):
         # Simulate PDF parsing error
         mock_parser.return_value.parse_cv.side_effect = Exception("Failed to parse PDF")
-        
+
         # Execute
-        result = run_evaluation_pipeline('job-123')
-        
+        result = run_evaluation_pipeline(str(uuid4()))
+
         # Assert
         assert result['status'] == 'failed'
         assert 'error' in result
+
+
+def test_services_built_once_per_process_and_rebuilt_after_fork():
+    """Test that the worker container is reused within a process and replaced in a forked child"""
+    service_container.reset_services()
+    with patch.object(service_container, 'RAGService') as mock_rag, \
+         patch.object(service_container, 'LLMService'):
+        first = service_container.get_services()
+        assert service_container.get_services() is first
+        assert mock_rag.call_count == 1
+
+        # A forked child inherits the container but has a different pid
+        with patch('app.services.service_container.os.getpid', return_value=os.getpid() + 1):
+            child = service_container.get_services()
+
+        assert child is not first
+        assert mock_rag.call_count == 2
+    service_container.reset_services()
@@ -0,0 +1,47 @@
+import hashlib
+from unittest.mock import patch
+from app.services.pdf_parser import PDFParser, EXTRACTOR_VERSION
+
+
+class DictTextStore:
+    """In-memory stand-in for ExtractedTextStore"""
+    def __init__(self):
+        self.rows = {}
+
+    def get(self, file_hash, extractor_version):
+        return self.rows.get((file_hash, extractor_version))
+
+    def put(self, file_hash, extractor_version, parsed):
+        self.rows[(file_hash, extractor_version)] = parsed
+
+
+def test_parsed_text_is_reused_by_file_hash(tmp_path):
+    """Test that a second parse of the same file content skips extraction"""
+    content = b"%PDF-1.4 fake"
+    first = tmp_path / "a.pdf"
+    second = tmp_path / "b.pdf"
+    first.write_bytes(content)
+    second.write_bytes(content)
+    store = DictTextStore()
+
+    with patch.object(PDFParser, 'extract_text', return_value="Hello   world") as extract:
+        parsed = PDFParser.parse_cv(str(first), text_store=store)
+        again = PDFParser.parse_project_report(str(second), text_store=store)
+
+    assert extract.call_count == 1
+    assert again['cleaned_text'] == parsed['cleaned_text'] == "Hello world"
+    assert (hashlib.sha256(content).hexdigest(), EXTRACTOR_VERSION) in store.rows
+
+
+def test_known_hash_skips_rehashing(tmp_path):
+    """Test that a hash recorded at upload time is used as the cache key"""
+    path = tmp_path / "cv.pdf"
+    path.write_bytes(b"%PDF-1.4 fake")
+    store = DictTextStore()
+
+    with patch.object(PDFParser, 'extract_text', return_value="text"), \
+         patch.object(PDFParser, 'file_hash') as file_hash:
+        PDFParser.parse_cv(str(path), text_store=store, file_hash="f" * 64)
+
+    file_hash.assert_not_called()
+    assert ("f" * 64, EXTRACTOR_VERSION) in store.rows
@@ -0,0 +1,40 @@
+import json
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+from app.tasks import dispatch
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+WORKER_ONLY_MODULES = [
+    "torch", "sentence_transformers", "chromadb", "numpy", "pdfplumber", "PyPDF2",
+    "groq", "tiktoken", "app.tasks.evaluation_tasks", "app.services.rag_service"
+]
+
+
+def test_api_import_does_not_load_the_worker_stack():
+    """Test that importing app.main in a fresh interpreter pulls in none of the ML/PDF/LLM modules"""
+    code = f"import json, sys; import app.main; print(json.dumps([m for m in {WORKER_ONLY_MODULES!r} if m in sys.modules]))"
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        check=True,
+        capture_output=True,
+        text=True
+    ).stdout
+
+    assert json.loads(output.strip().splitlines()[-1]) == []
+
+
+def test_dispatch_sends_pipeline_by_name():
+    """Test that the API enqueues the pipeline by task name, routed to the evaluation queue"""
+    from app.tasks.evaluation_tasks import run_evaluation_pipeline
+
+    assert run_evaluation_pipeline.name == dispatch.EVALUATION_PIPELINE_TASK
+    with patch.object(dispatch.celery_app, 'send_task') as send_task:
+        dispatch.enqueue_evaluation_pipeline("job-1")
+
+    send_task.assert_called_once_with(dispatch.EVALUATION_PIPELINE_TASK, args=("job-1",))
+    route = dispatch.celery_app.amqp.router.route({}, dispatch.EVALUATION_PIPELINE_TASK)
+    assert route["queue"].name == "evaluation"
@@ -0,0 +1,92 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from uuid import uuid4
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.routers import result
+from app.services.job_events import JobEventBroker, make_event
+
+
+def test_broker_fans_out_by_job_and_bounds_queues():
+    """Test that events reach only their job's subscribers and slow clients keep the newest"""
+    async def scenario():
+        broker = JobEventBroker(url="redis://unused", queue_size=2)
+        broker.start = lambda: asyncio.sleep(0)
+        job_id, other_id = uuid4(), uuid4()
+
+        async with broker.subscribe(job_id) as first, broker.subscribe(job_id) as second, \
+                broker.subscribe(other_id) as other:
+            for step in ("cv_parsing", "cv_evaluation", "project_parsing"):
+                broker.dispatch(make_event(job_id, "processing", step=step))
+            assert broker.subscriber_count() == 3
+            steps = [first.get_nowait()["step"], first.get_nowait()["step"]]
+            assert steps == ["cv_evaluation", "project_parsing"]
+            assert second.qsize() == 2
+            assert other.empty()
+
+        assert broker.subscriber_count() == 0
+
+    asyncio.run(scenario())
+
+
+class FakeBroker:
+    """Broker stand-in whose subscription replays queued events"""
+    def __init__(self, snapshot, events):
+        self.snapshot = snapshot
+        self.events = events
+
+    async def start(self):
+        pass
+
+    async def get_snapshot(self, job_id):
+        return self.snapshot
+
+    @asynccontextmanager
+    async def subscribe(self, job_id):
+        queue = asyncio.Queue()
+        for event in self.events:
+            queue.put_nowait(event)
+        yield queue
+
+
+def test_sse_streams_snapshot_then_events_until_final_result():
+    """Test the SSE stream: current state first, stale events skipped by sequence, ends on completion"""
+    job_id = uuid4()
+    snapshot = dict(make_event(job_id, "processing", step="cv_parsing"), seq=3)
+    events = [
+        dict(make_event(job_id, "queued"), seq=1),
+        # Published by a worker whose clock is behind the API's
+        dict(make_event(job_id, "failed", error_message="rate limited", will_retry=True),
+             seq=4, ts=snapshot["ts"] - 60),
+        dict(make_event(job_id, "completed", result={"overall_summary": "Hire"}), seq=5, ts=snapshot["ts"] - 59),
+        dict(make_event(job_id, "processing"), seq=6),
+    ]
+    app = FastAPI()
+    app.include_router(result.router, prefix="/api")
+
+    with patch.object(settings, 'JOB_EVENTS_ENABLED', True), \
+         patch.object(result, 'get_job_event_broker', return_value=FakeBroker(snapshot, events)), \
+         patch.object(result.evaluation_service, 'get_evaluation_job') as get_job:
+        response = TestClient(app).get(f"/api/result/{job_id}/events")
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    received = [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+    assert [event["status"] for event in received] == ["processing", "failed", "completed"]
+    assert received[-1]["result"] == {"overall_summary": "Hire"}
+    get_job.assert_not_called()
+
+
+def test_sse_unavailable_when_job_events_disabled():
+    """Test that the stream is refused rather than kept open when nothing publishes events"""
+    app = FastAPI()
+    app.include_router(result.router, prefix="/api")
+
+    with patch.object(settings, 'JOB_EVENTS_ENABLED', False), \
+         patch.object(result, 'get_job_event_broker') as get_broker:
+        response = TestClient(app).get(f"/api/result/{uuid4()}/events")
+
+    assert response.status_code == 503
+    get_broker.assert_not_called()
@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+from app.services import llm_cache
+from app.services.evaluation_log_buffer import INSERT_LOGS_QUERY
+from app.services.evaluation_service import EvaluationService
+from app.services.llm_cache import SQLiteLLMCache, make_cache_key
+from app.services.llm_service import LLMService
+
+
+def test_cache_key_changes_with_model_prompt_and_version():
+    """Test that any input that changes the answer changes the key"""
+    key = make_cache_key("llama", 0.1, "system", "user", "2")
+    assert key == make_cache_key("llama", 0.1, "system", "user", "2")
+    assert len({
+        key,
+        make_cache_key("mixtral", 0.1, "system", "user", "2"),
+        make_cache_key("llama", 0.3, "system", "user", "2"),
+        make_cache_key("llama", 0.1, "system", "other user", "2"),
+        make_cache_key("llama", 0.1, "system", "user", "3"),
+    }) == 5
+
+
+def test_sqlite_cache_hits_misses_and_expires(tmp_path):
+    """Test lookups before and after a write, and that entries expire after the TTL"""
+    cache = SQLiteLLMCache(str(tmp_path / "llm.sqlite3"), ttl_seconds=60, max_entries=10)
+    assert cache.get("a") is None
+
+    with patch.object(llm_cache.time, 'time', return_value=1000.0):
+        cache.set("a", {"content": "{}", "model": "llama"})
+        assert cache.get("a") == {"content": "{}", "model": "llama"}
+    with patch.object(llm_cache.time, 'time', return_value=1061.0):
+        assert cache.get("a") is None
+
+
+def test_sqlite_cache_evicts_least_recently_used(tmp_path):
+    """Test that the size bound drops the entry read least recently, not the oldest write"""
+    cache = SQLiteLLMCache(str(tmp_path / "llm.sqlite3"), ttl_seconds=3600, max_entries=2)
+    for now, key in ((1000.0, "a"), (1001.0, "b")):
+        with patch.object(llm_cache.time, 'time', return_value=now):
+            cache.set(key, {"content": key, "model": "llama"})
+    with patch.object(llm_cache.time, 'time', return_value=1002.0):
+        cache.get("a")
+    with patch.object(llm_cache.time, 'time', return_value=1003.0):
+        cache.set("c", {"content": "c", "model": "llama"})
+        assert cache.get("b") is None
+        assert cache.get("a")["content"] == "a" and cache.get("c")["content"] == "c"
+
+
+def completion(content="{}", model="llama-cache-test"):
+    """Raw-response stand-in for client.chat.completions.with_raw_response.create"""
+    response = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+        usage=SimpleNamespace(prompt_tokens=40, completion_tokens=10, total_tokens=50),
+        model=model
+    )
+    return SimpleNamespace(parse=lambda: response, headers={})
+
+
+def test_cached_step_is_answered_without_calling_the_client(tmp_path):
+    """Test that a repeated cacheable request skips Groq and is reported as cached with zero tokens"""
+    client = MagicMock()
+    client.chat.completions.with_raw_response.create.return_value = completion('{"name": "Ada"}')
+    service = LLMService(client=client)
+    service.rate_limiter = None
+    service.cache = SQLiteLLMCache(str(tmp_path / "llm.sqlite3"), ttl_seconds=3600, max_entries=10)
+    service.cache_steps = {"cv_parsing"}
+
+    first = service.parse_cv_to_structured_data("CV content")
+    second = service.parse_cv_to_structured_data("CV content")
+
+    assert client.chat.completions.with_raw_response.create.call_count == 1
+    assert first["usage"]["cached"] is False
+    assert second["parsed_data"] == {"name": "Ada"}
+    assert second["usage"]["cached"] is True
+    assert second["usage"]["prompt_tokens"] == second["usage"]["completion_tokens"] == 0
+    assert second["usage"]["model"] == "llama-cache-test"
+
+
+def test_cached_flag_is_written_to_evaluation_logs():
+    """Test that a cache hit's log row carries cached=True into the cached column"""
+    buffer = MagicMock()
+    with patch('app.services.evaluation_service.get_evaluation_log_buffer', return_value=buffer):
+        EvaluationService().log_evaluation_step(
+            uuid4(), "cv_parsing", "groq", "llama-test", 0, 0, 3, "success", cached=True
+        )
+
+    row = buffer.add.call_args.args[0]
+    assert row[-1] is True
+    assert "error_message, cached)" in INSERT_LOGS_QUERY
@@ -0,0 +1,118 @@
+import pytest
+import json
+import threading
+import groq
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+from tenacity import wait_none
+from app.services.llm_service import LLMService
+from app.services.rate_limiter import RedisRateLimiter
+from app.utils.error_handler import LLMError
+from app.utils.retry_logic import parse_reset_duration
+
+
+class ScriptedGroqHandler(BaseHTTPRequestHandler):
+    """Replies with the next (status, headers) from server.script"""
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        with self.server.lock:
+            status, headers = self.server.script.pop(0)
+            self.server.calls += 1
+        if status == 200:
+            payload = {
+                "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": "stub-model",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "{}"}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 40, "completion_tokens": 10, "total_tokens": 50}
+            }
+        else:
+            payload = {"error": {"message": "error", "type": "error"}}
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def service():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ScriptedGroqHandler)
+    server.lock = threading.Lock()
+    server.calls = 0
+    server.script = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    client = groq.Groq(api_key="test", base_url=f"http://127.0.0.1:{server.server_address[1]}", max_retries=0)
+    llm_service = LLMService(client=client)
+    llm_service.rate_limiter = MagicMock()
+    llm_service.server = server
+    with patch.object(LLMService._request.retry, 'wait', wait_none()):
+        yield llm_service
+    server.shutdown()
+    server.server_close()
+
+
+def test_rate_limited_call_pauses_cluster_and_retries(service):
+    """Test that a 429 blocks all workers for retry-after and the call is retried"""
+    service.server.script = [
+        (429, {"retry-after": "1.5"}),
+        (200, {"x-ratelimit-remaining-tokens": "5000", "x-ratelimit-limit-tokens": "6000"}),
+    ]
+
+    result = service.parse_cv_to_structured_data("CV content")
+
+    assert result['parsed_data'] == {}
+    assert service.server.calls == 2
+    assert service.rate_limiter.acquire.call_count == 2
+    service.rate_limiter.block_for.assert_called_once_with(1.5)
+    headers, reserved, used = service.rate_limiter.sync_from_headers.call_args[0]
+    assert headers["x-ratelimit-remaining-tokens"] == "5000"
+    assert reserved == service.rate_limiter.acquire.call_args[0][0]
+    assert used == 50
+
+
+def test_client_errors_are_not_retried(service):
+    """Test that non-retryable Groq errors fail fast as LLMError"""
+    service.server.script = [(400, {})]
+
+    with pytest.raises(LLMError):
+        service.parse_cv_to_structured_data("CV content")
+    assert service.server.calls == 1
+
+
+def test_failed_attempt_returns_its_reservation(service):
+    """Test that a 5xx gives the whole reservation back before the retry reserves again"""
+    service.server.script = [(500, {}), (200, {})]
+
+    service.parse_cv_to_structured_data("CV content")
+
+    assert service.rate_limiter.acquire.call_count == 2
+    reserved = service.rate_limiter.acquire.call_args[0][0]
+    failed, succeeded = service.rate_limiter.sync_from_headers.call_args_list
+    assert failed.args[1:] == (reserved, 0)
+    assert succeeded.args[1:] == (reserved, 50)
+
+
+def test_reservation_uses_recent_completions_not_the_cap():
+    """Test that reservations size the completion from recent responses, bounded by max_tokens"""
+    limiter = RedisRateLimiter(MagicMock(), "llama", 30, 6000, 10, completion_estimate=800)
+    assert limiter.reservation(500, 4000) == 1300
+    assert limiter.reservation(500, 300) == 800
+
+    for completion_tokens in [100] * 19 + [1500]:
+        limiter.completions.record(completion_tokens)
+    assert limiter.reservation(500, 4000) == 2000
+    limiter.completions.record(100)
+    assert limiter.reservation(500, 4000) == 600
+
+
+def test_parse_groq_reset_headers():
+    assert parse_reset_duration("2m59.56s") == pytest.approx(179.56)
+    assert parse_reset_duration("320ms") == pytest.approx(0.32)
+    assert parse_reset_duration("7") == 7.0
+    assert parse_reset_duration(None) is None
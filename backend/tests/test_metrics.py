@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from app.main import app
+from app.services import metrics
+from app.tasks.celery_config import celery_app
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_endpoint_reports_latency_by_route_template():
+    """Test that requests are labelled by route template and unmatched paths share one label"""
+    labels = {"method": "GET", "route": "/health", "status": "200"}
+    before = sample("http_request_duration_seconds_count", **labels)
+    unmatched_before = sample("http_request_duration_seconds_count", method="GET", route="unmatched", status="404")
+
+    with TestClient(app) as client:
+        client.get("/health")
+        client.get("/no/such/path/123")
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/health",status="200"}' in response.text
+    assert sample("http_request_duration_seconds_count", **labels) == before + 1
+    assert sample("http_request_duration_seconds_count", method="GET", route="unmatched", status="404") == unmatched_before + 1
+
+
+def test_llm_tokens_are_counted_by_real_model_and_not_for_cache_hits():
+    """Test that tokens are attributed to the answering model and cached answers cost nothing"""
+    labels = {"provider": "groq", "model": "llama-test", "step": "cv_parsing"}
+    response = {"model": "llama-test", "prompt_tokens": 120, "completion_tokens": 30, "cached": False}
+
+    metrics.record_llm_call("groq", "cv_parsing", response)
+    metrics.record_llm_call("groq", "cv_parsing", dict(response, cached=True))
+
+    assert sample("llm_prompt_tokens_total", **labels) == 120
+    assert sample("llm_completion_tokens_total", **labels) == 30
+    assert sample("llm_requests_total", cached="true", **labels) == 1
+    assert sample("llm_requests_total", cached="false", **labels) == 1
+
+
+class FakeChannel:
+    def __init__(self, depths, errors):
+        self.depths, self.errors = depths, errors
+
+    def queue_declare(self, queue, passive):
+        if queue not in self.depths:
+            raise self.errors[0]("NOT_FOUND")
+        return SimpleNamespace(message_count=self.depths[queue])
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    channel_errors = (LookupError,)
+
+    def __init__(self, depths):
+        self.depths = depths
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def channel(self):
+        return FakeChannel(self.depths, self.channel_errors)
+
+
+def test_queue_collector_reports_depth_per_queue():
+    """Test that queue lengths come from a passive declare and missing queues read as empty"""
+    collector = metrics.CeleryQueueCollector(["evaluation", "cleanup"])
+    with patch.object(celery_app, "connection_for_read", return_value=FakeConnection({"evaluation": 7})):
+        families = list(collector.collect())
+
+    assert {s.labels["queue"]: s.value for s in families[0].samples} == {"evaluation": 7, "cleanup": 0}
+
+    with patch.object(celery_app, "connection_for_read", side_effect=OSError("broker down")):
+        assert list(collector.collect()) == []
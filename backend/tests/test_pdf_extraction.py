@@ -0,0 +1,66 @@
+import pytest
+from unittest.mock import patch
+from app.config import settings
+from app.services.pdf_parser import PDFParser
+
+
+def write_pdf(path, num_pages):
+    """Minimal text PDF with one 'Page N' line per page"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for number in range(1, num_pages + 1):
+        stream = b"BT /F1 12 Tf 40 800 Td (Page %d) Tj ET" % number
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        page_ids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % i for i in page_ids), num_pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+    return str(path)
+
+
+@pytest.fixture
+def report(tmp_path):
+    return write_pdf(tmp_path / "report.pdf", 12)
+
+
+def test_parallel_extraction_matches_serial_page_order(report):
+    """Test that page-parallel extraction joins pages in document order"""
+    with patch.object(settings, 'PDF_PARALLEL_MIN_PAGES', 2):
+        serial = PDFParser.extract_text_pdfplumber(report, workers=1)
+        parallel = PDFParser.extract_text_pdfplumber(report, workers=2)
+
+    assert serial == "\n".join(f"Page {n}" for n in range(1, 13))
+    assert parallel == serial
+
+
+def test_page_and_char_limits(report):
+    """Test that max_pages and max_chars cut extraction short"""
+    assert PDFParser.extract_text_pdfplumber(report, max_pages=3, workers=1) == "Page 1\nPage 2\nPage 3"
+    assert PDFParser.extract_text_pdfplumber(report, max_chars=10, workers=1) == "Page 1\nPag"
+
+
+def test_falls_back_to_serial_without_process_pool(report):
+    """Test that extraction still works where child processes are not allowed, trying the pool once per process"""
+    with patch.object(settings, 'PDF_PARALLEL_MIN_PAGES', 2), \
+         patch('app.services.pdf_parser._parallel_unavailable_pid', None), \
+         patch('app.services.pdf_parser._get_process_pool',
+               side_effect=AssertionError("daemonic processes are not allowed to have children")) as get_pool:
+        text = PDFParser.extract_text_pdfplumber(report, workers=2)
+        again = PDFParser.extract_text_pdfplumber(report, workers=2)
+
+    assert text.startswith("Page 1\nPage 2") and text.endswith("Page 12")
+    assert again == text
+    assert get_pool.call_count == 1
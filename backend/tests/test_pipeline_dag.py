@@ -0,0 +1,154 @@
+import pytest
+import threading
+import time
+from app.utils.pipeline_dag import DAGExecutor
+from app.utils.error_handler import LLMError
+
+
+def test_independent_branches_run_concurrently():
+    """Test that steps without a dependency between them overlap in time"""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def branch(value):
+        def step():
+            # Both branches must be in flight at once to pass the barrier
+            barrier.wait()
+            return value
+        return step
+
+    results = (
+        DAGExecutor(max_workers=2)
+        .add_step('cv', branch('cv'))
+        .add_step('project', branch('project'))
+        .add_step('summary', lambda cv, project: f"{cv}+{project}", depends_on=['cv', 'project'])
+        .run()
+    )
+
+    assert results['summary'] == 'cv+project'
+
+
+def test_dependency_outputs_are_passed_by_step_name():
+    """Test that downstream steps receive upstream outputs as keyword arguments"""
+    results = (
+        DAGExecutor()
+        .add_step('parse', lambda: {'skills': ['python']})
+        .add_step('evaluate', lambda parse: len(parse['skills']), depends_on=['parse'])
+        .run()
+    )
+
+    assert results == {'parse': {'skills': ['python']}, 'evaluate': 1}
+
+
+def test_step_failure_is_reraised_and_stops_dependents():
+    """Test that a failing step surfaces its own exception and skips dependents"""
+    calls = []
+
+    def failing_step():
+        raise LLMError(message="boom", step="cv_evaluation")
+
+    def slow_step():
+        time.sleep(0.05)
+        calls.append('project')
+        return 'project'
+
+    executor = (
+        DAGExecutor(max_workers=2)
+        .add_step('cv_evaluation', failing_step)
+        .add_step('project', slow_step)
+        .add_step('summary', lambda cv_evaluation, project: calls.append('summary'),
+                  depends_on=['cv_evaluation', 'project'])
+    )
+
+    with pytest.raises(LLMError) as exc_info:
+        executor.run()
+
+    assert exc_info.value.step == 'cv_evaluation'
+    assert calls == ['project']
+
+
+def test_cycles_and_unknown_dependencies_are_rejected():
+    """Test validation of the step graph"""
+    with pytest.raises(ValueError):
+        DAGExecutor().add_step('a', lambda b: b, depends_on=['b']).run()
+
+    with pytest.raises(ValueError):
+        (
+            DAGExecutor()
+            .add_step('a', lambda b: b, depends_on=['b'])
+            .add_step('b', lambda a: a, depends_on=['a'])
+            .run()
+        )
+
+
+def test_checkpointed_steps_are_skipped_on_retry():
+    """Test that a rerun resumes at the first step without a matching checkpoint"""
+    calls = []
+    saved = {}
+
+    def build(fail_last):
+        def last(middle):
+            calls.append('last')
+            if fail_last:
+                raise RuntimeError("flaky")
+            return middle["value"] + 1
+
+        return (
+            DAGExecutor()
+            .add_step('first', lambda: calls.append('first') or 1, fingerprint="doc-v1")
+            .add_step('middle', lambda first: calls.append('middle') or {"value": first}, depends_on=['first'])
+            .add_step('last', last, depends_on=['middle'])
+        )
+
+    def save(step, input_hash, output):
+        saved[step] = {"input_hash": input_hash, "output": output}
+
+    with pytest.raises(RuntimeError):
+        build(fail_last=True).run(on_step_complete=save)
+    assert set(saved) == {'first', 'middle'}
+
+    calls.clear()
+    outputs = build(fail_last=False).run(checkpoints=saved, on_step_complete=save)
+    assert calls == ['last']
+    assert outputs['last'] == 2
+
+
+def test_checkpoint_with_stale_inputs_is_ignored():
+    """Test that a changed fingerprint invalidates the checkpoint"""
+    saved = {}
+    DAGExecutor().add_step('parse', lambda: "old", fingerprint="v1").run(
+        on_step_complete=lambda step, input_hash, output: saved.update({step: {"input_hash": input_hash, "output": output}})
+    )
+
+    outputs = DAGExecutor().add_step('parse', lambda: "new", fingerprint="v2").run(checkpoints=saved)
+    assert outputs == {'parse': "new"}
+
+
+def test_failing_checkpoint_callback_waits_for_steps_in_flight():
+    """Test that an on_step_complete error does not leave other steps running after run() returns"""
+    calls = []
+    started = threading.Event()
+
+    def fast_step():
+        # Finish only once the slow step is actually running
+        started.wait(timeout=5)
+        return 'cv'
+
+    def slow_step():
+        started.set()
+        time.sleep(0.1)
+        calls.append('project')
+        return 'project'
+
+    def save_checkpoint(name, input_hash, output):
+        raise RuntimeError("checkpoint write failed")
+
+    executor = (
+        DAGExecutor(max_workers=2)
+        .add_step('cv', fast_step)
+        .add_step('project', slow_step)
+    )
+
+    with pytest.raises(RuntimeError):
+        executor.run(on_step_complete=save_checkpoint)
+
+    assert calls == ['project']
@@ -0,0 +1,50 @@
+from app.utils.prompt_builder import PromptSection, allocate_budget, build_prompt, count_tokens
+
+SYSTEM = "You are an expert evaluator."
+TEMPLATE = "Evaluate for {job_title}.\n\nDATA:\n{data}\n\nCONTEXT:\n{context}\n\nREPORT:\n{report}"
+
+
+def make_sections(report_words=50, chunks=2, chunk_words=20):
+    context = "\n".join(
+        f"[{kind} - Reference {i}]\n" + " ".join(f"{kind.lower()}{n}" for n in range(chunk_words)) + "\n"
+        for i, kind in enumerate(["JOB_DESCRIPTION", "CV_RUBRIC"][:chunks])
+    )
+    return {
+        "job_title": "Backend Engineer",
+        "data": PromptSection({"skills": ["python", "sql"], "summary": "builds APIs"}, kind="json"),
+        "context": PromptSection(context, kind="context"),
+        "report": PromptSection(" ".join(f"word{n}" for n in range(report_words))),
+    }
+
+
+def test_small_prompt_is_unchanged_and_compact():
+    """Test that prompts under budget are only compacted, and the token count is recorded"""
+    prompt = build_prompt(SYSTEM, TEMPLATE, make_sections(), max_prompt_tokens=10_000)
+
+    assert '{"skills":["python","sql"],"summary":"builds APIs"}' in prompt["user_prompt"]
+    assert "word49" in prompt["user_prompt"]
+    assert prompt["prompt_tokens"] == count_tokens(SYSTEM) + count_tokens(prompt["user_prompt"])
+
+
+def test_oversized_sections_are_trimmed_deterministically_within_budget():
+    """Test that long sections are cut to fit while keeping every context source"""
+    sections = make_sections(report_words=3000, chunk_words=1500)
+
+    prompt = build_prompt(SYSTEM, TEMPLATE, sections, max_prompt_tokens=800)
+    again = build_prompt(SYSTEM, TEMPLATE, make_sections(report_words=3000, chunk_words=1500), max_prompt_tokens=800)
+
+    assert prompt["prompt_tokens"] <= 800
+    assert prompt == again
+    user_prompt = prompt["user_prompt"]
+    assert "Backend Engineer" in user_prompt
+    assert '"summary":"builds APIs"' in user_prompt
+    assert "[JOB_DESCRIPTION - Reference 0]" in user_prompt and "[CV_RUBRIC - Reference 1]" in user_prompt
+    # Head and tail of the report survive the cut
+    assert "word0 " in user_prompt and "word2999" in user_prompt and "tokens omitted" in user_prompt
+
+
+def test_unused_budget_is_redistributed():
+    """Test that small sections keep everything and the rest goes to large ones"""
+    assert allocate_budget(100, [10, 500, 500], [1, 1, 1]) == [10, 45, 45]
+    assert allocate_budget(100, [10, 20], [1, 1]) == [10, 20]
+    assert allocate_budget(90, [500, 500], [2, 1]) == [60, 30]
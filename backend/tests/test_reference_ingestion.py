@@ -0,0 +1,140 @@
+import numpy as np
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from app.config import settings
+from app.services.rag_service import RAGService
+from app.services.vector_store import NumpyVectorStore
+from app.utils.ttl_cache import TTLCache
+
+
+class WordTokenizer:
+    """One token per word, so chunk boundaries are easy to reason about"""
+    def encode(self, text):
+        return text.split()
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+def make_rag_service(tmp_path):
+    rag_service = RAGService.__new__(RAGService)
+    rag_service.vector_store = NumpyVectorStore(str(tmp_path / "index"))
+    rag_service.tokenizer = WordTokenizer()
+    rag_service.embedder = SimpleNamespace(model_id="test-model")
+    rag_service.chunk_size = 4
+    rag_service.chunk_overlap = 0
+    rag_service.context_cache = TTLCache(max_entries=8, ttl_seconds=60)
+    rag_service._version_file = str(tmp_path / "collection_version")
+    rag_service._store_version = None
+    rag_service._store_version_checked = None
+    rag_service.embedded_texts = []
+
+    def generate_embeddings(texts, batch_size=None, normalize=False):
+        rag_service.embedded_texts.extend(texts)
+        return np.array([[len(text), sum(map(ord, text)) % 97, 1.0] for text in texts], dtype=np.float32)
+
+    rag_service.generate_embeddings = generate_embeddings
+    return rag_service
+
+
+def doc(doc_id, content, title="Rubric"):
+    return {"id": doc_id, "document_type": "cv_rubric", "title": title, "content": content, "metadata": {}}
+
+
+def test_sync_only_embeds_and_writes_what_changed(tmp_path):
+    """Test that unchanged documents are skipped and edited ones reuse unchanged chunk vectors"""
+    rag_service = make_rag_service(tmp_path)
+    first = doc("a", "one two three four five six seven eight nine ten")
+    second = doc("b", "alpha beta gamma delta")
+
+    report = rag_service.sync_reference_documents([first, second])
+    assert report["added"] == ["a", "b"]
+    assert report["chunks_embedded"] == 4 and rag_service.vector_store.count() == 4
+    version = rag_service.get_collection_version()
+
+    rag_service.embedded_texts.clear()
+    report = rag_service.sync_reference_documents([first, second])
+    assert report["unchanged"] == ["a", "b"] and report["chunks_written"] == 0
+    assert rag_service.embedded_texts == [] and rag_service.get_collection_version() == version
+
+    # Edit the middle chunk of "a" and drop its last one
+    edited = doc("a", "one two three four FIVE six seven eight")
+    report = rag_service.sync_reference_documents([edited, second])
+    assert report["changed"] == ["a"] and report["unchanged"] == ["b"]
+    assert rag_service.embedded_texts == ["FIVE six seven eight"]
+    assert report["chunks_reused"] == 1 and report["chunks_deleted"] == 1
+    assert sorted(c["id"] for c in rag_service.vector_store.get()) == ["a_chunk_0", "a_chunk_1", "b_chunk_0"]
+    assert rag_service.get_collection_version() != version
+
+    report = rag_service.sync_reference_documents([edited], remove_missing=True)
+    assert report["removed"] == ["b"] and report["unchanged"] == ["a"]
+    assert [c["id"] for c in rag_service.vector_store.get(document_ids=["b"])] == []
+
+
+def test_insertion_at_the_start_only_re_embeds_nearby_chunks(tmp_path):
+    """Test that chunk boundaries follow paragraphs, so later chunks keep their text and vectors"""
+    rag_service = make_rag_service(tmp_path)
+    rag_service.chunk_size = 12
+    paragraphs = [f"topic{i} alpha{i} beta{i}" for i in range(40)]
+
+    report = rag_service.sync_reference_documents([doc("a", "\n\n".join(paragraphs))])
+    total = report["chunks_written"]
+    assert total > 8
+    assert all(chunk.count("\n\n") < 4 for chunk in rag_service.chunk_text("\n\n".join(paragraphs)))
+
+    rag_service.embedded_texts.clear()
+    report = rag_service.sync_reference_documents([doc("a", "\n\n".join(["intro new words"] + paragraphs))])
+    assert report["chunks_embedded"] <= 2
+    assert report["chunks_reused"] >= total - 2
+    assert rag_service.embedded_texts[0].startswith("intro new words\n\ntopic0")
+
+
+def test_sync_with_no_documents_empties_the_store(tmp_path):
+    """Test that removing every reference document also removes its chunks"""
+    rag_service = make_rag_service(tmp_path)
+    rag_service.sync_reference_documents([doc("a", "one two three four five"), doc("b", "alpha beta")])
+
+    report = rag_service.sync_reference_documents([], remove_missing=True)
+    assert sorted(report["removed"]) == ["a", "b"]
+    assert rag_service.vector_store.count() == 0
+
+
+def test_context_cache_hits_until_documents_change(tmp_path):
+    """Test that repeated lookups are hits and re-ingesting or clearing forces a rebuild"""
+    rag_service = make_rag_service(tmp_path)
+    rag_service.sync_reference_documents([doc("a", "python sql docker redis")])
+    retrieve = MagicMock(side_effect=lambda **kwargs: rag_service.vector_store.get())
+    rag_service.retrieve_relevant_context = retrieve
+    rag_service._format_context = lambda chunks: "|".join(sorted(c["metadata"]["chunk_hash"] for c in chunks))
+
+    first = rag_service.get_context_for_cv_evaluation("Backend Engineer")
+    assert rag_service.get_context_for_cv_evaluation("Backend Engineer") == first
+    assert retrieve.call_count == 1 and rag_service.get_context_cache_stats()["hits"] == 1
+
+    rag_service.sync_reference_documents([doc("a", "python sql docker kafka")])
+    assert rag_service.get_context_for_cv_evaluation("Backend Engineer") != first
+    assert retrieve.call_count == 2
+
+    # A write from another process (e.g. the ingestion script) only bumps the version file
+    other = make_rag_service(tmp_path)
+    other.vector_store = rag_service.vector_store
+    other.clear_collection()
+    rag_service.get_context_for_cv_evaluation("Backend Engineer")
+    assert retrieve.call_count == 3
+
+
+def test_shared_store_version_is_read_at_most_once_per_interval(tmp_path):
+    """Test that context cache hits don't query a shared store's version every time"""
+    rag_service = make_rag_service(tmp_path)
+    rag_service.vector_store = MagicMock()
+    rag_service.vector_store.version.return_value = "4:2024-01-01"
+    rag_service.retrieve_relevant_context = MagicMock(return_value=[])
+
+    with patch.object(settings, 'RAG_VERSION_CHECK_INTERVAL', 60):
+        for _ in range(3):
+            rag_service.get_context_for_project_evaluation()
+        assert rag_service.vector_store.version.call_count == 1
+
+        rag_service.clear_collection()
+        rag_service.get_context_for_project_evaluation()
+        assert rag_service.vector_store.version.call_count == 2
@@ -0,0 +1,71 @@
+import pytest
+import hashlib
+import os
+from datetime import datetime
+from uuid import uuid4
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.routers import upload
+from app.config import settings
+
+
+PDF_BYTES = b"%PDF-1.4\n" + os.urandom(200_000) + b"\n%%EOF\n"
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = FastAPI()
+    app.include_router(upload.router, prefix="/api")
+
+    def create_document(**kwargs):
+        return {"id": uuid4(), "uploaded_at": datetime.utcnow(), **kwargs}
+
+    with patch.object(settings, 'UPLOAD_DIR', str(tmp_path)), \
+         patch.object(upload.document_service, 'create_document', side_effect=create_document):
+        yield TestClient(app)
+
+
+def test_multipart_upload_streams_to_disk_with_hash(client, tmp_path):
+    """Test that uploaded files land on disk with their SHA-256 recorded"""
+    response = client.post(
+        "/api/upload/multipart",
+        files={
+            "cv": ("cv.pdf", PDF_BYTES, "application/pdf"),
+            "project": ("report.pdf", PDF_BYTES, "application/pdf"),
+        }
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    for key in ("cv_document", "project_document"):
+        doc = body[key]
+        assert doc["file_size"] == len(PDF_BYTES)
+        assert doc["file_hash"] == hashlib.sha256(PDF_BYTES).hexdigest()
+        with open(doc["file_path"], "rb") as f:
+            assert f.read() == PDF_BYTES
+    assert body["project_document"]["file_type"] == "project_report"
+    assert not [p for p in os.listdir(tmp_path) if p.endswith(".part")]
+
+
+def test_multipart_upload_rejects_oversized_file(client, tmp_path):
+    """Test that the size limit is enforced while streaming and partial files are removed"""
+    with patch.object(settings, 'MAX_FILE_SIZE', 100_000):
+        response = client.post(
+            "/api/upload/multipart",
+            files={"cv": ("cv.pdf", PDF_BYTES, "application/pdf")}
+        )
+
+    assert response.status_code == 413
+    assert os.listdir(tmp_path) == []
+
+
+def test_multipart_upload_rejects_non_pdf(client, tmp_path):
+    """Test that the PDF magic bytes are checked"""
+    response = client.post(
+        "/api/upload/multipart",
+        files={"cv": ("cv.pdf", b"PK\x03\x04 not a pdf", "application/pdf")}
+    )
+
+    assert response.status_code == 400
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from unittest.mock import patch
+from app.services.vector_store import NumpyVectorStore, PgVectorStore
+
+TYPES = ["job_description", "cv_rubric", "case_study_brief", "project_rubric"]
+
+
+def make_corpus(n=200, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((n, dim)).astype(np.float32)
+    ids = [f"doc{i // 10}_chunk_{i % 10}" for i in range(n)]
+    documents = [f"chunk text {i}" for i in range(n)]
+    metadatas = [{"document_type": TYPES[i % len(TYPES)], "title": f"Doc {i // 10}"} for i in range(n)]
+    return ids, embeddings, documents, metadatas
+
+
+def brute_force(embeddings, metadatas, query, top_k, document_types):
+    normalized = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    scores = normalized @ (query / np.linalg.norm(query))
+    rows = [i for i, m in enumerate(metadatas) if m["document_type"] in document_types]
+    rows.sort(key=lambda i: -scores[i])
+    return [f"chunk text {i}" for i in rows[:top_k]], [1 - scores[i] for i in rows[:top_k]]
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_query_matches_brute_force_with_type_filter(tmp_path, dtype):
+    """Test that top-k and cosine distances match an exhaustive search"""
+    ids, embeddings, documents, metadatas = make_corpus()
+    store = NumpyVectorStore(str(tmp_path), dtype=dtype)
+    store.add(ids, embeddings, documents, metadatas)
+
+    query = embeddings[7] + 0.1
+    results = store.query(query, 5, ["cv_rubric", "job_description"])
+    expected_texts, expected_distances = brute_force(embeddings, metadatas, query, 5, ["cv_rubric", "job_description"])
+
+    assert [r["text"] for r in results] == expected_texts
+    assert np.allclose([r["distance"] for r in results], expected_distances, atol=1e-2 if dtype == "float16" else 1e-5)
+    assert {r["metadata"]["document_type"] for r in results} <= {"cv_rubric", "job_description"}
+    assert store.query(query, 5, ["unknown_type"]) == []
+
+
+def test_other_processes_see_rewrites_and_readd_replaces(tmp_path):
+    """Test that a second (mmap) instance reloads after the index is rewritten"""
+    ids, embeddings, documents, metadatas = make_corpus(n=20)
+    writer = NumpyVectorStore(str(tmp_path))
+    reader = NumpyVectorStore(str(tmp_path), mmap=True)
+    writer.add(ids, embeddings, documents, metadatas)
+    assert reader.count() == 20
+
+    writer.add(ids[:2], embeddings[:2] * -1, ["replaced 0", "replaced 1"], metadatas[:2])
+    assert reader.count() == 20
+    assert reader.query(-embeddings[0], 1)[0]["text"] == "replaced 0"
+
+    writer.clear()
+    assert reader.count() == 0 and reader.query(embeddings[0], 3) == []
+    assert len(list(tmp_path.glob("embeddings-*.npy"))) == 1
+
+
+def test_pgvector_store_filters_in_sql_and_upserts_chunks():
+    """Test that pgvector writes upsert by chunk position and queries filter by type in SQL"""
+    store = PgVectorStore(ef_search=80)
+    metadatas = [
+        {"document_id": "11111111-1111-1111-1111-111111111111", "document_type": "cv_rubric",
+         "title": "Rubric", "chunk_index": i, "total_chunks": 2}
+        for i in range(2)
+    ]
+    embeddings = np.array([[0.5, 0.25], [1.0, 0.0]], dtype=np.float32)
+
+    with patch('app.services.vector_store.execute_query') as execute_query, \
+            patch('app.services.vector_store.execute_values_query') as execute_values_query:
+        store.add(["a", "b"], embeddings, ["first", "second"], metadatas)
+
+        assert "ON CONFLICT (reference_document_id, chunk_index) DO UPDATE" in execute_values_query.call_args.args[0]
+        rows = execute_values_query.call_args.args[1]
+        assert rows[0][:5] == ("11111111-1111-1111-1111-111111111111", "cv_rubric", 0, "first", "[0.5,0.25]")
+
+        store.delete(["11111111-1111-1111-1111-111111111111_chunk_1"])
+        assert "DELETE FROM vector_embeddings" in execute_values_query.call_args.args[0]
+        assert execute_values_query.call_args.args[1] == [("11111111-1111-1111-1111-111111111111", "1")]
+        execute_query.assert_not_called()
+
+        execute_query.reset_mock()
+        execute_query.side_effect = [
+            [{"set_config": "80"}],
+            [{"chunk_text": "second", "metadata": metadatas[1], "distance": 0.02}]
+        ]
+        results = store.query(np.array([1.0, 0.1]), 3, ["cv_rubric", "job_description"])
+
+    (set_ef, _), (select, params) = [call.args for call in execute_query.call_args_list]
+    assert "hnsw.ef_search" in set_ef
+    assert "document_type = ANY(%s)" in select and "ORDER BY embedding <=> %s::vector" in select
+    assert params == ("[1,0.1]", ["cv_rubric", "job_description"], "[1,0.1]", 3)
+    assert results == [{"text": "second", "metadata": metadatas[1], "distance": 0.02}]
@@ -0,0 +1,3 @@
+-- Flag evaluation_logs rows served from the LLM response cache (zero tokens spent)
+ALTER TABLE evaluation_logs
+    ADD COLUMN IF NOT EXISTS cached BOOLEAN NOT NULL DEFAULT FALSE;
@@ -0,0 +1,5 @@
+-- SHA-256 of each uploaded file, computed while the upload is written to disk
+ALTER TABLE documents
+    ADD COLUMN IF NOT EXISTS file_hash CHAR(64);
+
+CREATE INDEX IF NOT EXISTS idx_documents_file_hash ON documents(file_hash);
@@ -0,0 +1,12 @@
+-- Cleaned PDF text, extracted once per file content and extractor version
+CREATE TABLE IF NOT EXISTS document_texts (
+    file_hash CHAR(64) NOT NULL,
+    extractor_version VARCHAR(100) NOT NULL,
+    cleaned_text TEXT NOT NULL,
+    char_count INTEGER NOT NULL,
+    word_count INTEGER NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (file_hash, extractor_version)
+);
+
+CREATE INDEX IF NOT EXISTS idx_document_texts_created_at ON document_texts(created_at);
@@ -0,0 +1,9 @@
+-- Outputs of completed pipeline steps, used to resume retried evaluations
+CREATE TABLE IF NOT EXISTS evaluation_checkpoints (
+    evaluation_job_id UUID NOT NULL REFERENCES evaluation_jobs(id) ON DELETE CASCADE,
+    step_name VARCHAR(100) NOT NULL, -- 'cv_parsing', 'cv_evaluation', 'project_parsing', 'project_evaluation', 'final_analysis'
+    input_hash CHAR(64) NOT NULL, -- SHA-256 of the step's inputs; a mismatch re-runs the step
+    output JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (evaluation_job_id, step_name)
+);
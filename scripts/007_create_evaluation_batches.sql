@@ -0,0 +1,12 @@
+-- Groups of evaluation jobs created by POST /api/evaluate/batch
+CREATE TABLE IF NOT EXISTS evaluation_batches (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    job_title VARCHAR(255) NOT NULL,
+    total_jobs INTEGER NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE evaluation_jobs
+    ADD COLUMN IF NOT EXISTS batch_id UUID REFERENCES evaluation_batches(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_evaluation_jobs_batch_id ON evaluation_jobs(batch_id);
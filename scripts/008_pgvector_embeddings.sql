@@ -0,0 +1,31 @@
+-- Store reference chunks for the pgvector backend (VECTOR_STORE_BACKEND=pgvector).
+-- Embeddings come from all-MiniLM-L6-v2 (384 dimensions), not the 1536 the
+-- table was created with. Nothing wrote to the table before, so rows with
+-- another dimension are dropped instead of converted.
+DELETE FROM vector_embeddings WHERE embedding IS NULL OR vector_dims(embedding) <> 384;
+
+ALTER TABLE vector_embeddings
+    ALTER COLUMN embedding TYPE vector(384),
+    ALTER COLUMN embedding SET NOT NULL;
+
+-- Denormalized from reference_documents so type filters don't need a join
+ALTER TABLE vector_embeddings
+    ADD COLUMN IF NOT EXISTS document_type VARCHAR(50);
+
+UPDATE vector_embeddings v
+SET document_type = r.document_type
+FROM reference_documents r
+WHERE r.id = v.reference_document_id AND v.document_type IS NULL;
+
+ALTER TABLE vector_embeddings
+    ALTER COLUMN document_type SET NOT NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_vector_embeddings_doc_chunk
+    ON vector_embeddings(reference_document_id, chunk_index);
+
+CREATE INDEX IF NOT EXISTS idx_vector_embeddings_document_type
+    ON vector_embeddings(document_type);
+
+-- Approximate nearest-neighbour search on cosine distance (<=>); needs pgvector >= 0.5
+CREATE INDEX IF NOT EXISTS idx_vector_embeddings_embedding_hnsw
+    ON vector_embeddings USING hnsw (embedding vector_cosine_ops);
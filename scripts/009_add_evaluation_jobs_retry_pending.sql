@@ -0,0 +1,3 @@
+-- Set while a failed job waits for a Celery retry; only failures without one are final
+ALTER TABLE evaluation_jobs
+    ADD COLUMN IF NOT EXISTS retry_pending BOOLEAN NOT NULL DEFAULT FALSE;